@@ -0,0 +1,201 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from prep_data import lire_releves
+from sketch_quantiles import SketchesMensuels
+
+
+class AgregatsMensuels:
+    """
+    Agrégats mensuels de simuler_salagou tenus à jour de façon incrémentale.
+
+    L'état conservé par mois (sommes des entrées naturelles et de l'évaporation,
+    somme et nombre de cotes, volume du premier jour) et le dernier relevé
+    (date et volume, pour la variation du jour suivant) suffisent à intégrer
+    de nouveaux relevés : seuls les mois touchés sont recalculés.
+
+    Sur demande (sketches=True), les mois terminés (antérieurs au mois du
+    dernier relevé) sont aussi versés dans des sketches de quantiles par mois
+    (self.sketches, variables VOLUME_DEBUT, ENTREE_CLIMAT et EVAP_CLIMAT),
+    utilisables directement par periodes.indicateurs_periodes à la place des
+    agrégats. Sans eux, self.sketches vaut None et ajouter ne fait que la
+    mise à jour des agrégats.
+
+    Paramètres:
+        evap_pct (float): % d'augmentation de l'évaporation (ex: 0.10 pour +10%)
+        entree_pct (float): % de réduction des entrées naturelles (ex: 0.10 pour -10%)
+        sketches (bool): Tenir les sketches de quantiles à jour (défaut False).
+        k (int): Précision des sketches (voir SketchKLL), par défaut 200.
+        graine (int, optional): Graine des sketches (reproductibilité).
+    """
+
+    CHAMPS = ["ENTREE_NATURELLE", "EVAPORATION", "EVAP_CLIMAT", "ENTREE_CLIMAT",
+              "SOMME_COTE", "NB_COTE", "VOLUME_PREMIER_JOUR"]
+
+    def __init__(self, evap_pct=0.10, entree_pct=0.10, sketches=False, k=200, graine=None):
+        self.evap_pct = evap_pct
+        self.entree_pct = entree_pct
+        self.mois = {}
+        self.derniere_date = None
+        self.dernier_volume = np.nan
+        self.sketches = SketchesMensuels(k, graine) if sketches else None
+        self.dernier_mois_clos = None
+
+    def ajouter(self, data):
+        """
+        Intègre des relevés postérieurs au dernier relevé connu.
+
+        Paramètres:
+            data (pd.DataFrame): Nouveaux relevés (colonnes DATE_RELEVE, DEBIT_OUT,
+                EVAPORATION, VOLUME, COTE), non modifiés par la fonction.
+
+        Retour:
+            list: Mois (pd.Timestamp) dont les agrégats ont changé.
+        """
+        if data.empty:
+            return []
+
+        data = data.sort_values("DATE_RELEVE")
+        dates = pd.to_datetime(data["DATE_RELEVE"])
+        if self.derniere_date is not None and dates.iloc[0] <= self.derniere_date:
+            raise ValueError("Relevés antérieurs au dernier relevé intégré : recalcul complet nécessaire.")
+
+        volume = data["VOLUME"].to_numpy(dtype=float)
+        debit_out_m3 = data["DEBIT_OUT"].to_numpy(dtype=float) * 86400
+        evaporation = data["EVAPORATION"].to_numpy(dtype=float)
+
+        # Variation de volume (jours consécutifs uniquement), y compris avec le dernier relevé connu
+        volume_prec = np.concatenate(([self.dernier_volume], volume[:-1]))
+        date_prec = dates.shift(1)
+        if self.derniere_date is not None:
+            date_prec.iloc[0] = self.derniere_date
+        consecutif = ((dates - date_prec).dt.days == 1).to_numpy()
+        delta_volume = np.where(consecutif, volume - volume_prec, np.nan)
+
+        entree = delta_volume + debit_out_m3
+        journalier = pd.DataFrame({
+            "MOIS": dates.dt.to_period("M").dt.to_timestamp().to_numpy(),
+            "ENTREE_NATURELLE": entree,
+            "EVAPORATION": evaporation,
+            "EVAP_CLIMAT": evaporation * (1 + self.evap_pct),
+            "ENTREE_CLIMAT": entree * (1 - self.entree_pct),
+            "SOMME_COTE": data["COTE"].to_numpy(dtype=float),
+            "NB_COTE": data["COTE"].notna().to_numpy(dtype=int),
+        })
+        sommes = journalier.groupby("MOIS").sum(min_count=0)
+
+        premiers = dates.dt.is_month_start.to_numpy()
+        volumes_premier_jour = dict(zip(journalier["MOIS"][premiers], volume[premiers]))
+
+        for mois, ligne in sommes.iterrows():
+            etat = self.mois.get(mois)
+            if etat is None:
+                etat = dict.fromkeys(self.CHAMPS, 0.0)
+                etat["VOLUME_PREMIER_JOUR"] = np.nan
+                self.mois[mois] = etat
+            for champ in self.CHAMPS[:-1]:
+                etat[champ] += ligne[champ]
+            if mois in volumes_premier_jour:
+                etat["VOLUME_PREMIER_JOUR"] = volumes_premier_jour[mois]
+
+        self.derniere_date = dates.iloc[-1]
+        self.dernier_volume = volume[-1]
+        self._clore_mois()
+        return list(sommes.index)
+
+    def _clore_mois(self):
+        """Verse dans les sketches les mois terminés qui n'y sont pas encore."""
+        if self.sketches is None:
+            return
+        en_cours = self.derniere_date.to_period("M").to_timestamp()
+        clos = sorted(m for m in self.mois
+                      if m < en_cours and (self.dernier_mois_clos is None or m > self.dernier_mois_clos))
+        if not clos:
+            return
+
+        etats = pd.DataFrame.from_dict({m: self.mois[m] for m in clos}, orient="index")
+        mensuel = pd.DataFrame({
+            "MOIS_NUM": [m.month for m in clos],
+            "VOLUME_DEBUT": etats["VOLUME_PREMIER_JOUR"].to_numpy(),
+            # Mêmes bornes que resultats()
+            "ENTREE_CLIMAT": np.maximum(etats["ENTREE_CLIMAT"].to_numpy(), 0),
+            "EVAP_CLIMAT": np.maximum(etats["EVAP_CLIMAT"].to_numpy(), 0)
+        })
+        for variable in ["VOLUME_DEBUT", "ENTREE_CLIMAT", "EVAP_CLIMAT"]:
+            self.sketches.mettre_a_jour(variable, mensuel, colonne=variable)
+        self.dernier_mois_clos = clos[-1]
+
+    def resultats(self):
+        """
+        Retour au format de simuler_salagou : {'cote_moyenne', 'donnees_simulees'}.
+        """
+        etats = pd.DataFrame.from_dict(self.mois, orient="index").sort_index()
+        mois = pd.Series(etats.index, name="MOIS")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cote = etats["SOMME_COTE"].to_numpy() / etats["NB_COTE"].to_numpy()
+        cote_moyenne = pd.DataFrame({"MOIS": mois, "COTE_MOYENNE": cote})
+        cote_moyenne["ANNEE"] = cote_moyenne["MOIS"].dt.year
+        cote_moyenne["MOIS_NUM"] = cote_moyenne["MOIS"].dt.month
+
+        donnees_mensuelles = pd.DataFrame({"MOIS": mois})
+        for col in ["ENTREE_NATURELLE", "EVAPORATION", "EVAP_CLIMAT", "ENTREE_CLIMAT"]:
+            donnees_mensuelles[col] = np.maximum(etats[col].to_numpy(), 0)
+        donnees_mensuelles["VOLUME_PREMIER_JOUR"] = etats["VOLUME_PREMIER_JOUR"].to_numpy()
+
+        return {
+            "cote_moyenne": cote_moyenne,
+            "donnees_simulees": donnees_mensuelles
+        }
+
+
+class SuiviFichier:
+    """
+    Surveille un fichier CSV de relevés et renvoie uniquement les lignes ajoutées.
+
+    La position de lecture est mémorisée : à chaque appel de nouvelles_lignes,
+    seuls les octets écrits depuis le dernier appel sont lus et analysés.
+    """
+
+    def __init__(self, chemin_fichier, depuis_la_fin=True):
+        self.chemin = chemin_fichier
+        with open(self.chemin, "rb") as f:
+            self.entete = f.readline()
+            self.position = os.fstat(f.fileno()).st_size if depuis_la_fin else f.tell()
+        self.signature = self._signature()
+
+    def _signature(self):
+        stat = os.stat(self.chemin)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def nouvelles_lignes(self):
+        """
+        Retour:
+            pd.DataFrame | None: Relevés ajoutés depuis le dernier appel (format
+                lire_releves), ou None si le fichier n'a pas changé.
+
+        Lève:
+            ValueError: si le fichier a été tronqué ou réécrit (recalcul complet nécessaire).
+        """
+        signature = self._signature()
+        if signature == self.signature:
+            return None
+        self.signature = signature
+
+        if signature[1] < self.position:
+            raise ValueError("Fichier tronqué ou remplacé : recalcul complet nécessaire.")
+
+        with open(self.chemin, "rb") as f:
+            f.seek(self.position)
+            bloc = f.read()
+
+        # On ne lit que les lignes complètes ; la fin éventuelle sera relue au prochain appel
+        fin = bloc.rfind(b"\n") + 1
+        if fin == 0:
+            return None
+        self.position += fin
+
+        return lire_releves(io.BytesIO(self.entete + bloc[:fin]))
@@ -0,0 +1,184 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grille_journaliere import construire_grille
+from prep_data import charger_releves
+
+
+DOSSIER_CACHE = Path.home() / ".salagou" / "cache"
+
+# Le 29 février a sa propre colonne : les années non bissextiles y ont NaN
+NB_JOURS_AN = 366
+JOUR_29_FEVRIER = 59
+
+# Part maximale de jours manquants d'une année candidate, sur la période de
+# référence comme sur la période de prévision : au-delà, l'interpolation de
+# _completer invente une trop grande partie de la trajectoire
+LACUNES_MAX = 0.10
+
+
+def matrice_annee_jour(grille, variable="VOLUME"):
+    """
+    Matrice années × jours de l'année d'une variable journalière.
+
+    Paramètres:
+        grille (GrilleJournaliere): Série journalière d'une station.
+        variable (str): Variable à extraire (VOLUME, COTE, ...).
+
+    Retour:
+        tuple: (annees (np.ndarray), matrice (n_annees, 366)), NaN pour les jours absents.
+    """
+    dates = grille.dates
+    valeurs = np.asarray(grille.valeurs[variable], dtype=float)
+
+    annees_jour = dates.astype("datetime64[Y]").astype(int) + 1970
+    jour = (dates - dates.astype("datetime64[Y]")).astype(int)  # 0 = 1er janvier
+
+    # Décalage d'un jour après le 28 février des années non bissextiles
+    bissextile = (annees_jour % 4 == 0) & ((annees_jour % 100 != 0) | (annees_jour % 400 == 0))
+    jour = jour + ((~bissextile) & (jour >= JOUR_29_FEVRIER))
+
+    annees = np.arange(annees_jour.min(), annees_jour.max() + 1)
+    matrice = np.full((len(annees), NB_JOURS_AN), np.nan)
+    matrice[annees_jour - annees[0], jour] = valeurs
+    return annees, matrice
+
+
+def charger_matrice(chemin_fichier, code_station=34, variable="VOLUME", dossier_cache=None):
+    """
+    Matrice années × jours d'une station, mise en cache sur disque.
+
+    Le cache est indexé par la taille et la date de modification du fichier
+    source : il est reconstruit automatiquement si les données changent.
+    """
+    dossier_cache = Path(dossier_cache) if dossier_cache is not None else DOSSIER_CACHE
+    stat = os.stat(chemin_fichier)
+    cle = f"{Path(chemin_fichier).stem}_{code_station}_{variable}_{stat.st_size}_{stat.st_mtime_ns}"
+    chemin_cache = dossier_cache / f"analogues_{cle}.npz"
+
+    if chemin_cache.exists():
+        with np.load(chemin_cache) as cache:
+            return cache["annees"], cache["matrice"]
+
+    data = charger_releves(chemin_fichier, code_station, date_debut=0, date_fin=9999)
+    annees, matrice = matrice_annee_jour(construire_grille(data, code_station), variable)
+
+    try:
+        dossier_cache.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(chemin_cache, annees=annees, matrice=matrice)
+    except OSError as e:
+        print(f"Cache des années analogues non écrit : {e}")
+    return annees, matrice
+
+
+def _completer(matrice):
+    """Comble les jours manquants par interpolation linéaire le long de l'année."""
+    return pd.DataFrame(matrice).interpolate(axis=1, limit_direction="both").to_numpy()
+
+
+def _taux_lacunes(matrice, debut, fin):
+    """Part des jours manquants de chaque année, jours debut à fin inclus (29 février exclu)."""
+    jours = np.arange(debut, fin + 1)
+    jours = jours[jours != JOUR_29_FEVRIER]
+    return np.isnan(matrice[:, jours]).mean(axis=1)
+
+
+def _distance_dtw(reference, candidats, bande):
+    """
+    Distance DTW (bande de Sakoe-Chiba) entre une trajectoire et plusieurs
+    candidates à la fois : la récurrence est parcourue une fois, chaque
+    cellule étant calculée pour toutes les candidates simultanément.
+    """
+    n_cand, longueur = candidats.shape
+    # Deux lignes de la matrice de coût suffisent (ligne précédente / courante)
+    precedente = np.full((n_cand, longueur + 1), np.inf)
+    precedente[:, 0] = 0.0
+    for i in range(1, longueur + 1):
+        courante = np.full((n_cand, longueur + 1), np.inf)
+        for j in range(max(1, i - bande), min(longueur, i + bande) + 1):
+            d = (reference[i - 1] - candidats[:, j - 1]) ** 2
+            courante[:, j] = d + np.minimum(
+                np.minimum(precedente[:, j - 1], precedente[:, j]), courante[:, j - 1]
+            )
+        precedente = courante
+    return np.sqrt(precedente[:, longueur] / longueur)
+
+
+def position_courante(annees, matrice):
+    """Dernière année renseignée et indice de son dernier jour connu."""
+    renseigne = ~np.isnan(matrice)
+    ligne = int(np.flatnonzero(renseigne.any(axis=1))[-1])
+    return int(annees[ligne]), int(np.flatnonzero(renseigne[ligne])[-1])
+
+
+def rechercher_analogues(annees, matrice, annee_courante, jour, n=5, bande_dtw=None,
+                         lacunes_max=LACUNES_MAX):
+    """
+    Années passées dont la trajectoire du 1er janvier au jour `jour` est la
+    plus proche de l'année courante.
+
+    Paramètres:
+        annees, matrice: Sortie de matrice_annee_jour / charger_matrice.
+        annee_courante (int): Année de référence.
+        jour (int): Dernier jour connu (indice 0-365 de la matrice).
+        n (int): Nombre d'années analogues retenues.
+        bande_dtw (int, optional): Demi-largeur de bande (jours) pour une distance DTW ;
+            par défaut distance quadratique moyenne jour à jour.
+        lacunes_max (float): Part maximale de jours manquants d'une candidate
+            avant et après `jour` (défaut LACUNES_MAX).
+
+    Retour:
+        pd.DataFrame: Colonnes ANNEE et DISTANCE, triées par distance croissante.
+    """
+    ligne = int(np.flatnonzero(annees == annee_courante)[0])
+    reference = matrice[ligne, :jour + 1]
+
+    # Candidates : années passées complètes (à lacunes_max près) sur les périodes de référence et de prévision
+    passe = np.arange(len(annees)) != ligne
+    complete = ((_taux_lacunes(matrice, 0, jour) <= lacunes_max)
+                & (_taux_lacunes(matrice, jour, NB_JOURS_AN - 1) <= lacunes_max))
+    candidates = np.flatnonzero(passe & complete & (annees < annee_courante))
+    if candidates.size == 0:
+        return pd.DataFrame(columns=["ANNEE", "DISTANCE"])
+
+    trajectoires = matrice[candidates, :jour + 1]
+    if bande_dtw is None:
+        distances = np.sqrt(np.nanmean((trajectoires - reference) ** 2, axis=1))
+    else:
+        reference = _completer(reference[None, :])[0]
+        distances = _distance_dtw(reference, _completer(trajectoires), int(bande_dtw))
+
+    resultat = pd.DataFrame({"ANNEE": annees[candidates], "DISTANCE": distances})
+    return resultat.dropna().sort_values("DISTANCE").head(n).reset_index(drop=True)
+
+
+def eventail_prevision(annees, matrice, analogues, annee_courante, jour):
+    """
+    Prolongement des années analogues après le jour `jour`, recalé sur la
+    dernière valeur connue de l'année courante.
+
+    Retour:
+        pd.DataFrame: Index = dates de l'année courante après `jour`,
+            une colonne par année analogue.
+    """
+    ligne = int(np.flatnonzero(annees == annee_courante)[0])
+    valeur_courante = _completer(matrice[ligne:ligne + 1, :jour + 1])[0, -1]
+
+    lignes = np.searchsorted(annees, analogues["ANNEE"].to_numpy())
+    suites = _completer(matrice[lignes])
+    suites = valeur_courante + suites[:, jour + 1:] - suites[:, [jour]]
+
+    # Jours de l'année courante (sans la colonne du 29 février si non bissextile)
+    jours = np.arange(jour + 1, NB_JOURS_AN)
+    debut = np.datetime64(f"{annee_courante}-01-01")
+    bissextile = pd.Timestamp(debut).is_leap_year
+    if not bissextile:
+        garder = jours != JOUR_29_FEVRIER
+        jours, suites = jours[garder], suites[:, garder]
+        jours = jours - (jours > JOUR_29_FEVRIER)
+    dates = pd.to_datetime(debut + jours)
+
+    return pd.DataFrame(suites.T, index=dates, columns=analogues["ANNEE"].to_numpy())
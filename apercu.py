@@ -0,0 +1,194 @@
+"""
+Aperçu en direct des indicateurs : recalcul en arrière-plan à chaque
+modification des percentiles, cotes min/max ou lâchures, sans passer par
+« Valider indicateurs ».
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bootstrap import intervalles_confiance
+from interpolation import cote_to_volume, volumes_to_cotes
+from periodes import SCHEMAS, agreger_periodes, agregats_depuis_mensuel, indicateurs_periodes
+from prep_data import calculs_journaliers
+
+
+class ApercuIndicateurs:
+    """
+    Calcul des indicateurs de l'aperçu dans un thread unique, avec une
+    étape en cache par niveau de dépendance :
+        - agrégats par période : données, % climatiques et découpage ;
+        - quantiles sans lâchure : agrégats et percentiles ;
+        - lâchures, cotes min/max et conversion en cote : refaits à chaque
+          aperçu (quelques opérations sur 2 × n_périodes valeurs).
+    Changer une lâchure ou une cote ne recalcule donc aucune quantile.
+
+    Les intervalles bootstrap ne font pas partie de l'aperçu : ils sont
+    demandés à part (soumettre_intervalles), une fois l'aperçu affiché, et
+    passent après lui dans le même thread.
+
+    Chaque demande porte un numéro de génération. invalider() en ouvre une
+    nouvelle : les demandes plus anciennes encore en file sont sautées, et
+    leurs résultats sont à ignorer (est_a_jour).
+
+    Les paramètres sont relevés dans le thread de l'interface (les variables
+    Tk ne sont pas lues depuis le thread de calcul) : voir calculer.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apercu")
+        # Étape -> (sources, paramètres, valeur) du dernier calcul
+        self._caches = {}
+
+    def invalider(self):
+        """Nouvelle génération : les calculs en cours ou en file deviennent obsolètes."""
+        self.generation += 1
+        return self.generation
+
+    def est_a_jour(self, generation):
+        return generation == self.generation
+
+    def soumettre(self, parametres):
+        """
+        Calcul de l'aperçu dans le thread de calcul.
+
+        Retour:
+            tuple: (génération, Future dont le résultat est celui de calculer,
+                ou None si la demande était déjà obsolète à son tour).
+        """
+        generation = self.invalider()
+        return generation, self._executeur.submit(self._executer, generation, parametres)
+
+    def soumettre_intervalles(self, generation, parametres):
+        """
+        Intervalles de l'aperçu de génération `generation`, calculés après lui.
+
+        Retour:
+            Future: (df_bas, df_haut) au format de 'res', ou None si une
+                saisie plus récente a rendu la demande obsolète.
+        """
+        return self._executeur.submit(self._executer_intervalles, generation, parametres)
+
+    def fermer(self):
+        self.invalider()
+        self._executeur.shutdown(wait=False, cancel_futures=True)
+
+    def _executer(self, generation, parametres):
+        if not self.est_a_jour(generation):
+            return None
+        return self.calculer(parametres)
+
+    def _executer_intervalles(self, generation, parametres):
+        if not self.est_a_jour(generation):
+            return None
+        return self.intervalles(parametres)
+
+    def _etape(self, nom, sources, cle, calcul):
+        """Valeur en cache si les sources (par identité) et la clé sont inchangées."""
+        entree = self._caches.get(nom)
+        if (entree is not None and entree[1] == cle and len(entree[0]) == len(sources)
+                and all(a is b for a, b in zip(entree[0], sources))):
+            return entree[2]
+        valeur = calcul()
+        self._caches[nom] = (sources, cle, valeur)
+        return valeur
+
+    def calculer(self, p):
+        """
+        Indicateurs et seuils de l'aperçu (sans intervalles).
+
+        Paramètres:
+            p (dict): Relevé des paramètres de l'application :
+                'debut_mois', 'entree_clim', 'evap_clim' (tableaux longs),
+                'df_filtered' (relevés de la plage), 'evap_pct', 'entree_pct',
+                'schema' (nom dans SCHEMAS), 'percentiles' (p1, p2 entre 0 et 1),
+                'lachures' (12 valeurs), 'cote_min', 'cote_max', 'mode'
+                ('volume' ou 'cote'), 'code_station' et 'cle_intervalles'
+                (clé du cache bootstrap, voir intervalles).
+
+        Retour:
+            dict : 'tableau' (format de self.df_indicateurs), 'res' (index =
+                percentiles, colonnes = périodes), 'vmin', 'vmax', 'unite',
+                'xlabel', 'intervalles' (None, voir soumettre_intervalles) et
+                'duree' (temps de calcul, s).
+        """
+        debut = time.perf_counter()
+        schema = SCHEMAS[p["schema"]]
+        p1, p2 = p["percentiles"]
+        climat = (p["evap_pct"], p["entree_pct"], schema.nom)
+
+        if schema.mensuel:
+            sources = (p["debut_mois"], p["entree_clim"], p["evap_clim"])
+            agregats = self._etape("agregats", sources, climat, lambda: agregats_depuis_mensuel(
+                *sources, schema
+            ))
+        else:
+            sources = (p["df_filtered"],)
+            agregats = self._etape("agregats", sources, climat, lambda: agreger_periodes(
+                calculs_journaliers(p["df_filtered"], p["evap_pct"], p["entree_pct"]), schema
+            ))
+
+        # Indicateurs sans lâchure, déjà décalés d'une période
+        base = self._etape("quantiles", (agregats,), (p1, p2), lambda: indicateurs_periodes(
+            agregats, schema, [p1, p2]
+        ))
+        # Même calcul que indicateurs_periodes : roll(base - lach) = roll(base) - roll(lach)
+        valeurs = base - np.roll(schema.repartir_lachures(p["lachures"]), 1)
+
+        vmin, vmax = p["cote_min"], p["cote_max"]
+        if p["mode"] == "cote":
+            valeurs = volumes_to_cotes(valeurs, code=p["code_station"]).round(2)
+            unite = "Cote (mNGF)"
+        else:
+            valeurs = valeurs.round(0)
+            if not np.isnan(valeurs).any():
+                valeurs = valeurs.astype(int)
+            vmin = cote_to_volume(vmin, code=p["code_station"])
+            vmax = cote_to_volume(vmax, code=p["code_station"])
+            unite = "Volume (m³)"
+
+        tableau = pd.DataFrame({
+            schema.libelle: schema.etiquettes,
+            f"q {p1}": valeurs[0],
+            f"q {p2}": valeurs[1]
+        })
+        res = tableau.set_index(schema.libelle).T
+
+        return {
+            "tableau": tableau,
+            "res": res,
+            "vmin": vmin,
+            "vmax": vmax,
+            "unite": unite,
+            "xlabel": schema.libelle,
+            "intervalles": None,
+            "duree": time.perf_counter() - debut
+        }
+
+    def intervalles(self, p):
+        """
+        Intervalles bootstrap des indicateurs de l'aperçu (paramètres de
+        calculer), en cache par p['cle_intervalles'] : seul le premier appel
+        pour des données et % donnés agrège les relevés et fait les tirages.
+
+        Retour:
+            tuple: (df_bas, df_haut), index = percentiles, colonnes = périodes.
+        """
+        schema = SCHEMAS[p["schema"]]
+        p1, p2 = p["percentiles"]
+        climat = (p["evap_pct"], p["entree_pct"], schema.nom)
+        bas, haut = intervalles_confiance(
+            lambda: self._etape("agregats_journaliers", (p["df_filtered"],), climat, lambda: agreger_periodes(
+                calculs_journaliers(p["df_filtered"], p["evap_pct"], p["entree_pct"]), schema
+            )),
+            schema, [p1, p2], p["lachures"], cle=p["cle_intervalles"]
+        )
+        if p["mode"] == "cote":
+            bas = volumes_to_cotes(bas, code=p["code_station"])
+            haut = volumes_to_cotes(haut, code=p["code_station"])
+        index = [f"q {p1}", f"q {p2}"]
+        return (pd.DataFrame(bas, index=index, columns=schema.etiquettes),
+                pd.DataFrame(haut, index=index, columns=schema.etiquettes))
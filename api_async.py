@@ -0,0 +1,172 @@
+"""
+API asynchrone autour des fonctions de calcul, pour les études de scénarios
+scriptées (notebooks, outils internes).
+
+Exemple :
+    async with APIAsync(max_concurrence=4) as api:
+        resultats = await api.scenarios("data/data_barr_full.csv", [
+            {"code_station": 34, "evap_pct": e / 100, "entree_pct": 0.10}
+            for e in range(0, 30, 5)
+        ])
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+import matplotlib.pyplot as plt
+
+from comparaison import indicateurs_station
+from prep_data import charger_releves, simuler_salagou
+from prep_graph import tracer_faconnage
+
+
+def _simuler_copie(data, evap_pct, entree_pct):
+    # simuler_salagou modifie son entrée : les appels concurrents travaillent sur une copie
+    return simuler_salagou(data.copy(), evap_pct, entree_pct)
+
+
+def _tracer_png(df_res, parametres):
+    fig = tracer_faconnage(df_res, **parametres)
+    tampon = io.BytesIO()
+    fig.savefig(tampon, format="png")
+    plt.close(fig)
+    return tampon.getvalue()
+
+
+def _cle_hachable(valeur):
+    """Clé de déduplication : les objets non hachables (DataFrames, listes) sont pris par identité."""
+    if isinstance(valeur, (list, tuple)):
+        return tuple(_cle_hachable(v) for v in valeur)
+    if isinstance(valeur, dict):
+        return tuple(sorted((k, _cle_hachable(v)) for k, v in valeur.items()))
+    try:
+        hash(valeur)
+        return valeur
+    except TypeError:
+        return ("id", id(valeur))
+
+
+class APIAsync:
+    """
+    Façade asynchrone des calculs (chargement, simulation, indicateurs, graphiques).
+
+    - Le calcul est déporté dans un exécuteur (threads par défaut, processus si
+      processus=True) : la boucle d'événements n'est jamais bloquée.
+    - Deux requêtes identiques en cours partagent le même calcul.
+    - Un sémaphore limite le nombre de calculs lourds simultanés : les
+      requêtes en surplus attendent leur tour sans encombrer l'exécuteur.
+
+    Paramètres:
+        max_concurrence (int): Nombre maximal de calculs simultanés.
+        max_workers (int, optional): Taille de l'exécuteur, par défaut max_concurrence.
+        processus (bool): ProcessPoolExecutor au lieu de threads (calculs longs, hors graphiques).
+        taille_cache_donnees (int): Nombre de relevés chargés gardés en mémoire.
+    """
+
+    def __init__(self, max_concurrence=4, max_workers=None, processus=False, taille_cache_donnees=8):
+        self.max_concurrence = max_concurrence
+        classe = ProcessPoolExecutor if processus else ThreadPoolExecutor
+        self.executeur = classe(max_workers=max_workers or max_concurrence)
+        self._semaphore = None
+        self._verrou_graphique = None
+        self._en_cours = {}
+        self._donnees = {}
+        self._taille_cache_donnees = taille_cache_donnees
+        self.nb_calculs = 0
+        self.nb_dedupliques = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.afermer()
+
+    async def afermer(self):
+        """fermer() sans bloquer la boucle : l'attente des calculs se fait dans un thread."""
+        await asyncio.get_running_loop().run_in_executor(None, self.fermer)
+
+    def fermer(self):
+        """Arrêt de l'exécuteur, après la fin des calculs en cours (hors boucle d'événements)."""
+        self.executeur.shutdown(wait=True)
+
+    def _primitives(self):
+        # Créées à la première utilisation, dans la boucle d'événements appelante
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrence)
+            self._verrou_graphique = asyncio.Lock()
+
+    async def _executer(self, cle, fonction, *args):
+        """Exécute fonction(*args) dans l'exécuteur, une seule fois par clé en cours."""
+        self._primitives()
+        cle = _cle_hachable(cle)
+        tache = self._en_cours.get(cle)
+        if tache is not None:
+            self.nb_dedupliques += 1
+            # shield : l'annulation d'un demandeur n'annule pas le calcul partagé
+            return await asyncio.shield(tache)
+
+        async def calcul():
+            async with self._semaphore:
+                self.nb_calculs += 1
+                boucle = asyncio.get_running_loop()
+                return await boucle.run_in_executor(self.executeur, partial(fonction, *args))
+
+        tache = asyncio.ensure_future(calcul())
+        self._en_cours[cle] = tache
+        tache.add_done_callback(lambda _: self._en_cours.pop(cle, None))
+        return await asyncio.shield(tache)
+
+    @property
+    def en_cours(self):
+        """Nombre de calculs distincts en cours ou en attente du sémaphore."""
+        return len(self._en_cours)
+
+    async def charger_donnees(self, chemin, code_station=34, date_debut=1997, date_fin=2025):
+        """Relevés d'une station (voir prep_data.charger_releves), gardés en mémoire."""
+        stat = os.stat(chemin)
+        cle = ("charger", os.path.abspath(chemin), stat.st_size, stat.st_mtime_ns,
+               code_station, date_debut, date_fin)
+        if cle in self._donnees:
+            return self._donnees[cle]
+
+        data = await self._executer(cle, charger_releves, chemin, code_station, date_debut, date_fin)
+        self._donnees[cle] = data
+        while len(self._donnees) > self._taille_cache_donnees:
+            self._donnees.pop(next(iter(self._donnees)))
+        return data
+
+    async def simuler_salagou(self, data, evap_pct=0.10, entree_pct=0.10):
+        """prep_data.simuler_salagou (sans modifier `data`)."""
+        return await self._executer(("simuler", data, evap_pct, entree_pct),
+                                    _simuler_copie, data, evap_pct, entree_pct)
+
+    async def indicateurs(self, chemin, code_station=34, date_debut=1997, date_fin=2025, **parametres):
+        """Indicateurs par période d'une station (voir comparaison.indicateurs_station)."""
+        data = await self.charger_donnees(chemin, code_station, date_debut, date_fin)
+        return await self._executer(
+            ("indicateurs", data, code_station, parametres),
+            partial(indicateurs_station, data=data, date_debut=date_debut, date_fin=date_fin, **parametres),
+            chemin, code_station
+        )
+
+    async def tracer_faconnage(self, df_res, **parametres):
+        """prep_graph.tracer_faconnage, rendu en PNG (octets)."""
+        self._primitives()
+        # pyplot n'est pas sûr entre threads : un seul rendu à la fois
+        async with self._verrou_graphique:
+            return await self._executer(("graphique", df_res, parametres), _tracer_png, df_res, parametres)
+
+    async def scenarios(self, chemin, configurations, retourner_exceptions=False):
+        """
+        Indicateurs pour une liste de configurations (dict de paramètres de
+        indicateurs), calculés en parallèle dans la limite de max_concurrence.
+
+        Retour:
+            list: Résultats dans l'ordre des configurations.
+        """
+        return await asyncio.gather(
+            *(self.indicateurs(chemin, **configuration) for configuration in configurations),
+            return_exceptions=retourner_exceptions
+        )
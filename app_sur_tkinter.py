@@ -1,7 +1,11 @@
 #%% Imports
 import sys, os
+import time
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk  
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
@@ -12,17 +16,58 @@ import mplcursors
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 
-from interpolation import cote_to_volume, volume_to_cote
-from prep_data import charger_donnees, simuler_salagou
-from prep_graph import tracer_faconnage
+from interpolation import cote_to_volume, volume_to_cote, volumes_to_cotes, prechauffer_interpolation
+from prep_data import charger_releves, lire_releves, simuler_salagou, calculs_journaliers
+from periodes import SCHEMAS, agreger_periodes, agregats_depuis_mensuel, indicateurs_periodes
+from prep_graph import (tracer_faconnage, tracer_comparaison, tracer_tendances, base_indicateurs,
+                        dessiner_faconnage)
+from validation import verifier_coherence
+from stations import REGISTRE_STATIONS, station_par_code
+from comparaison import comparer_stations, fermer_pool
+from service import connecter_service
+from session import (DOSSIER_SESSIONS, DERNIERE_SESSION, EXTENSION, charger_session,
+                     enregistrer_session, lire_entete, sessions_recentes, source_inchangee)
+from agregats_incrementaux import AgregatsMensuels, SuiviFichier
+from optimisation_lachures import optimiser_lachures
+from bootstrap import intervalles_confiance
+from index_cumule import IndexCumule
+from tendances import cube_tendances
+from prechauffage import Prechauffage, prerendu_figure
+from apercu import ApercuIndicateurs
+from diagnostic import (DOSSIER_DIAGNOSTIC, armer_profilage, desarmer_profilage,
+                        profilage_actif, profiler_action)
+from grille_journaliere import construire_grille
+from statistiques_depassement import synthese_depassements
+from annees_analogues import charger_matrice, position_courante, rechercher_analogues, eventail_prevision
 
 
 class SalagouApp:
+    # Tableaux de dépassement des cotes min/max (clé de synthese_depassements)
+    CHOIX_DEPASSEMENTS = {
+        "Jours sous cote min": "jours_sous_min",
+        "Jours au-dessus cote max": "jours_sur_max",
+        "Dépassements (synthèse annuelle)": "annuelle"
+    }
+    # Nombre d'actions profilées quand le profilage est activé (menu Diagnostic)
+    NB_ACTIONS_PROFILEES = 5
+    # Suivi du fichier : intervalle entre deux vérifications (ms), espacé après un échec
+    DELAI_SUIVI_MS = 2000
+    DELAI_SUIVI_MAX_MS = 60000
+    MAX_ECHECS_SUIVI = 5
+    # Aperçu en direct : attente après la dernière frappe, et durée visée du calcul au tracé (ms)
+    DELAI_APERCU_MS = 150
+    BUDGET_APERCU_MS = 50
+
     def __init__(self, root):
         self.root = root
         self.root.title("Simulation Barrage")
         self.root.state("zoomed")  # Windows
         self.root.minsize(800, 600)
+        # Service local (python service.py) : données et résultats déjà en mémoire
+        self.service = connecter_service()
+        if self.service is not None:
+            print(f"Service local utilisé : {self.service.url}")
+
         # ---------------- Notebook principal ----------------
         self.notebook = tb.Notebook(self.root)
         self.notebook.pack(fill="both", expand=True)
@@ -34,10 +79,72 @@ class SalagouApp:
         self.notebook.add(self.tab_simulation, text="Récupération des données")
         self.notebook.add(self.tab_indicateurs, text="Indicateurs du barrage")
 
+        self.filepath = None
+        self.results = None
+
         # Construire les interfaces
+        self.build_menu()
         self.build_tab_simulation()
         self.build_tab_indicateurs()
 
+        # Reprise de la dernière session, sauvegardée à la fermeture
+        self.root.after(200, self.restaurer_derniere_session)
+
+        # Puis préchauffage (CSV, tables HSV, rendu) dès que l'interface est inactive
+        self.prechauffage = None
+        self.root.after(500, lambda: self.root.after_idle(self.demarrer_prechauffage))
+
+    def build_menu(self):
+        menubar = tk.Menu(self.root)
+        menu_session = tk.Menu(menubar, tearoff=0)
+        menu_session.add_command(label="Enregistrer la session", command=self.sauvegarder_session)
+        menu_session.add_command(label="Ouvrir une session...", command=self.ouvrir_session)
+        self.menu_sessions_recentes = tk.Menu(menu_session, tearoff=0, postcommand=self.maj_sessions_recentes)
+        menu_session.add_cascade(label="Sessions récentes", menu=self.menu_sessions_recentes)
+        menubar.add_cascade(label="Session", menu=menu_session)
+
+        # Profilage des prochaines actions (fichiers à transmettre en cas de lenteur)
+        self.profilage = tk.BooleanVar(value=False)
+        menu_diagnostic = tk.Menu(menubar, tearoff=0,
+                                  postcommand=lambda: self.profilage.set(profilage_actif()))
+        menu_diagnostic.add_checkbutton(label=f"Profiler les {self.NB_ACTIONS_PROFILEES} prochaines actions",
+                                        variable=self.profilage, command=self.basculer_profilage)
+        menu_diagnostic.add_command(label="Ouvrir le dossier de diagnostic", command=self.ouvrir_dossier_diagnostic)
+        menubar.add_cascade(label="Diagnostic", menu=menu_diagnostic)
+        self.root.config(menu=menubar)
+
+    def demarrer_prechauffage(self):
+        """
+        Lance en arrière-plan la lecture du dernier fichier utilisé, les
+        interpolateurs HSV des stations et un rendu de figure hors écran.
+        Chaque clic ou touche repousse la tâche suivante.
+        """
+        self.prechauffage = Prechauffage()
+        if (self.service is None and self.filepath and str(self.filepath).lower().endswith(".csv")
+                and os.path.exists(self.filepath)):
+            self.prechauffage.ajouter("relevés", lire_releves, self.filepath)
+        for infos in REGISTRE_STATIONS.values():
+            self.prechauffage.ajouter(f"HSV {infos['code']}", prechauffer_interpolation, infos["code"])
+        self.prechauffage.ajouter("graphique", prerendu_figure)
+
+        self.root.bind_all("<ButtonPress>", self.prechauffage.signaler_activite, add="+")
+        self.root.bind_all("<KeyPress>", self.prechauffage.signaler_activite, add="+")
+        self.prechauffage.demarrer()
+
+    def basculer_profilage(self):
+        if self.profilage.get():
+            armer_profilage(self.NB_ACTIONS_PROFILEES)
+            print(f"Profilage des {self.NB_ACTIONS_PROFILEES} prochaines actions : {DOSSIER_DIAGNOSTIC}")
+        else:
+            desarmer_profilage()
+
+    def ouvrir_dossier_diagnostic(self):
+        DOSSIER_DIAGNOSTIC.mkdir(parents=True, exist_ok=True)
+        if hasattr(os, "startfile"):  # Windows
+            os.startfile(DOSSIER_DIAGNOSTIC)
+        else:
+            messagebox.showinfo("Diagnostic", f"Fichiers de diagnostic : {DOSSIER_DIAGNOSTIC}", parent=self.root)
+
     # ------------------------------------------------------------------
     # Onglet 1 : Simulation
     # ------------------------------------------------------------------
@@ -68,10 +175,7 @@ class SalagouApp:
         self.code_station = tb.IntVar(value=34)
 
         # Dictionnaire pour mapper les noms de stations aux codes
-        self.stations_dict = {
-            "Salagou": 34,
-            "Olivettes": 32
-        }
+        self.stations_dict = {nom: infos["code"] for nom, infos in REGISTRE_STATIONS.items()}
 
         self.nom_station = tb.StringVar()
         self.station_combobox = tb.Combobox(self.left_frame, textvariable=self.nom_station)
@@ -124,6 +228,46 @@ class SalagouApp:
             row=16, column=0, pady=3, sticky="ew"
         )
 
+        # Suivi du fichier : les relevés ajoutés sont intégrés automatiquement
+        self.suivi_auto = tk.BooleanVar(value=False)
+        tb.Checkbutton(
+            self.left_frame,
+            text="Suivi automatique du fichier",
+            variable=self.suivi_auto,
+            command=self.basculer_suivi,
+            bootstyle="round-toggle"
+        ).grid(row=17, column=0, pady=3, sticky="w")
+
+        # Prévision par années analogues sur le graphique des volumes
+        self.afficher_analogues = tk.BooleanVar(value=False)
+        tb.Checkbutton(
+            self.left_frame,
+            text="Prévision par années analogues",
+            variable=self.afficher_analogues,
+            bootstyle="round-toggle"
+        ).grid(row=18, column=0, pady=3, sticky="w")
+
+        # Plage d'années modifiable en direct (après une simulation)
+        self.index_cumule = None
+        self.index_cle = None
+        # Index déjà construits, par (fichier, station, version du fichier)
+        self._index_stations = {}
+        # Agrégats du suivi à refaire sur la plage courante (voir verifier_fichier)
+        self._suivi_perime = False
+        self._maj_curseurs = False
+        self._plage_id = None
+        tb.Label(self.left_frame, text="Plage d'années (en direct) :").grid(row=19, column=0, sticky="w", pady=3)
+        self.curseur_debut = tb.Scale(self.left_frame, orient="horizontal", from_=1990, to=2030,
+                                      command=self.curseur_annees)
+        self.curseur_debut.grid(row=20, column=0, sticky="ew", pady=3)
+        self.curseur_fin = tb.Scale(self.left_frame, orient="horizontal", from_=1990, to=2030,
+                                    command=self.curseur_annees)
+        self.curseur_fin.grid(row=21, column=0, sticky="ew", pady=3)
+        for curseur in (self.curseur_debut, self.curseur_fin):
+            curseur.state(["disabled"])
+        self.libelle_plage = tb.Label(self.left_frame, text="")
+        self.libelle_plage.grid(row=22, column=0, sticky="w", pady=3)
+
         # ================== Panneau droit : visualisations ==================
         self.right_frame = tb.Frame(self.main_pane, padding=10)
         self.right_frame.grid_columnconfigure(0, weight=1)
@@ -194,8 +338,10 @@ class SalagouApp:
         self.download_graph_btn.pack(side="left", padx=5)
 
     # ================== Fonction export ==================
+    @profiler_action
     def export_table(self):
-        if not hasattr(self, "canvas") or self.canvas is None:
+        # Le tableau peut être affiché sans graphique (synthèse annuelle) : on regarde le Treeview
+        if not self.tree.get_children():
             messagebox.showwarning("Attention", "Aucun tableau à exporter.", parent=self.root)
             return
         # Récupérer les données du Treeview
@@ -221,6 +367,7 @@ class SalagouApp:
                 # CSV : préciser l'encodage UTF-8 pour les caractères spéciaux
                 df.to_csv(file_path, index=False, sep=";", encoding="utf-8-sig")
     
+    @profiler_action
     def export_graph(self):
         if not hasattr(self, "canvas") or self.canvas is None:
             messagebox.showwarning("Attention", "Aucun graphique à exporter.", parent=self.root)
@@ -291,15 +438,57 @@ class SalagouApp:
         tb.Label(frame_params, text="Cote maximale :").grid(row=1, column=2, sticky="e", padx=5, pady=3)
         tb.Entry(frame_params, textvariable=self.cote_max, width=8).grid(row=1, column=3, sticky="w", padx=5, pady=3)
 
+        # Découpage de l'année pour les indicateurs
+        self.schema_periodes = tk.StringVar(value="Mois")
+        tb.Label(frame_params, text="Découpage :").grid(row=2, column=0, sticky="e", padx=5, pady=3)
+        tb.Combobox(frame_params, textvariable=self.schema_periodes, values=list(SCHEMAS),
+                    state="readonly", width=28).grid(row=2, column=1, columnspan=3, sticky="w", padx=5, pady=3)
+        self.schema_periodes.trace_add(
+            "write", lambda *args: self.display_graph() if hasattr(self, "df_deb_mois_long") else None
+        )
+
+        # Intervalles de confiance bootstrap autour des courbes
+        self.afficher_intervalles = tk.BooleanVar(value=False)
+        tb.Checkbutton(frame_params, text="Intervalles de confiance 90 % (bootstrap)",
+                       variable=self.afficher_intervalles, bootstyle="round-toggle").grid(
+            row=3, column=0, columnspan=4, sticky="w", padx=5, pady=3
+        )
+        self.afficher_intervalles.trace_add(
+            "write", lambda *args: self.display_graph() if hasattr(self, "df_deb_mois_long") else None
+        )
+
+        # Aperçu en direct : tableau et courbes suivent la saisie sans « Valider indicateurs »
+        self.apercu = ApercuIndicateurs()
+        self._apercu_id = None
+        self._fond_apercu = None
+        self.apercu_direct = tk.BooleanVar(value=False)
+        tb.Checkbutton(frame_params, text="Aperçu en direct", variable=self.apercu_direct,
+                       bootstyle="round-toggle").grid(row=4, column=0, columnspan=4, sticky="w", padx=5, pady=3)
+        for var in [self.percentile_bas, self.percentile_haut, self.cote_min, self.cote_max, *self.lachures_vars]:
+            var.trace_add("write", self.programmer_apercu)
+
         # Bouton validation
-        tb.Button(self.tab_indicateurs, text="Valider indicateurs", bootstyle="success",
-                  command=self.valider_indicateurs).grid(row=2, column=0, pady=10)
+        frame_boutons = tb.Frame(self.tab_indicateurs)
+        frame_boutons.grid(row=2, column=0, pady=10)
+        tb.Button(frame_boutons, text="Valider indicateurs", bootstyle="success",
+                  command=self.valider_indicateurs).pack(side="left", padx=5)
+        tb.Button(frame_boutons, text="Optimiser lâchures", bootstyle="success-outline",
+                  command=self.lancer_optimisation).pack(side="left", padx=5)
+        self.bouton_comparer = tb.Button(frame_boutons, text="Comparer les barrages", bootstyle="info-outline",
+                                         command=self.comparer_barrages)
+        self.bouton_comparer.pack(side="left", padx=5)
+        # Comparaison calculée hors du thread de l'interface
+        self._executeur_comparaison = ThreadPoolExecutor(max_workers=1, thread_name_prefix="comparaison")
+        tb.Button(frame_boutons, text="Tendances", bootstyle="info-outline",
+                  command=self.afficher_tendances).pack(side="left", padx=5)
         # Choix du mode volume/cote
         self.mode_indicateurs = tk.StringVar(value="volume")
         frame_mode = tb.Labelframe(self.tab_indicateurs, text="Mode d'affichage", padding=10)
         frame_mode.grid(row=2, column=1, sticky="ew", padx=10, pady=10)
         # Lier la mise à jour automatique du graphique
-        self.mode_indicateurs.trace_add("write", lambda *args: self.display_graph())
+        self.mode_indicateurs.trace_add(
+            "write", lambda *args: self.display_graph() if hasattr(self, "df_deb_mois_long") else None
+        )
 
         tk.Radiobutton(frame_mode, text="Volume (m³)", variable=self.mode_indicateurs,
                        value="volume", command=self.actualiser_indicateurs).pack(side="left", padx=5)
@@ -319,7 +508,11 @@ class SalagouApp:
     def select_file(self):
         filepath = filedialog.askopenfilename(
             parent=self.root,  # <-- obligatoire pour éviter TclError
-            filetypes=[("CSV files", "*.csv")]
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("Base SQLite", "*.db *.sqlite *.sqlite3"),
+                ("Stockage binaire", "index.json")
+            ]
         )   
         if filepath:
             self.filepath = filepath
@@ -333,27 +526,19 @@ class SalagouApp:
             self.code_station.set(self.stations_dict[selected_station])
 
             # Mettre à jour les cotes min/max en fonction de la station
-            if self.code_station.get() == 32:  # Olivettes
-                self.cote_min.set(152)
-                self.cote_max.set(163)
-                if hasattr(self, 'cote_min_entry'):
-                    self.cote_min_entry.delete(0, tk.END)
-                    self.cote_min_entry.insert(0, "152")
-                if hasattr(self, 'cote_max_entry'):
-                    self.cote_max_entry.delete(0, tk.END)
-                    self.cote_max_entry.insert(0, "163")
-            else:  # Salagou
-                self.cote_min.set(137)
-                self.cote_max.set(139)
-                if hasattr(self, 'cote_min_entry'):
-                    self.cote_min_entry.delete(0, tk.END)
-                    self.cote_min_entry.insert(0, "137")
-                if hasattr(self, 'cote_max_entry'):
-                    self.cote_max_entry.delete(0, tk.END)
-                    self.cote_max_entry.insert(0, "139")
+            infos = REGISTRE_STATIONS[selected_station]
+            self.cote_min.set(infos["cote_min"])
+            self.cote_max.set(infos["cote_max"])
+            if hasattr(self, 'cote_min_entry'):
+                self.cote_min_entry.delete(0, tk.END)
+                self.cote_min_entry.insert(0, str(infos["cote_min"]))
+            if hasattr(self, 'cote_max_entry'):
+                self.cote_max_entry.delete(0, tk.END)
+                self.cote_max_entry.insert(0, str(infos["cote_max"]))
 
             print(f"Station sélectionnée: {selected_station}, Code: {self.code_station.get()}")
 
+    @profiler_action
     def save_graphique(self):
     # Ouvrir une boîte de dialogue pour choisir le fichier
         if hasattr(self, "fig"):
@@ -364,40 +549,254 @@ class SalagouApp:
         if file_path:
             self.fig.savefig(file_path)
             
+    @profiler_action
     def run_simulation(self):
         if not self.filepath:
             messagebox.showerror("Erreur", "Veuillez sélectionner un fichier CSV.", parent=self.root)
             return
         
         try:
-            df = charger_donnees(
-                self.filepath,
-                self.code_station.get(),
-                self.date_debut.get(),
-                self.date_fin.get()
-            )
+            df = self.charger_donnees_station()
             self.df_filtered = df
 
             if df.empty:
                 messagebox.showwarning("Attention", "Aucune donnée trouvée avec ces paramètres.", parent=self.root)
                 return
 
-            self.results = simuler_salagou(
-                df,
-                self.evap_pct.get() / 100,
-                self.entree_pct.get() / 100
-            )
+            # Contrôle de cohérence COTE / VOLUME, lacunes et doublons
+            self.rapport_coherence = verifier_coherence(df)
+            print("Contrôle de cohérence :")
+            print(self.rapport_coherence["resume"].to_string(index=False))
+
+            self.results = self.simuler(df)
+
+            # État incrémental pour le suivi automatique du fichier
+            self.initialiser_suivi(df)
+            # Index cumulé pour les curseurs de plage d'années
+            self.initialiser_index()
 
             self.update_table_choices()
             self.table_choice['values'] = self.table_choices
             self.table_choice.set('')  # Reset choix après simulation
             self.display_selected_table()  # Afficher le tableau par défaut
 
-            messagebox.showinfo("Succès", "Simulation terminée. Choisissez un tableau à afficher.", parent=self.root)
+            message = "Simulation terminée. Choisissez un tableau à afficher."
+            nb_ecarts = len(self.rapport_coherence["ecarts"])
+            if nb_ecarts:
+                message += f"\n\n{nb_ecarts} relevé(s) COTE/VOLUME incohérent(s) avec la table HSV."
+            messagebox.showinfo("Succès", message, parent=self.root)
 
         except Exception as e:
             messagebox.showerror("Erreur", str(e), parent=self.root)
 
+    def charger_donnees_station(self, date_debut=None, date_fin=None):
+        """Relevés de la station (par défaut sur la plage saisie), via le service local s'il est lancé."""
+        parametres = (self.filepath, self.code_station.get(),
+                      self.date_debut.get() if date_debut is None else date_debut,
+                      self.date_fin.get() if date_fin is None else date_fin)
+        if self.service is not None:
+            try:
+                return self.service.charger(*parametres)
+            except PermissionError as e:
+                print(f"Fichier non servi, lecture locale : {e}")
+            except OSError as e:
+                print(f"Service local indisponible, calcul local : {e}")
+                self.service = None
+        return charger_releves(*parametres)
+
+    def simuler(self, df):
+        """simuler_salagou, via le service local (résultats gardés en cache) s'il est lancé."""
+        evap_pct = self.evap_pct.get() / 100
+        entree_pct = self.entree_pct.get() / 100
+        if self.service is not None:
+            try:
+                return self.service.simuler(self.filepath, self.code_station.get(), self.date_debut.get(),
+                                            self.date_fin.get(), evap_pct, entree_pct)
+            except PermissionError as e:
+                print(f"Fichier non servi, calcul local : {e}")
+            except OSError as e:
+                print(f"Service local indisponible, calcul local : {e}")
+                self.service = None
+        return simuler_salagou(df, evap_pct, entree_pct)
+
+    def cle_index(self):
+        """(fichier, station, date et taille du fichier) : change quand le fichier est modifié."""
+        try:
+            stat = os.stat(self.filepath)
+        except (OSError, TypeError):
+            return None
+        return (self.filepath, self.code_station.get(), stat.st_mtime_ns, stat.st_size)
+
+    def initialiser_index(self):
+        """
+        Index cumulé de la station sur toutes les années, et bornes des curseurs.
+        Construit une fois par fichier, station et version du fichier : une
+        nouvelle simulation ou une session restaurée réutilise l'index existant.
+        """
+        cle = self.cle_index()
+        if cle is None:
+            self.index_cumule, self.index_cle = None, None
+            return
+        if cle != self.index_cle or self.index_cumule is None:
+            index = self._index_stations.get(cle)
+            if index is None:
+                try:
+                    index = IndexCumule(self.charger_donnees_station(0, 9999))
+                except Exception as e:
+                    print(f"Index cumulé non construit : {e}")
+                    self.index_cumule, self.index_cle = None, None
+                    return
+                # Un seul index par (fichier, station) : les versions précédentes sont oubliées
+                self._index_stations = {c: i for c, i in self._index_stations.items() if c[:2] != cle[:2]}
+                self._index_stations[cle] = index
+            self.index_cumule, self.index_cle = index, cle
+
+        annees = self.index_cumule.annees
+        self._maj_curseurs = True
+        for curseur, valeur in ((self.curseur_debut, self.date_debut.get()), (self.curseur_fin, self.date_fin.get())):
+            curseur.configure(from_=int(annees[0]) - 1, to=int(annees[-1]) + 1)
+            curseur.state(["!disabled"])
+            curseur.set(valeur)
+        self._maj_curseurs = False
+        self.libelle_plage.config(text=f"{self.date_debut.get()} < année < {self.date_fin.get()}")
+
+    def curseur_annees(self, _valeur):
+        """Déplacement d'un curseur : mise à jour des années, calcul regroupé via after."""
+        if self._maj_curseurs or self.index_cumule is None:
+            return
+        debut = int(round(float(self.curseur_debut.get())))
+        fin = int(round(float(self.curseur_fin.get())))
+        if fin <= debut + 1:
+            return  # au moins une année dans la plage
+        if (debut, fin) == (self.date_debut.get(), self.date_fin.get()):
+            return
+        self.date_debut.set(debut)
+        self.date_fin.set(fin)
+        self.libelle_plage.config(text=f"{debut} < année < {fin}")
+        if self._plage_id:
+            self.root.after_cancel(self._plage_id)
+        self._plage_id = self.root.after(30, self.appliquer_plage)
+
+    def appliquer_plage(self):
+        """Tableaux et graphiques de la nouvelle plage, à partir de l'index cumulé."""
+        self._plage_id = None
+        if self.index_cumule is None or self.index_cle != self.cle_index():
+            self.initialiser_index()  # fichier, station ou relevés changés depuis la construction
+            if self.index_cumule is None:
+                return
+        debut, fin = self.date_debut.get(), self.date_fin.get()
+        results = self.index_cumule.resultats(
+            debut, fin, self.evap_pct.get() / 100, self.entree_pct.get() / 100
+        )
+        if results["donnees_simulees"].empty:
+            return
+        self.results = results
+        self.df_filtered = self.index_cumule.releves(debut, fin)
+        # Agrégats du suivi refaits à la prochaine vérification, pas à chaque déplacement du curseur
+        self._suivi_perime = True
+        self.display_selected_table()
+        if hasattr(self, "df_deb_mois_long"):
+            self.valider_indicateurs()
+
+    def initialiser_suivi(self, df):
+        """Prépare les agrégats incrémentaux et la surveillance du fichier CSV."""
+        self.agregats = AgregatsMensuels(self.evap_pct.get() / 100, self.entree_pct.get() / 100)
+        self.agregats.ajouter(df)
+        if str(self.filepath).lower().endswith(".csv"):
+            self.suivi = SuiviFichier(self.filepath)
+        else:
+            self.suivi = None  # SQLite / stockage binaire : pas de suivi
+        self._suivi_perime = False
+
+    def basculer_suivi(self):
+        if getattr(self, "_suivi_id", None):
+            self.root.after_cancel(self._suivi_id)
+            self._suivi_id = None
+        self._echecs_suivi = 0
+        if self.suivi_auto.get():
+            self._suivi_id = self.root.after(self.DELAI_SUIVI_MS, self.verifier_fichier)
+
+    def verifier_fichier(self):
+        """
+        Intègre les relevés ajoutés au fichier puis rafraîchit tableaux et graphiques.
+
+        Appelée en arrière-plan : aucune boîte de dialogue. Un fichier réécrit
+        est rechargé en entier (recharger_silencieux) ; après un échec, la
+        vérification suivante est espacée, et le suivi s'arrête après
+        MAX_ECHECS_SUIVI échecs consécutifs.
+        """
+        if not self.suivi_auto.get():
+            return
+
+        try:
+            if self._suivi_perime:
+                # Plage changée depuis la dernière vérification : agrégats de la plage courante
+                if self.index_cle != self.cle_index():
+                    self.appliquer_plage()  # relevés ajoutés depuis, repris par l'index
+                self.initialiser_suivi(self.df_filtered)
+
+            nouvelles = None
+            if getattr(self, "suivi", None) is not None:
+                nouvelles = self.suivi.nouvelles_lignes()
+
+            if nouvelles is not None:
+                nouvelles = nouvelles[
+                    (nouvelles['CODE_STATION'] == self.code_station.get()) &
+                    (nouvelles['DATE_RELEVE'].dt.year > self.date_debut.get()) &
+                    (nouvelles['DATE_RELEVE'].dt.year < self.date_fin.get())
+                ]
+                # Index cumulé construit avant l'ajout : reconstruit au prochain usage
+                self.index_cle = None
+                if not nouvelles.empty:
+                    self.agregats.ajouter(nouvelles)
+                    self.df_filtered = pd.concat([self.df_filtered, nouvelles], ignore_index=True)
+                    self.results = self.agregats.resultats()
+                    self.display_selected_table()
+                    if hasattr(self, "df_deb_mois_long"):
+                        self.valider_indicateurs()
+                    print(f"{len(nouvelles)} nouveau(x) relevé(s) intégré(s)")
+            self._echecs_suivi = 0
+        except ValueError as e:
+            # Fichier réécrit ou relevés corrigés : recalcul complet
+            print(e)
+            self._echecs_suivi = 0 if self.recharger_silencieux() else self._echecs_suivi + 1
+        except Exception as e:
+            print(f"Suivi du fichier : {e}")
+            self._echecs_suivi += 1
+
+        if self._echecs_suivi >= self.MAX_ECHECS_SUIVI:
+            print(f"Suivi du fichier arrêté après {self._echecs_suivi} échecs consécutifs.")
+            self._suivi_id = None
+            self.suivi_auto.set(False)
+            return
+        delai = min(self.DELAI_SUIVI_MS * 2 ** self._echecs_suivi, self.DELAI_SUIVI_MAX_MS)
+        self._suivi_id = self.root.after(delai, self.verifier_fichier)
+
+    def recharger_silencieux(self):
+        """
+        Rechargement complet (relevés, simulation, suivi, tableaux) sans
+        boîte de dialogue, pour le suivi automatique.
+
+        Retour:
+            bool: True si le rechargement a abouti.
+        """
+        try:
+            df = self.charger_donnees_station()
+            if df.empty:
+                print("Rechargement : aucune donnée avec ces paramètres.")
+                return False
+            self.df_filtered = df
+            self.results = self.simuler(df)
+            self.initialiser_suivi(df)
+            self.display_selected_table()
+            if hasattr(self, "df_deb_mois_long"):
+                self.valider_indicateurs()
+        except Exception as e:
+            print(f"Rechargement impossible : {e}")
+            return False
+        print("Fichier rechargé.")
+        return True
+
     def update_table_choices(self):
         evap_pct_str = f"{self.evap_pct.get():.0f}%"
         entree_pct_str = f"{self.entree_pct.get():.0f}%"
@@ -407,8 +806,9 @@ class SalagouApp:
             f"Entrées naturelles -{entree_pct_str}",
             "Evaporations",
             f"Evaporations +{evap_pct_str}"
-        ]
+        ] + list(self.CHOIX_DEPASSEMENTS)
 
+    @profiler_action
     def display_selected_table(self):
         if self.results is None:
             messagebox.showwarning("Attention", "Veuillez d'abord lancer la simulation.", parent=self.root)
@@ -425,6 +825,15 @@ class SalagouApp:
             df["ANNEE"] = df["MOIS"].dt.year
             df["MOIS_NUM"] = df["MOIS"].dt.month
 
+        # 🔹 Sauvegarde en mémoire pour un autre onglet
+        self.df_pivot_volume = df.pivot(index="ANNEE", columns="MOIS_NUM", values="VOLUME_PREMIER_JOUR")
+        self.df_pivot_entree_clim = df.pivot(index="ANNEE", columns="MOIS_NUM", values="ENTREE_CLIMAT")
+        self.df_pivot_evap_clim = df.pivot(index="ANNEE", columns="MOIS_NUM", values="EVAP_CLIMAT")
+
+        if choix in self.CHOIX_DEPASSEMENTS:
+            self.display_depassements(choix)
+            return
+
         entree_pct = self.entree_pct.get()
         evap_pct = self.evap_pct.get()
 
@@ -446,13 +855,26 @@ class SalagouApp:
 
         # Affichage du tableau dans Treeview
         self.show_pivot(pivot_df)
-
-        # 🔹 Sauvegarde en mémoire pour un autre onglet
-        self.df_pivot_volume = df.pivot(index="ANNEE", columns="MOIS_NUM", values="VOLUME_PREMIER_JOUR")
-        self.df_pivot_entree_clim = df.pivot(index="ANNEE", columns="MOIS_NUM", values="ENTREE_CLIMAT")
-        self.df_pivot_evap_clim = df.pivot(index="ANNEE", columns="MOIS_NUM", values="EVAP_CLIMAT")
         self.afficher_graphique(pivot_df, variable)
 
+    def display_depassements(self, choix):
+        """Tableaux des jours et épisodes sous cote min / au-dessus de cote max."""
+        grille = construire_grille(self.df_filtered, self.code_station.get())
+        synthese = synthese_depassements(grille, self.cote_min.get(), self.cote_max.get())
+        tableau = synthese[self.CHOIX_DEPASSEMENTS[choix]]
+        self.show_pivot(tableau)
+
+        if self.CHOIX_DEPASSEMENTS[choix] == "annuelle":
+            # Pas de graphique mensuel pour la synthèse annuelle
+            if hasattr(self, 'canvas') and self.canvas:
+                self.canvas.get_tk_widget().destroy()
+                self.canvas = None
+            if hasattr(self, 'toolbar') and self.toolbar:
+                self.toolbar.destroy()
+                self.toolbar = None
+        else:
+            self.afficher_graphique(tableau, self.CHOIX_DEPASSEMENTS[choix].upper())
+
     def show_pivot(self, pivot_df):
         if hasattr(self, 'tree'):
             self.tree.destroy()
@@ -463,9 +885,12 @@ class SalagouApp:
         for row in self.tree.get_children():
             self.tree.delete(row)
 
-        # Colonnes mois en français abrégé
+        # Colonnes mois en français abrégé (ou noms des colonnes pour les synthèses)
         mois_noms = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
-        colonnes = ["Année"] + mois_noms
+        if list(pivot_df.columns) == list(range(1, 13)):
+            colonnes = ["Année"] + mois_noms
+        else:
+            colonnes = ["Année"] + [str(col) for col in pivot_df.columns]
         self.tree.config(columns=colonnes)
 
         for col in colonnes:
@@ -496,10 +921,12 @@ class SalagouApp:
             "Evaporations": "EVAPORATION",
             f"Evaporations +{evap_pct:.0f}%": "EVAP_CLIMAT",
         }
+        mapping.update({k: v.upper() for k, v in self.CHOIX_DEPASSEMENTS.items()})
 
         # Retrouver le "nom humain"
         inverse_mapping = {v: k for k, v in mapping.items()}
         titre_variable = inverse_mapping.get(variable, variable)
+        unite = "jours" if variable.startswith("JOURS") else "m³"
 
         # Préparer la figure
         plt.style.use("seaborn-v0_8-whitegrid")
@@ -554,10 +981,14 @@ class SalagouApp:
             picker=True       # activable
         )
 
+        # Éventail de prévision des années analogues (volumes uniquement)
+        if variable == "VOLUME_PREMIER_JOUR" and self.afficher_analogues.get():
+            self.tracer_analogues(ax, couleur)
+
         # Titres et labels
         ax.set_title(f"{titre_variable}", fontsize=13, fontweight="bold")
         ax.set_xlabel("Année", fontsize=11)
-        ax.set_ylabel(f"{titre_variable} (m³)", fontsize=11)
+        ax.set_ylabel(f"{titre_variable} ({unite})", fontsize=11)
 
         # Mise en forme axe X
         fig.autofmt_xdate(rotation=30, ha="right")
@@ -585,11 +1016,35 @@ class SalagouApp:
         def on_hover(sel):
             x, y = sel.target  # coordonnées du point
             date_str = mdates.num2date(x).strftime("%b %Y")
-            sel.annotation.set_text(f"{date_str}\n{y:.0f} m³")
+            sel.annotation.set_text(f"{date_str}\n{y:.0f} {unite}")
             sel.annotation.get_bbox_patch().set(fc="white", alpha=0.9)
 
         self.root.grid_columnconfigure(1, weight=1)
 
+    def tracer_analogues(self, ax, couleur, n=5):
+        """Trace le prolongement des n années les plus proches de l'année en cours."""
+        try:
+            annees, matrice = charger_matrice(self.filepath, self.code_station.get(), "VOLUME")
+            annee, jour = position_courante(annees, matrice)
+            analogues = rechercher_analogues(annees, matrice, annee, jour, n=n)
+            if analogues.empty:
+                return
+            eventail = eventail_prevision(annees, matrice, analogues, annee, jour)
+        except Exception as e:
+            print(f"Prévision par années analogues impossible : {e}")
+            return
+
+        ax.fill_between(eventail.index, eventail.min(axis=1), eventail.max(axis=1),
+                        color=couleur, alpha=0.15, label="Années analogues")
+        for annee_analogue in eventail.columns:
+            ax.plot(eventail.index, eventail[annee_analogue], color=couleur,
+                    linewidth=0.8, linestyle=":", alpha=0.7)
+        ax.plot(eventail.index, eventail.median(axis=1), color=couleur, linewidth=1.5,
+                linestyle="--", label="Médiane analogues")
+        ax.legend(loc="best", fontsize=8)
+        print("Années analogues :", ", ".join(str(a) for a in analogues["ANNEE"]))
+
+    @profiler_action
     def valider_indicateurs(self):
         #self.mode_indicateurs.set("volume")
         lachures = [var.get() for var in self.lachures_vars]
@@ -607,6 +1062,148 @@ class SalagouApp:
 
         self.display_graph() 
 
+    @profiler_action
+    def lancer_optimisation(self):
+        """
+        Cherche les lâchures maximales gardant la courbe du percentile bas
+        au-dessus de la cote minimale, puis remplit les 12 champs.
+        """
+        if not hasattr(self, "df_pivot_volume"):
+            messagebox.showwarning("Attention", "Veuillez d'abord lancer la simulation.", parent=self.root)
+            return
+
+        base = base_indicateurs(
+            self.prepare_for_graph(self.df_pivot_volume),
+            self.prepare_for_graph(self.df_pivot_entree_clim),
+            self.prepare_for_graph(self.df_pivot_evap_clim),
+            [self.percentile_bas.get() / 100]
+        )[0]
+        volume_min = cote_to_volume(self.cote_min.get(), code=self.code_station.get())
+
+        resultat = optimiser_lachures(base, volume_min, pas=1000)
+        for var, valeur in zip(self.lachures_vars, resultat["lachures"]):
+            var.set(valeur)
+        print("Lâchures optimisées :", resultat["lachures"], "total :", resultat["total"])
+
+        if resultat["mois_infaisables"]:
+            messagebox.showwarning(
+                "Attention",
+                "Cote minimale non atteinte même sans lâchure pour le(s) mois : "
+                + ", ".join(str(m) for m in resultat["mois_infaisables"]),
+                parent=self.root
+            )
+        self.valider_indicateurs()
+
+    @profiler_action
+    def comparer_barrages(self):
+        """
+        Indicateurs de toutes les stations du registre, calculés en parallèle
+        et affichés côte à côte dans une nouvelle fenêtre (sans lâchures).
+
+        Le calcul tourne dans un thread (pool de processus partagé de
+        comparaison.py) : l'interface reste réactive et le résultat est
+        relevé par recevoir_comparaison.
+        """
+        if not getattr(self, "filepath", None):
+            messagebox.showerror("Erreur", "Veuillez sélectionner un fichier CSV.", parent=self.root)
+            return
+
+        # Paramètres relevés ici : les variables Tk ne sont pas lues depuis le thread
+        mode = self.mode_indicateurs.get()
+        xlabel = SCHEMAS[self.schema_periodes.get()].libelle
+        futur = self._executeur_comparaison.submit(
+            comparer_stations,
+            self.filepath,
+            [infos["code"] for infos in REGISTRE_STATIONS.values()],
+            date_debut=self.date_debut.get(),
+            date_fin=self.date_fin.get(),
+            evap_pct=self.evap_pct.get() / 100,
+            entree_pct=self.entree_pct.get() / 100,
+            percentiles=[self.percentile_bas.get() / 100, self.percentile_haut.get() / 100],
+            nom_schema=self.schema_periodes.get(),
+            mode=mode
+        )
+        self.bouton_comparer.configure(state="disabled")
+        self.root.after(50, self.recevoir_comparaison, futur, mode, xlabel)
+
+    def recevoir_comparaison(self, futur, mode, xlabel):
+        """Attend la comparaison sans bloquer l'interface, puis l'affiche."""
+        if not futur.done():
+            self.root.after(50, self.recevoir_comparaison, futur, mode, xlabel)
+            return
+        self.bouton_comparer.configure(state="normal")
+        if futur.cancelled():
+            return
+        try:
+            resultats = futur.result()
+        except Exception as e:
+            messagebox.showerror("Erreur", str(e), parent=self.root)
+            return
+
+        fig = tracer_comparaison(
+            resultats,
+            unite="Cote (mNGF)" if mode == "cote" else "Volume (m³)",
+            xlabel=xlabel
+        )
+
+        fenetre = tb.Toplevel(self.root)
+        fenetre.title("Comparaison des barrages")
+        canvas = FigureCanvasTkAgg(fig, master=fenetre)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        toolbar_frame = tk.Frame(fenetre)
+        toolbar_frame.pack(fill="x")
+        NavigationToolbar2Tk(canvas, toolbar_frame).update()
+        fenetre.protocol("WM_DELETE_WINDOW", lambda: (plt.close(fig), fenetre.destroy()))
+
+    @profiler_action
+    def afficher_tendances(self):
+        """
+        Évolution des indicateurs de début de mois sur des fenêtres glissantes
+        de N années (carte de chaleur), pour la station sélectionnée.
+        """
+        if self.index_cumule is None or self.index_cle != self.cle_index():
+            if not getattr(self, "filepath", None):
+                messagebox.showwarning("Attention", "Veuillez d'abord lancer la simulation.", parent=self.root)
+                return
+            self.initialiser_index()
+            if self.index_cumule is None:
+                return
+
+        n_annees = simpledialog.askinteger("Tendances", "Longueur des fenêtres (années) :",
+                                           initialvalue=10, minvalue=2, maxvalue=50, parent=self.root)
+        if not n_annees:
+            return
+
+        percentiles = [self.percentile_bas.get() / 100, self.percentile_haut.get() / 100]
+        annees_fin, cube = cube_tendances(
+            self.index_cumule, n_annees, percentiles,
+            self.evap_pct.get() / 100, self.entree_pct.get() / 100, annee_min=1970
+        )
+        if len(annees_fin) == 0:
+            messagebox.showwarning("Attention", "Pas assez d'années pour cette longueur de fenêtre.",
+                                   parent=self.root)
+            return
+
+        if self.mode_indicateurs.get() == "cote":
+            cube = volumes_to_cotes(cube, code=self.code_station.get())
+            unite = "Cote (mNGF)"
+        else:
+            unite = "Volume (m³)"
+
+        fig = tracer_tendances(annees_fin, cube, percentiles,
+                               titre=station_par_code(self.code_station.get())[1]["titre"],
+                               unite=unite, n_annees=n_annees)
+        fenetre = tb.Toplevel(self.root)
+        fenetre.title("Tendances des indicateurs")
+        canvas = FigureCanvasTkAgg(fig, master=fenetre)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+        toolbar_frame = tk.Frame(fenetre)
+        toolbar_frame.pack(fill="x")
+        NavigationToolbar2Tk(canvas, toolbar_frame).update()
+        fenetre.protocol("WM_DELETE_WINDOW", lambda: (plt.close(fig), fenetre.destroy()))
+
     def prepare_for_graph(self, df_pivot):
         """
         Transforme un DataFrame pivoté (ANNEE en index, MOIS_NUM en colonnes)
@@ -646,41 +1243,29 @@ class SalagouApp:
         # Récupération du mode choisi (volume ou cote)
         mode = self.mode_indicateurs.get()  # défaut = volume
 
-        # Si déjà en format long, ne pas refaire melt
-        df_long_deb_mois = debut_mois.copy()
-        df_long_entree_clim = entree_clim.copy()
-        df_long_evap_clim = evap_clim.copy()
-
-        quantiles_deb_mois = df_long_deb_mois.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-        quantiles_entree_clim = df_long_entree_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-        quantiles_evap_clim = df_long_evap_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-
-        resultats_p1 = []
-        resultats_p2 = []
-
-        for mois in range(1, 13):
-            mois_prec = 12 if mois == 1 else mois - 1  # mois précédent
-            val_p1 = (quantiles_deb_mois.loc[mois_prec, p1] +
-                      quantiles_entree_clim.loc[mois_prec, p1] -
-                      quantiles_evap_clim.loc[mois_prec, p1] -
-                      vect_lach[mois_prec - 1])
-            val_p2 = (quantiles_deb_mois.loc[mois_prec, p2] +
-                      quantiles_entree_clim.loc[mois_prec, p2] -
-                      quantiles_evap_clim.loc[mois_prec, p2] -
-                      vect_lach[mois_prec - 1])
-            
-            if mode == "cote":
-                val_p1 = volume_to_cote(val_p1,code=self.code_station.get())
-                val_p2 = volume_to_cote(val_p2,code=self.code_station.get())
+        # Découpage de l'année choisi (mois, année hydrologique, décades, semaines)
+        schema = SCHEMAS[self.schema_periodes.get()]
 
-            resultats_p1.append(val_p1)
-            resultats_p2.append(val_p2)
+        if schema.mensuel:
+            agregats = agregats_depuis_mensuel(debut_mois, entree_clim, evap_clim, schema)
+        else:
+            # Découpage plus fin que le mois : agrégation depuis les données journalières
+            journalier = calculs_journaliers(
+                self.df_filtered,
+                self.evap_pct.get() / 100,
+                self.entree_pct.get() / 100
+            )
+            agregats = agreger_periodes(journalier, schema)
+
+        valeurs = indicateurs_periodes(agregats, schema, [p1, p2], vect_lach)
+
+        if mode == "cote":
+            valeurs = volumes_to_cotes(valeurs, code=self.code_station.get())
 
         df_res = pd.DataFrame({
-            "Mois": ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin",
-                     "Juil", "Août", "Sep", "Oct", "Nov", "Déc"],
-            f"q {p1}": resultats_p1,
-            f"q {p2}": resultats_p2
+            schema.libelle: schema.etiquettes,
+            f"q {p1}": valeurs[0],
+            f"q {p2}": valeurs[1]
         })
 
         # Arrondir selon le mode
@@ -690,22 +1275,73 @@ class SalagouApp:
             df_res.iloc[:, 1:] = df_res.iloc[:, 1:].round(0).astype(int)
         self.df_indicateurs = df_res.copy()
         self.afficher_resultats_indicateurs(df_res)
-        return df_res.set_index("Mois").T
+        return df_res.set_index(schema.libelle).T
     
-    def display_graph(self):
+    def calculer_intervalles(self, res):
+        """
+        Bornes bootstrap (90 %) des indicateurs affichés, au format de `res`.
+        Mises en cache par station, années, % et version des relevés (nombre
+        et dernière date, qui changent quand le suivi ajoute des lignes) :
+        seul le premier affichage agrège les données et recalcule les tirages.
+        """
+        schema = SCHEMAS[self.schema_periodes.get()]
+        evap_pct = self.evap_pct.get() / 100
+        entree_pct = self.entree_pct.get() / 100
+        df = self.df_filtered
+        cle = self.cle_intervalles(evap_pct, entree_pct)
+        bas, haut = intervalles_confiance(
+            lambda: agreger_periodes(calculs_journaliers(df, evap_pct, entree_pct), schema), schema,
+            [self.percentile_bas.get() / 100, self.percentile_haut.get() / 100],
+            [var.get() for var in self.lachures_vars],
+            cle=cle
+        )
+        if self.mode_indicateurs.get() == "cote":
+            # Conversion monotone : les bornes en volume donnent les bornes en cote
+            bas = volumes_to_cotes(bas, code=self.code_station.get())
+            haut = volumes_to_cotes(haut, code=self.code_station.get())
+        return (pd.DataFrame(bas, index=res.index, columns=res.columns),
+                pd.DataFrame(haut, index=res.index, columns=res.columns))
+
+    def cle_intervalles(self, evap_pct, entree_pct):
+        """Clé du cache bootstrap : station, années, % et version des relevés filtrés."""
+        df = self.df_filtered
+        return (self.filepath, self.code_station.get(), self.date_debut.get(), self.date_fin.get(),
+                evap_pct, entree_pct, len(df), str(df["DATE_RELEVE"].max()))
+
+    @profiler_action
+    def display_graph(self, df_indicateurs=None):
+        """
+        Tableau et graphique des indicateurs.
+
+        df_indicateurs (pd.DataFrame, optional): tableau déjà calculé (session
+        restaurée) : affiché tel quel, sans recalcul des quantiles ni des
+        intervalles.
+        """
+        # Un aperçu en cours serait plus ancien que ce tracé complet
+        self.apercu.invalider()
+        if self._apercu_id:
+            self.root.after_cancel(self._apercu_id)
+            self._apercu_id = None
+        self._fond_apercu = None
+
         # Nettoyer l'ancien graphe
         for widget in self.frame_graph_indicateurs.winfo_children():
             widget.destroy()
 
         # Calcul des résultats
-        res = self.faconnage_graph(
-            debut_mois=self.df_deb_mois_long,
-            entree_clim=self.df_entree_clim_long,
-            evap_clim=self.df_evap_clim_long,
-            p1=self.percentile_bas.get()/100,
-            p2=self.percentile_haut.get()/100,
-            vect_lach=[var.get() for var in self.lachures_vars]
-        )
+        if df_indicateurs is None:
+            res = self.faconnage_graph(
+                debut_mois=self.df_deb_mois_long,
+                entree_clim=self.df_entree_clim_long,
+                evap_clim=self.df_evap_clim_long,
+                p1=self.percentile_bas.get()/100,
+                p2=self.percentile_haut.get()/100,
+                vect_lach=[var.get() for var in self.lachures_vars]
+            )
+        else:
+            self.df_indicateurs = df_indicateurs.copy()
+            self.afficher_resultats_indicateurs(df_indicateurs)
+            res = df_indicateurs.set_index(df_indicateurs.columns[0]).T
         vmin = self.cote_min.get()
         vmax = self.cote_max.get()
         if self.mode_indicateurs.get() == "cote":
@@ -721,8 +1357,13 @@ class SalagouApp:
 
 
 
+        intervalles = None
+        if self.afficher_intervalles.get() and df_indicateurs is None:
+            intervalles = self.calculer_intervalles(res)
+
         # Création de la figure
-        self.fig = tracer_faconnage(res,titre="Indicateurs du barrage des Olivettes" if self.code_station.get() == 32 else "Indicateurs du barrage du Salagou", vmin=vmin, vmax=vmax, unite=unite)
+        self.fig = tracer_faconnage(res,titre=station_par_code(self.code_station.get())[1]["titre"], vmin=vmin, vmax=vmax, unite=unite,
+                                    xlabel=SCHEMAS[self.schema_periodes.get()].libelle, intervalles=intervalles)
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame_graph_indicateurs)
         self.canvas.draw()
@@ -735,7 +1376,25 @@ class SalagouApp:
         self.toolbar.update()
 
         # --- Interaction sur les points avec mplcursors ---
-        ax = self.fig.axes[0]
+        self.ajouter_infobulles(self.fig.axes[0], unite)
+
+        # Bouton pour télécharger
+        btn_save = tb.Button(
+            self.frame_graph_indicateurs,
+            text="Télécharger graphique",
+            bootstyle="info",
+            command=self.save_graphique  # méthode à définir
+        )
+        btn_save.pack(pady=5)
+
+    def retirer_infobulles(self):
+        if getattr(self, "curseur_indicateurs", None) is not None:
+            self.curseur_indicateurs.remove()
+            self.curseur_indicateurs = None
+
+    def ajouter_infobulles(self, ax, unite):
+        """Infobulles (mplcursors) sur les points des courbes de l'axe, en remplacement des précédentes."""
+        self.retirer_infobulles()
 
         # Créer des scatter invisibles pour chaque courbe existante
         scatters = []
@@ -761,6 +1420,7 @@ class SalagouApp:
 
         import mplcursors
         cursor = mplcursors.cursor(scatters, hover=True)  # ne suit que les points
+        self.curseur_indicateurs = cursor
 
         @cursor.connect("add")
         def on_hover(sel):
@@ -775,15 +1435,153 @@ class SalagouApp:
             sel.annotation.set_text(f"{month_str}\n{y_str} {unite}")
             sel.annotation.get_bbox_patch().set(fc="white", alpha=0.9)
 
-        # Bouton pour télécharger
-        btn_save = tb.Button(
-            self.frame_graph_indicateurs,
-            text="Télécharger graphique",
-            bootstyle="info",
-            command=self.save_graphique  # méthode à définir
-        )
-        btn_save.pack(pady=5)
+    # ------------------------------------------------------------------
+    # Aperçu en direct
+    # ------------------------------------------------------------------
+    def programmer_apercu(self, *args):
+        """
+        Modification d'un percentile, d'une cote ou d'une lâchure : aperçu
+        regroupé via after (une frappe repousse le calcul), et tout calcul
+        déjà lancé devient obsolète.
+        """
+        if not self.apercu_direct.get() or not hasattr(self, "df_deb_mois_long") or not hasattr(self, "fig"):
+            return
+        self.apercu.invalider()
+        if self._apercu_id:
+            self.root.after_cancel(self._apercu_id)
+        self._apercu_id = self.root.after(self.DELAI_APERCU_MS, self.lancer_apercu)
+
+    def parametres_apercu(self):
+        """Paramètres de l'aperçu, relevés dans le thread de l'interface (voir ApercuIndicateurs.calculer)."""
+        evap_pct = self.evap_pct.get() / 100
+        entree_pct = self.entree_pct.get() / 100
+        p1, p2 = self.percentile_bas.get() / 100, self.percentile_haut.get() / 100
+        if not (0 <= p1 <= 1 and 0 <= p2 <= 1) or p1 == p2:
+            raise ValueError(f"Percentiles invalides : {p1}, {p2}")
+        return {
+            "debut_mois": self.df_deb_mois_long,
+            "entree_clim": self.df_entree_clim_long,
+            "evap_clim": self.df_evap_clim_long,
+            "df_filtered": self.df_filtered,
+            "evap_pct": evap_pct,
+            "entree_pct": entree_pct,
+            "schema": self.schema_periodes.get(),
+            "percentiles": (p1, p2),
+            "lachures": [var.get() for var in self.lachures_vars],
+            "cote_min": self.cote_min.get(),
+            "cote_max": self.cote_max.get(),
+            "mode": self.mode_indicateurs.get(),
+            "code_station": self.code_station.get(),
+            "cle_intervalles": self.cle_intervalles(evap_pct, entree_pct)
+        }
+
+    def lancer_apercu(self):
+        self._apercu_id = None
+        try:
+            parametres = self.parametres_apercu()
+        except (tk.TclError, ValueError):
+            return  # saisie en cours (champ vide, "2.", ...) : pas d'aperçu
+        generation, futur = self.apercu.soumettre(parametres)
+        self.root.after(5, self.recevoir_apercu, generation, futur, time.perf_counter(), parametres)
+
+    def recevoir_apercu(self, generation, futur, debut, parametres):
+        """Attend le calcul sans bloquer l'interface, puis affiche le résultat s'il est encore à jour."""
+        if not futur.done():
+            self.root.after(5, self.recevoir_apercu, generation, futur, debut, parametres)
+            return
+        if not self.apercu.est_a_jour(generation) or futur.cancelled():
+            return  # une saisie plus récente est arrivée entre-temps
+        try:
+            resultat = futur.result()
+        except Exception as e:
+            print(f"Aperçu impossible : {e}")
+            return
+        if resultat is None:
+            return
 
+        self.afficher_apercu(resultat)
+        calcul = resultat["duree"] * 1000
+        duree = (time.perf_counter() - debut) * 1000
+        if calcul > self.BUDGET_APERCU_MS:
+            print(f"Aperçu : calcul {calcul:.0f} ms, au-delà de {self.BUDGET_APERCU_MS} ms")
+        elif duree > self.BUDGET_APERCU_MS:
+            print(f"Aperçu : {duree:.0f} ms (calcul {calcul:.0f} ms), "
+                  f"au-delà de {self.BUDGET_APERCU_MS} ms")
+
+        # Intervalles hors budget : demandés une fois l'aperçu affiché, ajoutés au tracé à leur arrivée
+        if self.afficher_intervalles.get():
+            futur = self.apercu.soumettre_intervalles(generation, parametres)
+            self.root.after(50, self.recevoir_intervalles_apercu, generation, futur, resultat)
+
+    def recevoir_intervalles_apercu(self, generation, futur, resultat):
+        """Redessine l'aperçu avec les intervalles s'il est toujours le dernier affiché."""
+        if not futur.done():
+            self.root.after(50, self.recevoir_intervalles_apercu, generation, futur, resultat)
+            return
+        if not self.apercu.est_a_jour(generation) or futur.cancelled():
+            return
+        try:
+            intervalles = futur.result()
+        except Exception as e:
+            print(f"Intervalles de l'aperçu impossibles : {e}")
+            return
+        if intervalles is None or not self.afficher_intervalles.get():
+            return
+        self.afficher_apercu({**resultat, "intervalles": intervalles})
+
+    def afficher_apercu(self, resultat):
+        """
+        Tableau et courbes redessinés dans la figure existante, sans recréer
+        canvas ni barre d'outils. Tant que les axes ne changent pas (limites,
+        taille, légende) et que les valeurs y tiennent, seules les courbes sont
+        redessinées sur le fond mémorisé (blit) : le rendu des graduations,
+        du titre et de la légende est évité. Sinon tracé complet.
+        """
+        self.df_indicateurs = resultat["tableau"].copy()
+        self.afficher_resultats_indicateurs(resultat["tableau"])
+
+        ax = self.fig.axes[0]
+        res = resultat["res"]
+        valeurs = [res.to_numpy(dtype=float).ravel(), [resultat["vmin"], resultat["vmax"]]]
+        if resultat["intervalles"] is not None:
+            valeurs += [df.to_numpy(dtype=float).ravel() for df in resultat["intervalles"]]
+        valeurs = np.concatenate(valeurs)
+        limites = ax.get_ylim()
+        cle_fond = (tuple(res.index), ax.get_xlim(), limites, self.fig.bbox.bounds)
+        rapide = (self._fond_apercu is not None and self._fond_apercu[0] == cle_fond
+                  and limites[0] <= np.nanmin(valeurs) and np.nanmax(valeurs) <= limites[1])
+
+        self.retirer_infobulles()
+        if rapide:
+            for artiste in ax.collections[:] + ax.lines[:] + ax.texts[:]:
+                artiste.remove()
+        else:
+            ax.clear()
+        dessiner_faconnage(ax, res, titre=station_par_code(self.code_station.get())[1]["titre"],
+                           vmin=resultat["vmin"], vmax=resultat["vmax"], unite=resultat["unite"],
+                           xlabel=resultat["xlabel"], intervalles=resultat["intervalles"])
+        self.ajouter_infobulles(ax, resultat["unite"])
+        courbes = sorted(ax.collections + ax.lines + ax.texts, key=lambda artiste: artiste.get_zorder())
+
+        if rapide:
+            ax.set_ylim(limites)
+            self.canvas.restore_region(self._fond_apercu[1])
+        else:
+            # Fond sans les courbes, mémorisé pour les aperçus suivants
+            ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+            for artiste in courbes:
+                artiste.set_visible(False)
+            self.canvas.draw()
+            self._fond_apercu = ((tuple(res.index), ax.get_xlim(), ax.get_ylim(), self.fig.bbox.bounds),
+                                 self.canvas.copy_from_bbox(ax.bbox))
+            for artiste in courbes:
+                artiste.set_visible(True)
+
+        for artiste in courbes:
+            ax.draw_artist(artiste)
+        self.canvas.blit(ax.bbox)
+
+    @profiler_action
     def exporter_indicateurs(self):
         """Exporte le tableau des indicateurs en CSV ou Excel."""
         if not hasattr(self, "df_indicateurs") or self.df_indicateurs.empty:
@@ -820,8 +1618,153 @@ class SalagouApp:
         # Réafficher
         self.afficher_resultats_indicateurs(df)
 
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    # Résultats sauvegardés avec la session (en plus de self.results)
+    RESULTATS_SESSION = ["df_filtered", "df_pivot_volume", "df_pivot_entree_clim",
+                         "df_pivot_evap_clim", "df_indicateurs"]
+
+    def parametres_session(self):
+        return {
+            "filepath": self.filepath,
+            "nom_station": self.nom_station.get(),
+            "code_station": self.code_station.get(),
+            "date_debut": self.date_debut.get(),
+            "date_fin": self.date_fin.get(),
+            "evap_pct": self.evap_pct.get(),
+            "entree_pct": self.entree_pct.get(),
+            "percentile_bas": self.percentile_bas.get(),
+            "percentile_haut": self.percentile_haut.get(),
+            "cote_min": self.cote_min.get(),
+            "cote_max": self.cote_max.get(),
+            "lachures": [var.get() for var in self.lachures_vars],
+            "schema_periodes": self.schema_periodes.get(),
+            "mode_indicateurs": self.mode_indicateurs.get(),
+            "table_choice": self.table_choice.get()
+        }
+
+    def appliquer_parametres(self, parametres):
+        self.filepath = parametres["filepath"]
+        self.file_entry.delete(0, tk.END)
+        self.file_entry.insert(0, self.filepath or "")
+        self.station_combobox.set(parametres["nom_station"])
+        for nom in ("code_station", "date_debut", "date_fin", "evap_pct", "entree_pct",
+                    "percentile_bas", "percentile_haut", "cote_min", "cote_max",
+                    "schema_periodes", "mode_indicateurs"):
+            getattr(self, nom).set(parametres[nom])
+        for var, valeur in zip(self.lachures_vars, parametres["lachures"]):
+            var.set(valeur)
+
+    def sauvegarder_session(self, chemin=None):
+        """Enregistre paramètres et résultats (menu Session, ou à la fermeture)."""
+        if self.results is None:
+            if chemin is None:
+                messagebox.showwarning("Attention", "Aucun résultat à enregistrer.", parent=self.root)
+            return None
+        resultats = {"results": self.results}
+        resultats.update({nom: getattr(self, nom) for nom in self.RESULTATS_SESSION if hasattr(self, nom)})
+        chemin = enregistrer_session(self.parametres_session(), resultats, self.filepath, chemin)
+        print(f"Session enregistrée : {chemin}")
+        return chemin
+
+    def ouvrir_session(self):
+        chemin = filedialog.askopenfilename(
+            parent=self.root,
+            initialdir=DOSSIER_SESSIONS,
+            filetypes=[("Session", f"*{EXTENSION}")]
+        )
+        if chemin:
+            self.restaurer_session(chemin)
+
+    def maj_sessions_recentes(self):
+        self.menu_sessions_recentes.delete(0, tk.END)
+        for chemin in sessions_recentes():
+            try:
+                parametres = lire_entete(chemin)["parametres"]
+            except (OSError, ValueError):
+                continue
+            libelle = (f"{chemin.stem} - {parametres['nom_station']} "
+                       f"{parametres['date_debut']}-{parametres['date_fin']}")
+            self.menu_sessions_recentes.add_command(
+                label=libelle, command=lambda c=chemin: self.restaurer_session(c)
+            )
+
+    def restaurer_derniere_session(self):
+        chemin = DOSSIER_SESSIONS / DERNIERE_SESSION
+        if chemin.exists():
+            self.restaurer_session(chemin, silencieux=True)
+
+    def restaurer_session(self, chemin, silencieux=False):
+        """
+        Restaure une session : si le fichier source est inchangé, tableaux et
+        indicateurs sont réaffichés à partir des résultats enregistrés, sans
+        recalcul ; sinon la simulation est relancée avec les paramètres
+        enregistrés. Avec silencieux=True (reprise au démarrage), aucune
+        boîte de dialogue n'est affichée.
+        """
+        try:
+            entete, resultats = charger_session(chemin)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Session non restaurée ({chemin}) : {e}")
+            if not silencieux:
+                messagebox.showerror("Erreur", f"Session illisible : {e}", parent=self.root)
+            return
+
+        parametres = entete["parametres"]
+        self.appliquer_parametres(parametres)
+        self.update_table_choices()
+        self.table_choice['values'] = self.table_choices
+        self.table_choice.set(parametres["table_choice"])
+
+        if entete["source"] and source_inchangee(entete["source"]):
+            self.results = resultats["results"]
+            for nom in self.RESULTATS_SESSION:
+                if nom in resultats:
+                    setattr(self, nom, resultats[nom])
+            self.initialiser_suivi(self.df_filtered)
+            self.display_selected_table()
+            if "df_indicateurs" in resultats:
+                # Formats longs (simple remise en forme des tableaux croisés) pour l'aperçu
+                self.df_deb_mois_long = self.prepare_for_graph(self.df_pivot_volume)
+                self.df_entree_clim_long = self.prepare_for_graph(self.df_pivot_entree_clim)
+                self.df_evap_clim_long = self.prepare_for_graph(self.df_pivot_evap_clim)
+                self.display_graph(resultats["df_indicateurs"])
+            # Curseurs de plage : index construit une fois l'interface affichée
+            self.root.after_idle(self.initialiser_index)
+            print(f"Session restaurée sans recalcul : {chemin}")
+            return
+
+        if not (self.filepath and os.path.exists(self.filepath)):
+            message = f"Fichier source introuvable : {self.filepath}. Seuls les paramètres sont restaurés."
+            print(message)
+            if not silencieux:
+                messagebox.showwarning("Attention", message, parent=self.root)
+            return
+
+        print("Données source modifiées depuis la session : nouvelle simulation.")
+        if silencieux:
+            if not self.recharger_silencieux():
+                return
+        else:
+            self.run_simulation()
+            if self.results is None:
+                return
+        if "df_indicateurs" in resultats:
+            self.valider_indicateurs()
+
     def on_closing(self):
         """Fermeture propre de l'application"""
+        if self.prechauffage is not None:
+            self.prechauffage.annuler()
+        self.apercu.fermer()
+        self._executeur_comparaison.shutdown(wait=False, cancel_futures=True)
+        fermer_pool()
+        try:
+            # Session reprise au prochain lancement
+            self.sauvegarder_session(DOSSIER_SESSIONS / DERNIERE_SESSION)
+        except Exception as e:
+            print(f"Session non enregistrée : {e}")
         try:
             plt.close('all')   # ferme toutes les figures matplotlib
         except Exception:
@@ -837,11 +1780,14 @@ class SalagouApp:
 def main():
     root = tb.Window(themename='flatly')  # ttkbootstrap
     app = SalagouApp(root)  # initialise l'app
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
     
     
 
 if __name__ == "__main__":
+    # Nécessaire pour les processus de comparaison dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
     main()
 
 # %%
@@ -0,0 +1,534 @@
+"""
+Banc d'équivalence des moteurs de calcul rapides.
+
+Exécute côte à côte les implémentations d'origine, figées dans
+reference_origine.py (chargement, simuler_salagou, boucle d'indicateurs,
+interpolation scalaire), et les moteurs qui les remplacent, sur data/data_barr_full.csv et sur des
+jeux synthétiques (lacunes, lignes désordonnées, mois sans premier jour),
+pour une grille de stations, plages d'années, %, percentiles et lâchures.
+
+Pour chaque étape : écart maximal (relatif à l'amplitude de la référence),
+tolérance, temps cumulés, accélération et rapport des pics mémoire
+(tracemalloc, mesurés sur le premier cas de l'étape). Les caches (relevés
+lus, tables HSV) sont vidés avant chaque mesure à froid ; les moteurs
+mesurés cache rempli sont signalés comme tels.
+
+Données lacunaires : simuler_salagou d'origine calcule les entrées à travers
+les lacunes, la version courante non (correctif). L'écart y est mesuré et
+affiché à titre d'information (INFO), sans tolérance.
+
+Sans affichage ni réseau. Lancement :
+    python banc_equivalence.py [--rapide] [--sans-synthetique]
+
+Code de sortie : 0 si tous les écarts sont dans les tolérances, 1 sinon.
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+import prep_data
+import reference_origine as origine
+from bootstrap import _quantiles_nan, cube_annees
+from index_cumule import IndexCumule
+from interpolation import (cote_to_volume, cotes_to_volumes, table_hsv_station, vider_cache_hsv,
+                           volume_to_cote, volumes_to_cotes)
+from periodes import SCHEMAS, agreger_periodes
+from prep_data import (calculs_journaliers, charger_donnees, filtrer_station, lire_releves,
+                       simuler_salagou, simuler_salagou_leger)
+from prep_graph import appliquer_lachures, base_indicateurs, faconnage_graph
+from tendances import cube_tendances
+
+
+FICHIER_REEL = Path(__file__).parent / "data" / "data_barr_full.csv"
+STATIONS_REELLES = [34, 32]
+
+# Stations synthétiques : (code, premier jour, dernier jour, particularités)
+STATIONS_SYNTHETIQUES = [
+    (901, "2000-01-01", "2012-12-31", ()),
+    (902, "1995-03-17", "2010-08-05", ("lacunes", "desordre")),
+    (903, "2019-06-12", "2021-02-20", ("sans_premiers_jours",)),
+]
+
+POURCENTAGES = [(0.0, 0.0), (0.10, 0.10), (0.30, -0.05)]
+PERCENTILES = [(0.25, 0.5), (0.1, 0.9)]
+LACHURES = [
+    [0] * 12,
+    [5e5] * 12,
+    [0, 0, 0, 5e5, 1e6, 2e6, 3e6, 3e6, 2e6, 5e5, 0, 0],
+]
+
+TOLERANCES = {
+    "exacte": 0.0,
+    "float64": 1e-9,
+    "float32": 1e-5,
+    # Écart attendu (correctif), mesuré sans condition
+    "informatif": np.inf,
+}
+
+
+# --- Caches ---
+
+def vider_caches():
+    """Vide les caches des modules courants (relevés lus, tables HSV et interpolateurs)."""
+    with prep_data._VERROU_RELEVES:
+        prep_data._CACHE_RELEVES.clear()
+    vider_cache_hsv()
+
+
+def _lacunaire(data):
+    """True si des jours manquent entre deux relevés consécutifs."""
+    ecarts = data["DATE_RELEVE"].sort_values().diff().dt.days
+    return bool((ecarts > 1).any())
+
+
+# --- Jeux de données synthétiques ---
+
+def jeu_synthetique(chemin, graine=0):
+    """
+    Écrit un fichier de relevés synthétique au format de data_barr_full.csv
+    (séparateur ";", décimale ",", dates jj/mm/aa) pour les stations de
+    STATIONS_SYNTHETIQUES.
+
+    Retour:
+        Path: Chemin du fichier écrit.
+    """
+    rng = np.random.default_rng(graine)
+    morceaux = []
+    for code, premier, dernier, particularites in STATIONS_SYNTHETIQUES:
+        dates = pd.date_range(premier, dernier, freq="D")
+        n = len(dates)
+        saison = np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 80) / 365.25)
+        volume = 9.0e7 + 6e6 * saison + np.cumsum(rng.normal(0, 2e5, n))
+        df = pd.DataFrame({
+            "CODE_STATION": code,
+            "NOM_STATION": f"Station synthétique {code}",
+            "DATE_RELEVE": dates,
+            "COTE": (135 + (volume - 9.0e7) / 1.5e6).round(2),
+            "VOLUME": volume.round(0),
+            "DEBIT_OUT": np.abs(rng.normal(1.0, 0.5, n)).round(3),
+            "EVAPORATION": (3e4 + 2.5e4 * saison + rng.normal(0, 3e3, n)).clip(0).round(0),
+        })
+
+        if "lacunes" in particularites:
+            # Trous de 1 à 40 jours et valeurs manquantes isolées
+            garder = np.ones(n, dtype=bool)
+            for debut in rng.choice(n, size=n // 200, replace=False):
+                garder[debut:debut + rng.integers(1, 41)] = False
+            df = df[garder]
+            df.loc[rng.random(len(df)) < 0.03, "COTE"] = np.nan
+            df.loc[rng.random(len(df)) < 0.02, "VOLUME"] = np.nan
+        if "sans_premiers_jours" in particularites:
+            df = df[~((df["DATE_RELEVE"].dt.day == 1) & (df["DATE_RELEVE"].dt.year == 2020))]
+        if "desordre" in particularites:
+            df = df.sample(frac=1, random_state=graine)
+        morceaux.append(df)
+
+    data = pd.concat(morceaux, ignore_index=True)
+    data["DATE_RELEVE"] = data["DATE_RELEVE"].dt.strftime("%d/%m/%y")
+    data.to_csv(chemin, sep=";", decimal=",", index=False)
+    return Path(chemin)
+
+
+# --- Mesures ---
+
+def _ecart(reference, nouveau):
+    """
+    Écart maximal entre deux résultats, relatif à l'amplitude de la référence.
+    Formes ou valeurs manquantes différentes : écart infini. Les DataFrames
+    sont comparés colonne à colonne (dates et textes : égalité des valeurs).
+    """
+    if isinstance(reference, dict):
+        if reference.keys() != nouveau.keys():
+            return np.inf
+        return max(_ecart(reference[cle], nouveau[cle]) for cle in reference)
+
+    if isinstance(reference, pd.DataFrame):
+        if list(reference.columns) != list(nouveau.columns) or len(reference) != len(nouveau):
+            return np.inf
+        ecarts = [0.0]
+        for colonne in reference.columns:
+            a, b = reference[colonne], nouveau[colonne]
+            if not pd.api.types.is_numeric_dtype(a):
+                # Comparaison par valeur (la résolution des dates peut différer : ns, us)
+                a, b = a.reset_index(drop=True), b.reset_index(drop=True)
+                identiques = ((a == b) | (a.isna() & b.isna())).all()
+                ecarts.append(0.0 if identiques else np.inf)
+            else:
+                ecarts.append(_ecart(a.to_numpy(dtype=float), b.to_numpy(dtype=float)))
+        return max(ecarts)
+
+    a = np.asarray(reference, dtype=float)
+    b = np.asarray(nouveau, dtype=float)
+    if a.shape != b.shape or not np.array_equal(np.isnan(a), np.isnan(b)):
+        return np.inf
+    if a.size == 0 or np.isnan(a).all():
+        return 0.0
+    amplitude = max(np.nanmax(np.abs(a)), np.finfo(float).tiny)
+    return float(np.nanmax(np.abs(a - b)) / amplitude)
+
+
+def _chronometrer(fonction):
+    debut = time.perf_counter()
+    resultat = fonction()
+    return resultat, time.perf_counter() - debut
+
+
+def _pic_memoire(fonction):
+    """Pic d'allocation (octets) pendant l'appel, suivi par tracemalloc."""
+    tracemalloc.start()
+    try:
+        fonction()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class Banc:
+    """
+    Accumule les comparaisons par (étape, moteur) : nombre de cas, écart
+    maximal, temps cumulés et pics mémoire du premier cas.
+    """
+
+    def __init__(self):
+        self.etapes = OrderedDict()
+        self.notes = []
+
+    def comparer(self, etape, moteur, reference, nouveau, tolerance="float64", preparer=None):
+        """
+        Exécute reference() puis nouveau() (fonctions sans argument) et
+        enregistre l'écart et les temps. preparer() (ex: vider_caches), si
+        fourni, est appelé hors mesure avant chaque exécution.
+        Retour : (résultat de référence, nouveau résultat).
+        """
+        def _mesurer(mesure, fonction):
+            if preparer is not None:
+                preparer()
+            return mesure(fonction)
+
+        cle = (etape, moteur)
+        if cle not in self.etapes:
+            self.etapes[cle] = {
+                "cas": 0, "ecart": 0.0, "tolerance": TOLERANCES[tolerance],
+                "t_ref": 0.0, "t_nouveau": 0.0,
+                "mem_ref": _mesurer(_pic_memoire, reference), "mem_nouveau": _mesurer(_pic_memoire, nouveau),
+            }
+        mesure = self.etapes[cle]
+
+        res_ref, t_ref = _mesurer(_chronometrer, reference)
+        res_nouveau, t_nouveau = _mesurer(_chronometrer, nouveau)
+        mesure["cas"] += 1
+        mesure["ecart"] = max(mesure["ecart"], _ecart(res_ref, res_nouveau))
+        mesure["t_ref"] += t_ref
+        mesure["t_nouveau"] += t_nouveau
+        return res_ref, res_nouveau
+
+    def noter(self, texte):
+        self.notes.append(texte)
+
+    @property
+    def conforme(self):
+        return all(m["ecart"] <= m["tolerance"] for m in self.etapes.values())
+
+    @staticmethod
+    def _statut(mesure):
+        if np.isinf(mesure["tolerance"]):
+            return "INFO"
+        return "OK" if mesure["ecart"] <= mesure["tolerance"] else "ÉCART"
+
+    def rapport(self):
+        lignes = [
+            f"{'Étape':<14}{'Moteur':<30}{'Cas':>5}{'Écart max':>11}{'Tol.':>8}"
+            f"{'Réf. (s)':>10}{'Nouv. (s)':>10}{'Accél.':>9}{'Mém. réf.':>11}{'Mém. nouv.':>11}{'Rapport':>9}  "
+        ]
+        for (etape, moteur), m in self.etapes.items():
+            acceleration = m["t_ref"] / m["t_nouveau"] if m["t_nouveau"] > 0 else np.inf
+            rapport_memoire = m["mem_ref"] / m["mem_nouveau"] if m["mem_nouveau"] > 0 else np.inf
+            statut = self._statut(m)
+            lignes.append(
+                f"{etape:<14}{moteur:<30}{m['cas']:>5}{m['ecart']:>11.1e}{m['tolerance']:>8.0e}"
+                f"{m['t_ref']:>10.3f}{m['t_nouveau']:>10.3f}{acceleration:>8.1f}x"
+                f"{m['mem_ref'] / 1e6:>9.2f}MB{m['mem_nouveau'] / 1e6:>9.2f}MB{rapport_memoire:>8.2f}x  {statut}"
+            )
+        return "\n".join(lignes + [f"- {note}" for note in self.notes])
+
+
+# --- Étapes ---
+
+def _plages(annees, plages_fixes=((1997, 2025),)):
+    """Plages d'années (bornes exclues) : tout, plages fixes qui recoupent les données, moitié centrale."""
+    premiere, derniere = int(annees.min()), int(annees.max())
+    plages = [(premiere - 1, derniere + 1)]
+    plages += [p for p in plages_fixes if p[0] < derniere and p[1] > premiere and p not in plages]
+    quart = (derniere - premiere) // 4
+    if quart > 0:
+        plages.append((premiere + quart - 1, derniere - quart + 1))
+    return plages
+
+
+def _tables_longues(resultats):
+    """Tableaux longs (MOIS_NUM, valeur) comme SalagouApp.prepare_for_graph."""
+    df = resultats["donnees_simulees"].copy()
+    df["ANNEE"] = df["MOIS"].dt.year
+    df["MOIS_NUM"] = df["MOIS"].dt.month
+    tables = []
+    for colonne in ("VOLUME_PREMIER_JOUR", "ENTREE_CLIMAT", "EVAP_CLIMAT"):
+        pivot = df.pivot(index="ANNEE", columns="MOIS_NUM", values=colonne)
+        tables.append(pivot.reset_index().melt(id_vars="ANNEE", var_name="MOIS_NUM", value_name="valeur"))
+    return tables
+
+
+def etape_donnees(banc, chemin, codes, rapide=False):
+    """
+    Chargement, simulation (pandas, version légère, index cumulé) et
+    indicateurs pour chaque station, plage, % et percentiles.
+
+    Retour:
+        list: (code, plage, pct, résultats simulés) des cas traités.
+    """
+    cas = []
+    for code in codes:
+        data_station = filtrer_station(lire_releves(chemin), code, 0, 9999)
+        if data_station.empty:
+            banc.noter(f"{Path(chemin).name} : station {code} absente, ignorée.")
+            continue
+        index, duree = _chronometrer(lambda: IndexCumule(data_station))
+        banc.noter(f"{Path(chemin).name} : index cumulé de la station {code} construit en {duree:.3f} s.")
+
+        plages = _plages(data_station["DATE_RELEVE"].dt.year)
+        for debut, fin in plages[:1] if rapide else plages:
+            data, _ = banc.comparer(
+                "chargement", "charger_donnees",
+                lambda: origine.charger_donnees(chemin, code, debut, fin),
+                lambda: charger_donnees(chemin, code, debut, fin),
+                "exacte", preparer=vider_caches
+            )
+            lire_releves(chemin)
+            banc.comparer(
+                "chargement", "charger_donnees (cache rempli)",
+                lambda: origine.charger_donnees(chemin, code, debut, fin),
+                lambda: charger_donnees(chemin, code, debut, fin),
+                "exacte"
+            )
+            banc.comparer(
+                "chargement", "IndexCumule.releves",
+                lambda: data.reset_index(drop=True),
+                lambda: index.releves(debut, fin).reset_index(drop=True),
+                "exacte"
+            )
+            if data.empty:
+                continue
+
+            # Sur données lacunaires, l'origine diffère par construction (voir en-tête)
+            suffixe, tolerance = (" [lacunes]", "informatif") if _lacunaire(data) else ("", "float64")
+            for evap_pct, entree_pct in POURCENTAGES[:1] if rapide else POURCENTAGES:
+                banc.comparer(
+                    "simulation", "simuler_salagou" + suffixe,
+                    lambda: origine.simuler_salagou(data.copy(), evap_pct, entree_pct),
+                    lambda: simuler_salagou(data.copy(), evap_pct, entree_pct),
+                    tolerance
+                )
+                resultats, _ = banc.comparer(
+                    "simulation", "simuler_salagou_leger",
+                    lambda: simuler_salagou(data.copy(), evap_pct, entree_pct),
+                    lambda: simuler_salagou_leger(data, evap_pct, entree_pct),
+                    "float32"
+                )
+                banc.comparer(
+                    "simulation", "IndexCumule.resultats" + suffixe,
+                    lambda: origine.simuler_salagou(origine.charger_donnees(chemin, code, debut, fin),
+                                                    evap_pct, entree_pct),
+                    lambda: index.resultats(debut, fin, evap_pct, entree_pct),
+                    tolerance
+                )
+                etape_indicateurs(banc, resultats)
+                cas.append((code, (debut, fin), (evap_pct, entree_pct), resultats))
+    return cas
+
+
+def etape_indicateurs(banc, resultats):
+    """Boucle d'origine contre faconnage_graph et les indicateurs vectorisés sur les lâchures."""
+    debut_mois, entree_clim, evap_clim = _tables_longues(resultats)
+    for p1, p2 in PERCENTILES:
+        for vect_lach in LACHURES:
+            banc.comparer(
+                "indicateurs", "faconnage_graph",
+                lambda: origine.faconnage_graph(None, debut_mois, entree_clim, evap_clim, p1, p2,
+                                                vect_lach).to_numpy(),
+                lambda: faconnage_graph(None, debut_mois, entree_clim, evap_clim, p1, p2, vect_lach).to_numpy()
+            )
+        banc.comparer(
+            "indicateurs", "appliquer_lachures (lot)",
+            lambda: np.stack([
+                origine.faconnage_graph(None, debut_mois, entree_clim, evap_clim, p1, p2, v).to_numpy(dtype=float)
+                for v in LACHURES
+            ]),
+            lambda: appliquer_lachures(base_indicateurs(debut_mois, entree_clim, evap_clim, [p1, p2]), LACHURES)
+        )
+
+
+def etape_interpolation(banc, codes, n_valeurs=100):
+    """
+    Conversions scalaires d'origine (table relue à chaque appel) contre les
+    versions en cache et vectorisées, caches vidés avant chaque mesure.
+    """
+    rng = np.random.default_rng(0)
+    for code in codes:
+        try:
+            table = table_hsv_station(code)
+        except FileNotFoundError:
+            banc.noter(f"Interpolation : pas de table HSV pour la station {code}, ignorée.")
+            continue
+        # Valeurs dans la table, hors table (extrapolation) et manquantes
+        v_min, v_max = table["Volume"].min(), table["Volume"].max()
+        c_min, c_max = table["Cote"].min(), table["Cote"].max()
+        volumes = rng.uniform(v_min - 0.1 * (v_max - v_min), v_max + 0.1 * (v_max - v_min), n_valeurs)
+        cotes = rng.uniform(c_min - 1, c_max + 1, n_valeurs)
+        volumes[::50] = np.nan
+        cotes[::50] = np.nan
+
+        banc.comparer(
+            "interpolation", "volume_to_cote",
+            lambda: [origine.volume_to_cote(v, code=code) for v in volumes],
+            lambda: [volume_to_cote(v, code=code) for v in volumes],
+            preparer=vider_caches
+        )
+        banc.comparer(
+            "interpolation", "volumes_to_cotes",
+            lambda: [origine.volume_to_cote(v, code=code) for v in volumes],
+            lambda: volumes_to_cotes(volumes, code=code),
+            preparer=vider_caches
+        )
+        banc.comparer(
+            "interpolation", "cote_to_volume",
+            lambda: [origine.cote_to_volume(c, code=code) for c in cotes],
+            lambda: [cote_to_volume(c, code=code) for c in cotes],
+            preparer=vider_caches
+        )
+        banc.comparer(
+            "interpolation", "cotes_to_volumes",
+            lambda: [origine.cote_to_volume(c, code=code) for c in cotes],
+            lambda: cotes_to_volumes(cotes, code=code),
+            preparer=vider_caches
+        )
+
+
+def _tendances_reference(data, n_annees, percentiles, evap_pct, entree_pct, annee_min):
+    """Une simulation de la série complète, puis la boucle d'origine sur chaque fenêtre."""
+    donnees = origine.simuler_salagou(data.copy(), evap_pct, entree_pct)["donnees_simulees"]
+    annees = donnees["MOIS"].dt.year
+    resultats = {}
+    for annee_fin in range(max(annee_min, annees.min()) + n_annees - 1, annees.max() + 1):
+        fenetre = donnees[(annees > annee_fin - n_annees) & (annees <= annee_fin)]
+        try:
+            df_res = origine.faconnage_graph(None, *_tables_longues({"donnees_simulees": fenetre}), *percentiles)
+        except KeyError:
+            # Mois sans aucune valeur dans la fenêtre : la boucle d'origine échoue
+            continue
+        resultats[annee_fin] = df_res.to_numpy(dtype=float).T
+    return resultats
+
+
+def etape_tendances(banc, chemin, codes, n_annees=10):
+    """Boucle d'origine fenêtre par fenêtre contre cube_tendances (fenêtres triées incrémentales)."""
+    for code in codes:
+        data = filtrer_station(lire_releves(chemin), code, 0, 9999)
+        annee_min = int(data["DATE_RELEVE"].dt.year.min()) + 1
+        if data.empty or data["DATE_RELEVE"].dt.year.max() - annee_min + 1 < n_annees:
+            banc.noter(f"Tendances : station {code} trop courte pour des fenêtres de {n_annees} ans.")
+            continue
+
+        suffixe, tolerance = (" [lacunes]", "informatif") if _lacunaire(data) else ("", "float64")
+        for percentiles in PERCENTILES:
+            evap_pct, entree_pct = POURCENTAGES[1]
+
+            def nouveau():
+                index = IndexCumule(data)
+                annees_fin, cube = cube_tendances(index, n_annees, percentiles, evap_pct, entree_pct, annee_min)
+                # Fenêtres où chaque mois a au moins un relevé (les seules calculables par la boucle d'origine)
+                debut = annee_min - index.annees[0]
+                presents = np.lib.stride_tricks.sliding_window_view(index.present[debut:], n_annees, axis=0)
+                completes = presents.any(axis=-1).all(axis=-1)
+                return {a: c for a, c, ok in zip(annees_fin.tolist(), cube, completes) if ok}
+
+            banc.comparer(
+                "tendances", "cube_tendances" + suffixe,
+                lambda: _tendances_reference(data, n_annees, percentiles, evap_pct, entree_pct, annee_min),
+                nouveau, tolerance
+            )
+
+
+def etape_bootstrap(banc, chemin, codes, n_tirages=200):
+    """Quantiles des tirages : np.nanquantile contre le tri de bootstrap._quantiles_nan."""
+    schema = SCHEMAS["Mois"]
+    rng = np.random.default_rng(0)
+    for code in codes:
+        data = filtrer_station(lire_releves(chemin), code, 0, 9999)
+        if data.empty:
+            continue
+        cube = cube_annees(agreger_periodes(calculs_journaliers(data), schema), schema)
+        echantillons = cube[rng.integers(0, cube.shape[0], size=(n_tirages, cube.shape[0]))]
+        for percentiles in PERCENTILES:
+            with np.errstate(invalid="ignore"), warnings.catch_warnings():
+                # Tirages sans aucune année renseignée pour un mois : NaN attendu
+                warnings.simplefilter("ignore", RuntimeWarning)
+                banc.comparer(
+                    "bootstrap", "_quantiles_nan",
+                    lambda: np.nanquantile(echantillons, percentiles, axis=1),
+                    lambda: _quantiles_nan(echantillons, percentiles, axis=1)
+                )
+
+
+def executer(fichier=FICHIER_REEL, synthetique=True, rapide=False, graine=0):
+    """
+    Exécute toutes les étapes sur le fichier réel et, si demandé, sur un jeu synthétique.
+
+    Retour:
+        Banc: Mesures accumulées (banc.rapport(), banc.conforme).
+    """
+    banc = Banc()
+    jeux = [(Path(fichier), STATIONS_REELLES)]
+    with tempfile.TemporaryDirectory() as dossier:
+        if synthetique:
+            chemin = jeu_synthetique(Path(dossier) / "synthetique.csv", graine)
+            jeux.append((chemin, [code for code, *_ in STATIONS_SYNTHETIQUES]))
+
+        for chemin, codes in jeux:
+            print(f"Jeu {chemin.name} : stations {codes}")
+            etape_donnees(banc, chemin, codes, rapide)
+            etape_tendances(banc, chemin, codes[:1] if rapide else codes)
+            etape_bootstrap(banc, chemin, codes)
+        etape_interpolation(banc, STATIONS_REELLES, 25 if rapide else 100)
+    return banc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'équivalence des moteurs de calcul")
+    parser.add_argument("--fichier", default=str(FICHIER_REEL), help="Fichier de relevés réel")
+    parser.add_argument("--sans-synthetique", action="store_true", help="Ne pas générer de jeu synthétique")
+    parser.add_argument("--rapide", action="store_true", help="Grille réduite")
+    parser.add_argument("--graine", type=int, default=0, help="Graine du jeu synthétique")
+    args = parser.parse_args()
+
+    # Aucun affichage nécessaire
+    matplotlib.use("Agg")
+    # Types mixtes de la colonne EVENEMENT, signalés à chaque lecture du fichier réel
+    warnings.simplefilter("ignore", pd.errors.DtypeWarning)
+    debut = time.perf_counter()
+    banc = executer(args.fichier, not args.sans_synthetique, args.rapide, args.graine)
+    print(banc.rapport())
+    print(f"{'Équivalence vérifiée' if banc.conforme else 'ÉCARTS HORS TOLÉRANCE'} "
+          f"({time.perf_counter() - debut:.1f} s)")
+    return 0 if banc.conforme else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from prep_data import lire_releves
+
+
+# Colonnes conservées dans la base (les colonnes *_UNITE sont implicites)
+COLONNES_TEXTE = ["NOM_STATION", "EVENEMENT"]
+COLONNES_NUM = ["COTE", "VOLUME", "SURFACE", "DEBIT_IN", "DEBIT_OUT", "EVAPORATION", "PLUVIOMETRIE"]
+
+# Table sans rowid : la clé primaire (CODE_STATION, DATE_RELEVE) est l'index
+# de stockage lui-même, donc couvrant pour toutes les colonnes.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS releves (
+    CODE_STATION INTEGER NOT NULL,
+    DATE_RELEVE TEXT NOT NULL,
+    {", ".join(f"{col} TEXT" for col in COLONNES_TEXTE)},
+    {", ".join(f"{col} REAL" for col in COLONNES_NUM)},
+    PRIMARY KEY (CODE_STATION, DATE_RELEVE)
+) WITHOUT ROWID
+"""
+
+
+def connecter_base(chemin_base, lecture_seule=False):
+    """
+    Ouvre la base SQLite des relevés.
+
+    En écriture, la base est créée si besoin et passée en journal WAL :
+    plusieurs analystes peuvent lire le même fichier pendant une mise à jour.
+    """
+    if lecture_seule:
+        chemin = Path(chemin_base)
+        if not chemin.exists():
+            raise FileNotFoundError(f"Base SQLite introuvable : {chemin}")
+        return sqlite3.connect(f"{chemin.resolve().as_uri()}?mode=ro", uri=True)
+
+    connexion = sqlite3.connect(chemin_base)
+    connexion.execute("PRAGMA journal_mode=WAL")
+    connexion.execute(SCHEMA)
+    return connexion
+
+
+def ajouter_releves(chemin_base, data):
+    """
+    Insère ou met à jour (upsert) des relevés dans la base.
+
+    Un relevé déjà présent pour le même couple (CODE_STATION, DATE_RELEVE)
+    est remplacé : c'est ainsi que les relevés corrigés sont pris en compte.
+
+    Paramètres:
+        chemin_base (str | Path): Fichier SQLite (créé si absent).
+        data (pd.DataFrame): Relevés au format lire_releves / charger_donnees.
+
+    Retour:
+        int: Nombre de relevés insérés ou mis à jour.
+    """
+    data = data.dropna(subset=["CODE_STATION", "DATE_RELEVE"])
+
+    colonnes = ["CODE_STATION", "DATE_RELEVE"] + COLONNES_TEXTE + COLONNES_NUM
+    lignes = pd.DataFrame({
+        "CODE_STATION": data["CODE_STATION"].astype(int),
+        "DATE_RELEVE": pd.to_datetime(data["DATE_RELEVE"]).dt.strftime("%Y-%m-%d")
+    })
+    for col in COLONNES_TEXTE:
+        lignes[col] = data[col].astype("string").str.strip() if col in data.columns else None
+    for col in COLONNES_NUM:
+        lignes[col] = data[col].astype(float) if col in data.columns else None
+
+    # NaN -> NULL
+    lignes = lignes.astype(object).where(lignes.notna(), None)
+
+    mise_a_jour = ", ".join(f"{col}=excluded.{col}" for col in colonnes[2:])
+    requete = (
+        f"INSERT INTO releves ({', '.join(colonnes)}) "
+        f"VALUES ({', '.join('?' * len(colonnes))}) "
+        f"ON CONFLICT(CODE_STATION, DATE_RELEVE) DO UPDATE SET {mise_a_jour}"
+    )
+
+    connexion = connecter_base(chemin_base)
+    try:
+        with connexion:
+            connexion.executemany(requete, lignes.itertuples(index=False, name=None))
+    finally:
+        connexion.close()
+    return len(lignes)
+
+
+def importer_csv_sqlite(chemin_fichier, chemin_base):
+    """
+    Import (ou mise à jour) d'un fichier CSV de relevés dans la base SQLite.
+
+    Le fichier peut être l'historique complet ou seulement les relevés du jour.
+
+    Retour:
+        int: Nombre de relevés insérés ou mis à jour.
+    """
+    return ajouter_releves(chemin_base, lire_releves(chemin_fichier))
+
+
+def charger_donnees_sqlite(chemin_base, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Équivalent de charger_donnees à partir de la base SQLite.
+
+    La sélection se fait par une requête d'intervalle sur la clé
+    (CODE_STATION, DATE_RELEVE) : seules les lignes utiles sont lues.
+
+    Paramètres:
+        chemin_base (str | Path): Fichier SQLite produit par importer_csv_sqlite.
+        code_station (int): Code de la station, par défaut 34 (barrage du Salagou).
+        date_debut (int): Année de début (exclue), par défaut 1997.
+        date_fin (int): Année de fin (exclue), par défaut 2025.
+
+    Retour:
+        pd.DataFrame: Données filtrées pour la station et la période spécifiée, triées par date.
+    """
+    requete = (
+        "SELECT * FROM releves "
+        "WHERE CODE_STATION = ? AND DATE_RELEVE >= ? AND DATE_RELEVE < ? "
+        "ORDER BY DATE_RELEVE"
+    )
+    connexion = connecter_base(chemin_base, lecture_seule=True)
+    try:
+        data = pd.read_sql_query(
+            requete,
+            connexion,
+            params=(int(code_station), f"{date_debut + 1:04d}-01-01", f"{date_fin:04d}-01-01")
+        )
+    finally:
+        connexion.close()
+
+    data["DATE_RELEVE"] = pd.to_datetime(data["DATE_RELEVE"], format="%Y-%m-%d")
+    for col in COLONNES_NUM:
+        data[col] = data[col].astype(float)
+    return data
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+COLONNES = ["VOLUME_DEBUT", "ENTREE_CLIMAT", "EVAP_CLIMAT"]
+
+# Intervalles déjà calculés (sans lâchures), par clé fournie par l'appelant
+_CACHE = OrderedDict()
+TAILLE_CACHE = 16
+
+
+def cube_annees(agregats, schema):
+    """
+    Agrégats par période rangés en cube années × périodes × variables.
+
+    Paramètres:
+        agregats (pd.DataFrame): Sortie de periodes.agreger_periodes
+            (colonnes ANNEE, PERIODE, VOLUME_DEBUT, ENTREE_CLIMAT, EVAP_CLIMAT).
+        schema (SchemaPeriodes): Découpage de l'année.
+
+    Retour:
+        np.ndarray: (n_annees, n_periodes, 3), NaN pour les périodes sans données.
+    """
+    annees, ligne = np.unique(agregats["ANNEE"].to_numpy(), return_inverse=True)
+    cube = np.full((len(annees), schema.n, len(COLONNES)), np.nan)
+    cube[ligne, agregats["PERIODE"].to_numpy(dtype=int)] = agregats[COLONNES].to_numpy(dtype=float)
+    return cube
+
+
+def _quantiles_nan(valeurs, percentiles, axis):
+    """
+    Équivalent de np.nanquantile (interpolation linéaire) par tri : les NaN
+    sont rangés en fin d'axe, et la position de chaque quantile est calculée
+    à partir du nombre de valeurs renseignées.
+
+    Retour:
+        np.ndarray: Quantiles sur le premier axe, puis les axes restants.
+    """
+    tri = np.sort(np.moveaxis(valeurs, axis, -1), axis=-1)
+    n = (~np.isnan(tri)).sum(axis=-1, keepdims=True)
+    resultats = []
+    for p in percentiles:
+        position = (n - 1) * p
+        bas = np.floor(position).astype(int).clip(0, None)
+        haut = np.minimum(bas + 1, np.maximum(n - 1, 0))
+        v_bas = np.take_along_axis(tri, bas, axis=-1)
+        v_haut = np.take_along_axis(tri, haut, axis=-1)
+        q = v_bas + (v_haut - v_bas) * (position - bas)
+        resultats.append(np.where(n > 0, q, np.nan)[..., 0])
+    return np.stack(resultats)
+
+
+def _indicateurs_tirages(cube, percentiles, graine, n_tirages):
+    """
+    Indicateurs sans lâchure (avant décalage d'une période) pour un lot de
+    tirages : les années de chaque tirage sont un tableau d'indices, et
+    toutes les quantiles sont calculées en un seul appel vectorisé.
+
+    Retour:
+        np.ndarray: (n_tirages, n_percentiles, n_periodes).
+    """
+    rng = np.random.default_rng(graine)
+    n_annees = cube.shape[0]
+    indices = rng.integers(0, n_annees, size=(n_tirages, n_annees))
+    echantillons = cube[indices]  # (n_tirages, n_annees, n_periodes, 3)
+    with np.errstate(invalid="ignore"):
+        # Tirage sans aucune année renseignée pour une période : NaN
+        q = _quantiles_nan(echantillons, percentiles, axis=1)  # (n_percentiles, n_tirages, n_periodes, 3)
+    base = q[..., 0] + q[..., 1] - q[..., 2]
+    return base.transpose(1, 0, 2)
+
+
+def intervalles_confiance(agregats, schema, percentiles=(0.25, 0.5), vect_lach=None, n_tirages=2000,
+                          niveau=0.90, graine=0, taille_lot=250, cle=None):
+    """
+    Intervalles de confiance bootstrap des indicateurs par période : les
+    années sont rééchantillonnées avec remise, l'indicateur recalculé sur
+    chaque tirage, et les bornes prises aux quantiles (1-niveau)/2 et
+    (1+niveau)/2 des tirages.
+
+    Les tirages sont calculés sur place, par lots de tableaux d'indices
+    vectorisés (quelques dizaines de ms pour 2000 tirages : un pool de
+    processus coûterait plus cher à démarrer). Les lâchures ne font que
+    décaler les courbes : elles sont appliquées après coup, ce qui permet de
+    réutiliser le cache quand seules les lâchures changent.
+
+    Paramètres:
+        agregats (pd.DataFrame | callable): Sortie de periodes.agreger_periodes,
+            ou fonction sans argument qui la renvoie, appelée seulement si le
+            résultat n'est pas en cache.
+        schema (SchemaPeriodes): Découpage de l'année.
+        percentiles (list): Percentiles des indicateurs (entre 0 et 1).
+        vect_lach (list, optional): 12 lâchures mensuelles (m³).
+        n_tirages (int): Nombre de rééchantillonnages.
+        niveau (float): Niveau de confiance (ex: 0.90).
+        graine (int): Graine (résultats reproductibles).
+        taille_lot (int): Nombre de tirages par lot (borne la mémoire).
+        cle (tuple, optional): Identifiant des données (ex: station, années, %,
+            version des relevés), pour mettre le résultat en cache.
+
+    Retour:
+        tuple: (bas, haut), tableaux (n_percentiles, n_periodes) comme indicateurs_periodes.
+    """
+    percentiles = list(percentiles)
+    cle_cache = None if cle is None else (
+        cle, schema.nom, tuple(percentiles), n_tirages, niveau, graine
+    )
+
+    if cle_cache is not None and cle_cache in _CACHE:
+        _CACHE.move_to_end(cle_cache)
+        bas, haut = _CACHE[cle_cache]
+    else:
+        if callable(agregats):
+            agregats = agregats()
+        cube = cube_annees(agregats, schema)
+        tailles = [min(taille_lot, n_tirages - debut) for debut in range(0, n_tirages, taille_lot)]
+        graines = np.random.SeedSequence(graine).spawn(len(tailles))
+        lots = [_indicateurs_tirages(cube, percentiles, g, n) for g, n in zip(graines, tailles)]
+
+        tirages = np.concatenate(lots)
+        alpha = (1 - niveau) / 2
+        with np.errstate(invalid="ignore"):
+            bas, haut = _quantiles_nan(tirages, [alpha, 1 - alpha], axis=0)
+
+        if cle_cache is not None:
+            _CACHE[cle_cache] = (bas, haut)
+            while len(_CACHE) > TAILLE_CACHE:
+                _CACHE.popitem(last=False)
+
+    # Lâchures et décalage d'une période, comme indicateurs_periodes
+    lach = schema.repartir_lachures([0] * 12 if vect_lach is None else vect_lach)
+    return np.roll(bas - lach, 1, axis=1), np.roll(haut - lach, 1, axis=1)
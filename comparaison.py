@@ -0,0 +1,107 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from interpolation import cote_to_volume, volumes_to_cotes
+from periodes import SCHEMAS, agreger_periodes, indicateurs_periodes
+from prep_data import charger_releves, calculs_journaliers
+from stations import REGISTRE_STATIONS, station_par_code
+
+# Pool de processus partagé par les comparaisons successives (créé au premier appel)
+_POOL = None
+_VERROU_POOL = threading.Lock()
+
+
+def indicateurs_station(chemin, code_station, date_debut=1997, date_fin=2025, evap_pct=0.10,
+                        entree_pct=0.10, percentiles=(0.25, 0.5), vect_lach=None,
+                        nom_schema="Mois", mode="volume", data=None, table_hsv=None):
+    """
+    Chargement, simulation et indicateurs d'une station (exécuté dans un processus de travail).
+
+    `data` (relevés déjà chargés) et `table_hsv` évitent la relecture des
+    fichiers quand l'appelant les garde en mémoire (service local).
+
+    Retour:
+        dict : Contient 'code', 'titre', 'df_res' (index = percentiles, colonnes = périodes),
+            'vmin' et 'vmax' (seuils de la station, en volume ou en cote selon le mode).
+    """
+    if data is None:
+        data = charger_releves(chemin, code_station, date_debut, date_fin)
+    if data.empty:
+        raise ValueError(f"Aucune donnée pour la station {code_station} sur la période.")
+
+    schema = SCHEMAS[nom_schema]
+    journalier = calculs_journaliers(data, evap_pct, entree_pct)
+    valeurs = indicateurs_periodes(agreger_periodes(journalier, schema), schema, percentiles, vect_lach)
+
+    nom, infos = station_par_code(code_station)
+    vmin, vmax = infos["cote_min"], infos["cote_max"]
+    if mode == "cote":
+        valeurs = volumes_to_cotes(valeurs, table_hsv, code=code_station).round(2)
+    else:
+        valeurs = valeurs.round(0)
+        if not np.isnan(valeurs).any():
+            valeurs = valeurs.astype(int)
+        vmin = cote_to_volume(vmin, table_hsv, code=code_station)
+        vmax = cote_to_volume(vmax, table_hsv, code=code_station)
+
+    return {
+        "code": code_station,
+        "titre": nom,
+        "df_res": pd.DataFrame(valeurs, index=[f"q {p}" for p in percentiles], columns=schema.etiquettes),
+        "vmin": vmin,
+        "vmax": vmax
+    }
+
+
+def pool_comparaison(max_workers=None):
+    """
+    Pool de processus réutilisé d'une comparaison à l'autre : le démarrage
+    des processus (import de pandas, scipy...) n'est payé qu'une fois.
+
+    Paramètres:
+        max_workers (int, optional): Nombre de processus à la création,
+            par défaut un par station du registre.
+    """
+    global _POOL
+    with _VERROU_POOL:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=max_workers or len(REGISTRE_STATIONS))
+        return _POOL
+
+
+def fermer_pool():
+    """Arrête le pool partagé (fermeture de l'application)."""
+    global _POOL
+    with _VERROU_POOL:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def comparer_stations(chemin, codes, max_workers=None, **parametres):
+    """
+    Calcule les indicateurs de plusieurs stations en parallèle (un processus par
+    station), dans le pool partagé. Appel bloquant : depuis l'interface, le
+    lancer dans un thread.
+
+    Paramètres:
+        chemin (str): Fichier de relevés (CSV, SQLite ou stockage binaire).
+        codes (list): Codes des stations à comparer.
+        max_workers (int, optional): Nombre de processus à la création du pool.
+        **parametres: Paramètres transmis à indicateurs_station.
+
+    Retour:
+        list: Résultats de indicateurs_station, dans l'ordre de `codes`.
+    """
+    pool = pool_comparaison(max_workers)
+    try:
+        futures = [pool.submit(indicateurs_station, chemin, code, **parametres) for code in codes]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # Processus de travail tué : un nouveau pool sera créé au prochain appel
+        fermer_pool()
+        raise
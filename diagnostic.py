@@ -0,0 +1,95 @@
+"""
+Profilage à la demande des actions de l'application.
+
+Les méthodes décorées par @profiler_action ne sont profilées que lorsque
+le profileur est armé (armer_profilage) : pour les N actions suivantes,
+chaque action est exécutée sous cProfile et deux fichiers sont écrits dans
+DOSSIER_DIAGNOSTIC :
+    - <horodatage>_<action>.prof : statistiques complètes (graphe d'appels,
+      lisible avec pstats, snakeviz ou gprof2dot) ;
+    - <horodatage>_<action>.txt : fonctions les plus coûteuses.
+Désarmé, le décorateur se limite à un test d'entier avant l'appel.
+"""
+import cProfile
+import functools
+import io
+import platform
+import pstats
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+DOSSIER_DIAGNOSTIC = Path.home() / ".salagou" / "diagnostic"
+NB_FONCTIONS_RESUME = 30
+
+# Nombre d'actions restant à profiler (0 : profilage désactivé)
+_restants = 0
+_en_cours = False
+
+
+def armer_profilage(n=5):
+    """Profile les n prochaines actions décorées."""
+    global _restants
+    _restants = max(0, int(n))
+
+
+def desarmer_profilage():
+    global _restants
+    _restants = 0
+
+
+def profilage_actif():
+    return _restants > 0
+
+
+def _ecrire_profil(profil, nom, duree, dossier):
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    base = dossier / f"{datetime.now():%Y%m%d_%H%M%S_%f}_{nom}"
+    profil.dump_stats(f"{base}.prof")
+
+    flux = io.StringIO()
+    stats = pstats.Stats(profil, stream=flux).strip_dirs()
+    stats.sort_stats("cumulative").print_stats(NB_FONCTIONS_RESUME)
+    stats.sort_stats("tottime").print_stats(NB_FONCTIONS_RESUME)
+    with open(f"{base}.txt", "w", encoding="utf-8") as f:
+        f.write(f"Action : {nom}\n")
+        f.write(f"Durée totale : {duree:.3f} s\n")
+        f.write(f"Python {sys.version.split()[0]} - {platform.platform()}\n\n")
+        f.write(flux.getvalue())
+    return base
+
+
+def profiler_action(methode=None, dossier=None):
+    """
+    Décorateur des actions (callbacks) à profiler quand le profilage est armé.
+    Les actions appelées depuis une action déjà profilée sont incluses dans
+    son profil, sans en créer un nouveau.
+    """
+    if methode is None:
+        return functools.partial(profiler_action, dossier=dossier)
+
+    @functools.wraps(methode)
+    def enveloppe(*args, **kwargs):
+        global _restants, _en_cours
+        if not _restants or _en_cours:
+            return methode(*args, **kwargs)
+
+        _restants -= 1
+        _en_cours = True
+        profil = cProfile.Profile()
+        debut = time.perf_counter()
+        try:
+            return profil.runcall(methode, *args, **kwargs)
+        finally:
+            duree = time.perf_counter() - debut
+            _en_cours = False
+            try:
+                base = _ecrire_profil(profil, methode.__name__, duree, dossier or DOSSIER_DIAGNOSTIC)
+                print(f"Profil de {methode.__name__} ({duree:.3f} s) : {base}.prof")
+            except OSError as e:
+                print(f"Profil non écrit : {e}")
+
+    return enveloppe
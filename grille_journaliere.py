@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+from prep_data import lire_releves
+
+
+# Types de stockage par variable : float32 suffit pour la cote, les débits et
+# l'évaporation ; le volume (~1e8 m³) reste en float64 pour garder le m³ près.
+VARIABLES_GRILLE = {
+    "COTE": np.float32,
+    "VOLUME": np.float64,
+    "DEBIT_OUT": np.float32,
+    "EVAPORATION": np.float32
+}
+
+
+class GrilleJournaliere:
+    """
+    Série journalière d'une station sur une grille de dates contiguë.
+
+    L'indice d'un jour dans les tableaux est son décalage (en jours) par rapport
+    à la date d'origine : la recherche par date est donc en O(1). Les jours sans
+    relevé sont explicitement marqués dans le masque `present` et valent NaN
+    dans toutes les variables.
+
+    Attributs:
+        code_station (int): Code de la station.
+        origine (np.datetime64): Premier jour de la grille (précision jour).
+        valeurs (dict): Tableaux NumPy par variable, tous de longueur n_jours.
+        present (np.ndarray): Masque booléen des jours ayant un relevé.
+    """
+
+    def __init__(self, code_station, origine, valeurs, present):
+        self.code_station = code_station
+        self.origine = np.datetime64(origine, "D")
+        self.valeurs = valeurs
+        self.present = present
+
+    @property
+    def n_jours(self):
+        return len(self.present)
+
+    @property
+    def dates(self):
+        return self.origine + np.arange(self.n_jours)
+
+    def indice(self, date):
+        """Décalage (en jours) d'une date par rapport à l'origine de la grille."""
+        return int((np.datetime64(date, "D") - self.origine).astype(int))
+
+    def valeur(self, variable, date):
+        """Valeur d'une variable à une date (NaN si hors grille ou lacune)."""
+        i = self.indice(date)
+        if i < 0 or i >= self.n_jours:
+            return np.nan
+        return self.valeurs[variable][i]
+
+    def masque(self, variable):
+        """Masque des jours où la variable est renseignée."""
+        return ~np.isnan(self.valeurs[variable])
+
+    def fenetre(self, date_debut, date_fin):
+        """
+        Sous-grille [date_debut, date_fin[ sans copie (vues sur les tableaux).
+        """
+        i0 = min(max(self.indice(date_debut), 0), self.n_jours)
+        i1 = min(max(self.indice(date_fin), i0), self.n_jours)
+        return GrilleJournaliere(
+            self.code_station,
+            self.origine + i0,
+            {var: tab[i0:i1] for var, tab in self.valeurs.items()},
+            self.present[i0:i1]
+        )
+
+    def vers_dataframe(self):
+        """
+        Retour au format de charger_donnees : une ligne par jour présent,
+        triée par date.
+        """
+        present = self.present
+        df = pd.DataFrame({"CODE_STATION": self.code_station,
+                           "DATE_RELEVE": self.dates[present].astype("datetime64[ns]")})
+        for var, tab in self.valeurs.items():
+            df[var] = tab[present].astype(float)
+        return df
+
+
+def construire_grille(data, code_station=None, variables=None):
+    """
+    Réindexe les relevés d'une station sur une grille journalière contiguë.
+
+    Paramètres:
+        data (pd.DataFrame): Relevés d'une station (format charger_donnees).
+        code_station (int, optional): Code station ; par défaut lu dans CODE_STATION.
+        variables (dict, optional): Variables à stocker et leur type NumPy,
+            par défaut VARIABLES_GRILLE.
+
+    Retour:
+        GrilleJournaliere: Série de la station sur la grille. En cas de dates
+            en double, le dernier relevé est conservé.
+    """
+    if variables is None:
+        variables = VARIABLES_GRILLE
+    if code_station is None:
+        code_station = int(data["CODE_STATION"].iloc[0])
+
+    dates = pd.to_datetime(data["DATE_RELEVE"]).to_numpy(dtype="datetime64[D]")
+    valides = ~np.isnat(dates)
+    dates = dates[valides]
+    if dates.size == 0:
+        raise ValueError(f"Aucune date valide pour la station {code_station}")
+
+    origine = dates.min()
+    indices = (dates - origine).astype(int)
+    n_jours = int(indices.max()) + 1
+
+    present = np.zeros(n_jours, dtype=bool)
+    present[indices] = True
+
+    valeurs = {}
+    for var, dtype in variables.items():
+        tab = np.full(n_jours, np.nan, dtype=dtype)
+        if var in data.columns:
+            tab[indices] = data[var].to_numpy(dtype=float)[valides]
+        valeurs[var] = tab
+
+    return GrilleJournaliere(code_station, origine, valeurs, present)
+
+
+def charger_grilles(chemin_fichier, variables=None):
+    """
+    Charge le fichier de relevés et construit la grille journalière de chaque station.
+
+    Retour:
+        dict: GrilleJournaliere indexée par code station.
+    """
+    data_full = lire_releves(chemin_fichier)
+    return {
+        int(code): construire_grille(groupe, int(code), variables)
+        for code, groupe in data_full.groupby("CODE_STATION", sort=True)
+    }
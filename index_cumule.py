@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from prep_data import calculs_journaliers
+
+
+class IndexCumule:
+    """
+    Index précalculé d'une station pour changer la plage d'années sans
+    refiltrer ni réagréger les relevés.
+
+    Construit une fois sur toutes les années, il contient :
+        - les agrégats mensuels bruts (grilles année × mois) : les résultats
+          d'une plage sont une tranche de lignes de ces grilles ;
+        - la position des relevés de chaque année dans les données triées.
+
+    Les indicateurs prennent des quantiles entre années, mois par mois : ils
+    ont besoin des valeurs de chaque (année, mois) de la plage, pas de leurs
+    totaux. Une tranche des grilles suffit donc, sans sommes cumulées.
+
+    Les résultats sont ceux de simuler_salagou sur charger_donnees(plage) :
+    le premier relevé de la plage n'a pas de jour précédent, son entrée
+    naturelle est donc retirée de son mois (correction du premier jour).
+
+    Paramètres:
+        data (pd.DataFrame): Relevés d'une station, toutes années (charger_donnees
+            avec des bornes larges).
+    """
+
+    VARIABLES = ["ENTREE_NATURELLE", "EVAPORATION", "DEBIT_OUT_m3", "SOMME_COTE", "NB_COTE"]
+
+    def __init__(self, data):
+        self.data = data.sort_values("DATE_RELEVE").reset_index(drop=True)
+        journalier = calculs_journaliers(self.data, 0.0, 0.0)
+
+        dates = journalier["DATE_RELEVE"].to_numpy(dtype="datetime64[D]")
+        annees_jour = dates.astype("datetime64[Y]").astype(int) + 1970
+        mois_jour = dates.astype("datetime64[M]").astype(int) % 12
+
+        self.annees = np.arange(annees_jour.min(), annees_jour.max() + 1)
+        n = len(self.annees)
+        case = (annees_jour - self.annees[0]) * 12 + mois_jour
+
+        def _grille(valeurs):
+            valeurs = np.nan_to_num(np.asarray(valeurs, dtype=float))
+            return np.bincount(case, weights=valeurs, minlength=n * 12).reshape(n, 12)
+
+        cotes = journalier["COTE"].to_numpy(dtype=float)
+        entree = journalier["ENTREE_NATURELLE"].to_numpy(dtype=float)
+        self.mensuel = {
+            "ENTREE_NATURELLE": _grille(entree),
+            "EVAPORATION": _grille(journalier["EVAPORATION"]),
+            "DEBIT_OUT_m3": _grille(journalier["DEBIT_OUT_m3"]),
+            "SOMME_COTE": _grille(cotes),
+            "NB_COTE": _grille(~np.isnan(cotes)),
+        }
+        self.present = np.bincount(case, minlength=n * 12).reshape(n, 12) > 0
+
+        # Volume du premier jour : relevé du 1er du mois
+        self.volume_premier_jour = np.full((n, 12), np.nan)
+        premier = dates == dates.astype("datetime64[M]")
+        self.volume_premier_jour.flat[case[premier]] = journalier["VOLUME"].to_numpy(dtype=float)[premier]
+
+        # Premier relevé de chaque année : position dans les données et entrée à retirer
+        self.debut_annee = np.searchsorted(annees_jour, self.annees, side="left")
+        self.fin_annee = np.searchsorted(annees_jour, self.annees, side="right")
+        presente = self.debut_annee < self.fin_annee
+        premiers = self.debut_annee[presente]
+        self.correction_mois = np.full(n, -1)
+        self.correction_entree = np.zeros(n)
+        self.correction_mois[presente] = mois_jour[premiers]
+        self.correction_entree[presente] = np.nan_to_num(entree[premiers])
+
+    def _lignes(self, date_debut, date_fin):
+        """Indices [i0, i1) des années strictement comprises entre les bornes."""
+        i0 = int(np.clip(date_debut + 1 - self.annees[0], 0, len(self.annees)))
+        i1 = int(np.clip(date_fin - self.annees[0], i0, len(self.annees)))
+        return i0, i1
+
+    def _correction(self, i0, i1):
+        """(ligne, mois, entrée) du premier relevé de la plage, ou None."""
+        annees_presentes = np.flatnonzero(self.correction_mois[i0:i1] >= 0)
+        if annees_presentes.size == 0:
+            return None
+        ligne = i0 + annees_presentes[0]
+        return ligne, self.correction_mois[ligne], self.correction_entree[ligne]
+
+    def releves(self, date_debut=1997, date_fin=2025):
+        """Relevés de la plage (comme charger_donnees), par tranche des données triées."""
+        i0, i1 = self._lignes(date_debut, date_fin)
+        if i0 >= i1:
+            return self.data.iloc[0:0]
+        return self.data.iloc[self.debut_annee[i0]:self.fin_annee[i1 - 1]]
+
+    def resultats(self, date_debut=1997, date_fin=2025, evap_pct=0.10, entree_pct=0.10):
+        """
+        Résultats de simuler_salagou pour la plage d'années, sans relire ni
+        réagréger les relevés.
+
+        Retour:
+            dict : 'cote_moyenne' et 'donnees_simulees', au format de simuler_salagou.
+        """
+        i0, i1 = self._lignes(date_debut, date_fin)
+        present = self.present[i0:i1]
+        lignes, mois = np.nonzero(present)
+
+        entree = self.mensuel["ENTREE_NATURELLE"][i0:i1].copy()
+        correction = self._correction(i0, i1)
+        if correction is not None:
+            entree[correction[0] - i0, correction[1]] -= correction[2]
+        entree = entree[lignes, mois]
+        evaporation = self.mensuel["EVAPORATION"][i0:i1][lignes, mois]
+
+        mois_index = pd.to_datetime(pd.DataFrame({
+            "year": self.annees[i0:i1][lignes], "month": mois + 1, "day": 1
+        }))
+        nb_cotes = self.mensuel["NB_COTE"][i0:i1][lignes, mois]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cote_moyenne = pd.DataFrame({
+                "MOIS": mois_index,
+                "COTE_MOYENNE": np.where(nb_cotes > 0, self.mensuel["SOMME_COTE"][i0:i1][lignes, mois] / nb_cotes,
+                                         np.nan)
+            })
+        cote_moyenne["ANNEE"] = cote_moyenne["MOIS"].dt.year
+        cote_moyenne["MOIS_NUM"] = cote_moyenne["MOIS"].dt.month
+
+        donnees_mensuelles = pd.DataFrame({
+            "MOIS": mois_index,
+            "ENTREE_NATURELLE": np.maximum(entree, 0),
+            "EVAPORATION": np.maximum(evaporation, 0),
+            "EVAP_CLIMAT": np.maximum(evaporation * (1 + evap_pct), 0),
+            "ENTREE_CLIMAT": np.maximum(entree * (1 - entree_pct), 0),
+            "VOLUME_PREMIER_JOUR": self.volume_premier_jour[i0:i1][lignes, mois]
+        })
+
+        return {
+            "cote_moyenne": cote_moyenne,
+            "donnees_simulees": donnees_mensuelles
+        }
@@ -1,10 +1,29 @@
 #%%
 import pandas as pd
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from scipy.interpolate import interp1d
 
 
+def chemin_hsv(code=34):
+    """Fichier HSV par défaut d'une station : data/HSV_<code>.txt."""
+    try:
+        base_path = Path(__file__).parent
+    except NameError:
+        base_path = Path.cwd()
+    return base_path / "data" / f"HSV_{code}.txt"
+
+
+def _version_hsv(code):
+    """(date de modification, taille) du fichier HSV, None s'il est absent."""
+    try:
+        stat = chemin_hsv(code).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 def charger_table_hsv(depuis_fichier=True, chemin=None, code=34):
     """
     Charge la table HSV (par défaut HSV_<code>.txt/csv) et nettoie les colonnes.
@@ -22,12 +41,7 @@ def charger_table_hsv(depuis_fichier=True, chemin=None, code=34):
 
     # Détermination du chemin
     if chemin is None:
-        try:
-            base_path = Path(__file__).parent
-        except NameError:
-            base_path = Path.cwd()
-        
-        chemin = base_path / "data" / f"HSV_{code}.txt"
+        chemin = chemin_hsv(code)
 
     chemin = Path(chemin)
     if not chemin.exists():
@@ -76,24 +90,62 @@ def charger_table_hsv(depuis_fichier=True, chemin=None, code=34):
     return table
 
 
-def volume_to_cote(volume, table_interpolation=None, code=34):
+def table_hsv_station(code=34):
     """
-    Interpole la cote (m NGF) à partir d'un volume (m³).
+    Table HSV par défaut d'une station (data/HSV_<code>.txt), lue une seule
+    fois par version du fichier : une table remplacée (date ou taille
+    changées) est relue. La table renvoyée est partagée : ne pas la modifier.
     """
-    if table_interpolation is None:
-        table_interpolation = charger_table_hsv(code=code)
+    return _table_hsv_version(code, _version_hsv(code))
+
+
+@lru_cache(maxsize=16)
+def _table_hsv_version(code, version):
+    return charger_table_hsv(code=code)
 
-    # Tri pour garantir ordre croissant
-    table_sorted = table_interpolation.sort_values("Volume")
 
-    interpolateur = interp1d(
-        table_sorted["Volume"],
-        table_sorted["Cote"],
+def _interpolateurs_station(code=34):
+    """Interpolateurs volume -> cote et cote -> volume de la table par défaut d'une station."""
+    return _interpolateurs_version(code, _version_hsv(code))
+
+
+@lru_cache(maxsize=16)
+def _interpolateurs_version(code, version):
+    table = _table_hsv_version(code, version)
+    return _interpolateur(table, "Volume", "Cote"), _interpolateur(table, "Cote", "Volume")
+
+
+def vider_cache_hsv():
+    """Oublie les tables HSV et interpolateurs en mémoire (relus au prochain appel)."""
+    _table_hsv_version.cache_clear()
+    _interpolateurs_version.cache_clear()
+
+
+def _interpolateur(table_interpolation, x, y):
+    # Tri pour garantir ordre croissant
+    table_sorted = table_interpolation.sort_values(x)
+    return interp1d(
+        table_sorted[x],
+        table_sorted[y],
         kind="linear",
         fill_value="extrapolate",
         assume_sorted=True
     )
-    return float(interpolateur(volume))
+
+
+def prechauffer_interpolation(code=34):
+    """Charge la table HSV d'une station et construit ses interpolateurs."""
+    _interpolateurs_station(code)
+
+
+def volume_to_cote(volume, table_interpolation=None, code=34):
+    """
+    Interpole la cote (m NGF) à partir d'un volume (m³).
+    """
+    if table_interpolation is None:
+        return float(_interpolateurs_station(code)[0](volume))
+
+    return float(_interpolateur(table_interpolation, "Volume", "Cote")(volume))
 
 # Interpolation Cote à Volume
 def cote_to_volume(cote, table_interpolation=None, code=34):
@@ -101,19 +153,61 @@ def cote_to_volume(cote, table_interpolation=None, code=34):
     Interpole le volume (en m³) à partir d'une cote (en m).
     """
     if table_interpolation is None:
-        table_interpolation = charger_table_hsv(code=code)
+        return float(_interpolateurs_station(code)[1](cote))
+
+    return float(_interpolateur(table_interpolation, "Cote", "Volume")(cote))
+
+
+def _interp_lineaire(x, xp, fp):
+    """
+    Interpolation linéaire vectorisée avec extrapolation aux bornes
+    (même comportement que interp1d(..., fill_value="extrapolate")).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.interp(x, xp, fp)
+
+    # Extrapolation linéaire à partir des deux premiers / derniers points
+    bas = x < xp[0]
+    haut = x > xp[-1]
+    if bas.any():
+        pente = (fp[1] - fp[0]) / (xp[1] - xp[0])
+        y[bas] = fp[0] + (x[bas] - xp[0]) * pente
+    if haut.any():
+        pente = (fp[-1] - fp[-2]) / (xp[-1] - xp[-2])
+        y[haut] = fp[-1] + (x[haut] - xp[-1]) * pente
+    return y
+
+
+def cotes_to_volumes(cotes, table_interpolation=None, code=34):
+    """
+    Version vectorisée de cote_to_volume : convertit un tableau de cotes (m)
+    en volumes (m³) en un seul appel. Les NaN sont conservés.
+    """
+    if table_interpolation is None:
+        table_interpolation = table_hsv_station(code)
 
-    # Tri pour garantir ordre croissant
     table_sorted = table_interpolation.sort_values("Cote")
+    return _interp_lineaire(
+        cotes,
+        table_sorted["Cote"].to_numpy(dtype=float),
+        table_sorted["Volume"].to_numpy(dtype=float)
+    )
 
-    interpolateur = interp1d(
-        table_sorted["Cote"],
-        table_sorted["Volume"],
-        kind="linear",
-        fill_value="extrapolate",
-        assume_sorted=True
+
+def volumes_to_cotes(volumes, table_interpolation=None, code=34):
+    """
+    Version vectorisée de volume_to_cote : convertit un tableau de volumes (m³)
+    en cotes (m NGF) en un seul appel. Les NaN sont conservés.
+    """
+    if table_interpolation is None:
+        table_interpolation = table_hsv_station(code)
+
+    table_sorted = table_interpolation.sort_values("Volume")
+    return _interp_lineaire(
+        volumes,
+        table_sorted["Volume"].to_numpy(dtype=float),
+        table_sorted["Cote"].to_numpy(dtype=float)
     )
-    return float(interpolateur(cote))
 
 
 
@@ -0,0 +1,70 @@
+import numpy as np
+
+from prep_graph import appliquer_lachures
+
+
+def evaluer_lachures(base, candidats, volume_min):
+    """
+    Évaluation groupée de vecteurs de lâchures candidats.
+
+    Paramètres:
+        base (np.ndarray): (12,) ligne de base_indicateurs pour le percentile contraint.
+        candidats (array-like): (n_candidats, 12) lâchures mensuelles (m³).
+        volume_min (float): Volume correspondant à la cote minimale (m³).
+
+    Retour:
+        dict : Contient
+            - 'total' : somme des lâchures de chaque candidat (n_candidats,)
+            - 'marge_min' : plus petite marge indicateur - volume_min sur l'année (n_candidats,)
+            - 'admissible' : True si la courbe reste au-dessus de volume_min tous les mois
+    """
+    candidats = np.atleast_2d(np.asarray(candidats, dtype=float))
+    indicateurs = appliquer_lachures(np.asarray(base, dtype=float)[None, :], candidats)[:, 0, :]
+    marge_min = (indicateurs - volume_min).min(axis=1)
+    return {
+        "total": candidats.sum(axis=1),
+        "marge_min": marge_min,
+        "admissible": (marge_min >= 0) & (candidats >= 0).all(axis=1)
+    }
+
+
+def optimiser_lachures(base, volume_min, lachures_max=None, pas=None):
+    """
+    Programme de lâchures maximisant le total lâché sous la contrainte
+    indicateur >= volume_min tous les mois.
+
+    L'indicateur du mois m ne dépend que de la lâchure du mois m-1
+    (indicateur(m) = base(m) - lachure(m-1)) : le problème est séparable
+    et son optimum exact est, mois par mois,
+    lachure(m-1) = min(lachures_max, base(m) - volume_min), bornée à 0.
+
+    Paramètres:
+        base (np.ndarray): (12,) ligne de base_indicateurs pour le percentile contraint.
+        volume_min (float): Volume correspondant à la cote minimale (m³).
+        lachures_max (float | array-like, optional): Plafond mensuel des lâchures (m³).
+        pas (float, optional): Arrondi inférieur des lâchures (ex: 1000 m³).
+
+    Retour:
+        dict : Contient
+            - 'lachures' : vecteur optimal de 12 lâchures (janvier en premier)
+            - 'total' : somme des lâchures
+            - 'indicateurs' : courbe obtenue (12,)
+            - 'mois_infaisables' : numéros des mois sous volume_min même sans lâchure
+    """
+    base = np.asarray(base, dtype=float)
+
+    # Lâchure du mois j limitée par l'indicateur du mois suivant
+    lachures = np.roll(base, -1) - volume_min
+    if lachures_max is not None:
+        lachures = np.minimum(lachures, np.broadcast_to(np.asarray(lachures_max, dtype=float), (12,)))
+    lachures = np.clip(np.nan_to_num(lachures, nan=0.0), 0, None)
+    if pas:
+        lachures = np.floor(lachures / pas) * pas
+
+    evaluation = evaluer_lachures(base, lachures[None, :], volume_min)
+    return {
+        "lachures": lachures,
+        "total": float(evaluation["total"][0]),
+        "indicateurs": appliquer_lachures(base[None, :], lachures)[0],
+        "mois_infaisables": [int(m) + 1 for m in np.flatnonzero(~(base >= volume_min))]
+    }
@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+from sketch_quantiles import SketchesMensuels
+
+
+MOIS_NOMS = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin",
+             "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
+
+
+def _mois0(dates):
+    """Mois (0 = janvier) de dates datetime64[D]."""
+    return dates.astype("datetime64[M]").astype(int) % 12
+
+
+def _jour_du_mois0(dates):
+    return (dates - dates.astype("datetime64[M]")).astype(int)
+
+
+def _jour_de_l_annee0(dates):
+    return (dates - dates.astype("datetime64[Y]")).astype(int)
+
+
+class SchemaPeriodes:
+    """
+    Découpage de l'année en périodes pour le calcul des indicateurs.
+
+    Paramètres:
+        nom (str): Nom affiché du découpage.
+        etiquettes (list): Libellé de chaque période, dans l'ordre d'affichage.
+        fonction_periode (callable): dates datetime64[D] -> indice de période (0..n-1).
+        libelle (str): Nom de l'axe / de la colonne des périodes.
+    """
+
+    def __init__(self, nom, etiquettes, fonction_periode, libelle="Période"):
+        self.nom = nom
+        self.etiquettes = list(etiquettes)
+        self.n = len(self.etiquettes)
+        self.libelle = libelle
+        self._fonction_periode = fonction_periode
+
+        # Mois de début de chaque période, sur une année non bissextile de référence
+        jours = np.arange("2001-01-01", "2002-01-01", dtype="datetime64[D]")
+        periodes = self.periode(jours)
+        debut = np.concatenate(([True], periodes[1:] != periodes[:-1]))
+        self.mois_de_periode = np.zeros(self.n, dtype=int)
+        self.mois_de_periode[periodes[debut]] = _mois0(jours[debut]) + 1
+
+        # Découpage mensuel (éventuellement réordonné) : une période par mois
+        self.mensuel = self.n == 12 and len(np.unique(self.mois_de_periode)) == 12
+        self.periode_du_mois = self.periode(jours[debut])[np.argsort(_mois0(jours[debut]))] \
+            if self.mensuel else None
+
+    def periode(self, dates):
+        """Indice de période de chaque date (vectorisé)."""
+        return np.asarray(self._fonction_periode(np.asarray(dates, dtype="datetime64[D]")), dtype=int)
+
+    def repartir_lachures(self, vect_lach):
+        """
+        Répartit 12 lâchures mensuelles sur les périodes : chaque période reçoit
+        la lâchure du mois où elle commence, divisée par le nombre de périodes
+        commençant dans ce mois.
+        """
+        lach = np.asarray(vect_lach, dtype=float)
+        nb_par_mois = np.bincount(self.mois_de_periode - 1, minlength=12)
+        return lach[self.mois_de_periode - 1] / nb_par_mois[self.mois_de_periode - 1]
+
+
+SCHEMAS = {
+    "Mois": SchemaPeriodes(
+        "Mois", MOIS_NOMS, _mois0, libelle="Mois"
+    ),
+    "Année hydrologique (oct.-sept.)": SchemaPeriodes(
+        "Année hydrologique (oct.-sept.)", MOIS_NOMS[9:] + MOIS_NOMS[:9],
+        lambda d: (_mois0(d) - 9) % 12, libelle="Mois"
+    ),
+    "Décades": SchemaPeriodes(
+        "Décades", [f"{m} D{i}" for m in MOIS_NOMS for i in (1, 2, 3)],
+        lambda d: _mois0(d) * 3 + np.minimum(_jour_du_mois0(d) // 10, 2)
+    ),
+    "Semaines": SchemaPeriodes(
+        "Semaines", [f"S{i}" for i in range(1, 53)],
+        # La 52e semaine absorbe le ou les deux derniers jours de l'année
+        lambda d: np.minimum(_jour_de_l_annee0(d) // 7, 51)
+    ),
+}
+
+
+def agreger_periodes(journalier, schema):
+    """
+    Agrégation des données journalières simulées par (année, période), en un seul groupby.
+
+    Paramètres:
+        journalier (pd.DataFrame): Sortie de prep_data.calculs_journaliers.
+        schema (SchemaPeriodes): Découpage de l'année.
+
+    Retour:
+        pd.DataFrame: Colonnes ANNEE, PERIODE, ENTREE_NATURELLE, EVAPORATION,
+            ENTREE_CLIMAT, EVAP_CLIMAT (sommes bornées à 0) et VOLUME_DEBUT
+            (volume du premier jour de la période).
+    """
+    dates = pd.to_datetime(journalier["DATE_RELEVE"]).to_numpy(dtype="datetime64[D]")
+    periode = schema.periode(dates)
+    debut = periode != schema.periode(dates - 1)
+
+    df = pd.DataFrame({
+        "ANNEE": dates.astype("datetime64[Y]").astype(int) + 1970,
+        "PERIODE": periode,
+        "ENTREE_NATURELLE": journalier["ENTREE_NATURELLE"].to_numpy(),
+        "EVAPORATION": journalier["EVAPORATION"].to_numpy(),
+        "ENTREE_CLIMAT": journalier["ENTREE_CLIMAT"].to_numpy(),
+        "EVAP_CLIMAT": journalier["EVAP_CLIMAT"].to_numpy(),
+        "VOLUME_DEBUT": journalier["VOLUME"].where(debut).to_numpy()
+    })
+
+    sommes = ["ENTREE_NATURELLE", "EVAPORATION", "ENTREE_CLIMAT", "EVAP_CLIMAT"]
+    agregats = df.groupby(["ANNEE", "PERIODE"]).agg(
+        {**{col: "sum" for col in sommes}, "VOLUME_DEBUT": "first"}
+    ).reset_index()
+    agregats[sommes] = agregats[sommes].clip(lower=0)
+    return agregats
+
+
+def agregats_depuis_mensuel(debut_mois, entree_clim, evap_clim, schema):
+    """
+    Agrégats par période à partir des tableaux mensuels au format long
+    (MOIS_NUM, valeur), pour un découpage mensuel éventuellement réordonné.
+    """
+    if not schema.mensuel:
+        raise ValueError(f"Le découpage '{schema.nom}' nécessite les données journalières.")
+
+    morceaux = []
+    for colonne, df_long in (("VOLUME_DEBUT", debut_mois),
+                             ("ENTREE_CLIMAT", entree_clim),
+                             ("EVAP_CLIMAT", evap_clim)):
+        mois = df_long["MOIS_NUM"].to_numpy(dtype=int)
+        morceaux.append(pd.DataFrame({
+            "PERIODE": schema.periode_du_mois[mois - 1],
+            colonne: df_long["valeur"].to_numpy(dtype=float)
+        }))
+    return pd.concat(morceaux, ignore_index=True)
+
+
+def sketches_mensuels(debut_mois, entree_clim, evap_clim, sketches=None, k=200, graine=None):
+    """
+    Alimente des sketches de quantiles par mois à partir des tableaux mensuels
+    au format long (MOIS_NUM, valeur), lot par lot.
+
+    Les sketches remplacent les agrégats dans indicateurs_periodes quand les
+    valeurs mensuelles sont trop nombreuses pour être gardées (Monte Carlo,
+    balayage de scénarios) ; ceux calculés dans plusieurs processus se
+    fusionnent avec SketchesMensuels.fusionner.
+
+    Retour:
+        SketchesMensuels: sketches (créés si None) des variables VOLUME_DEBUT,
+            ENTREE_CLIMAT et EVAP_CLIMAT.
+    """
+    if sketches is None:
+        sketches = SketchesMensuels(k, graine)
+    for variable, df_long in (("VOLUME_DEBUT", debut_mois),
+                              ("ENTREE_CLIMAT", entree_clim),
+                              ("EVAP_CLIMAT", evap_clim)):
+        sketches.mettre_a_jour(variable, df_long)
+    return sketches
+
+
+def indicateurs_periodes(agregats, schema, percentiles=(0.25, 0.5), vect_lach=None):
+    """
+    Indicateurs par période : pour chaque percentile p,
+    quantile(volume début) + quantile(entrées) - quantile(évaporation)
+    de la période précédente, moins la lâchure de la période précédente.
+
+    Paramètres:
+        agregats (pd.DataFrame | SketchesMensuels): Colonnes PERIODE, VOLUME_DEBUT,
+            ENTREE_CLIMAT, EVAP_CLIMAT, ou sketches par mois de ces trois variables
+            (voir sketches_mensuels ; découpage mensuel uniquement, quantiles approchés).
+        schema (SchemaPeriodes): Découpage de l'année.
+        percentiles (list): Percentiles (entre 0 et 1).
+        vect_lach (list, optional): 12 lâchures mensuelles (m³), réparties sur les périodes.
+
+    Retour:
+        np.ndarray: (n_percentiles, n_periodes), dans l'ordre d'affichage du découpage.
+    """
+    percentiles = list(percentiles)
+    if vect_lach is None:
+        vect_lach = [0] * 12
+
+    if isinstance(agregats, SketchesMensuels):
+        if not schema.mensuel:
+            raise ValueError(f"Le découpage '{schema.nom}' nécessite les données journalières.")
+
+        def _q(colonne):
+            q = agregats.quantiles(colonne, percentiles)
+            q.index = schema.periode_du_mois[q.index.to_numpy(dtype=int) - 1]
+            return q.reindex(index=range(schema.n), columns=percentiles).to_numpy(dtype=float).T
+    else:
+        colonnes = ["VOLUME_DEBUT", "ENTREE_CLIMAT", "EVAP_CLIMAT"]
+        quantiles = agregats.groupby("PERIODE")[colonnes].quantile(percentiles)
+
+        def _q(colonne):
+            q = quantiles[colonne].unstack()
+            return q.reindex(index=range(schema.n), columns=percentiles).to_numpy(dtype=float).T
+
+    base = _q("VOLUME_DEBUT") + _q("ENTREE_CLIMAT") - _q("EVAP_CLIMAT")
+    lach = schema.repartir_lachures(vect_lach)
+
+    # Chaque période est calculée à partir de la précédente (la première à partir de la dernière)
+    return np.roll(base - lach, 1, axis=1)
@@ -0,0 +1,97 @@
+"""
+Préchauffage en arrière-plan après le démarrage de l'application : les
+coûts de première utilisation (lecture du CSV, tables HSV, premier rendu
+matplotlib) sont payés pendant que l'utilisateur ne fait rien.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class Prechauffage:
+    """
+    Exécute une liste de tâches dans un thread d'arrière-plan, une à une.
+
+    Les actions de l'utilisateur restent prioritaires : chaque tâche attend
+    `delai_inactivite` secondes sans activité signalée (signaler_activite)
+    avant de démarrer. Une tâche commencée va à son terme (les tâches sont
+    courtes) ; annuler() empêche les suivantes.
+
+    Paramètres:
+        delai_inactivite (float): Inactivité requise avant chaque tâche (s).
+    """
+
+    def __init__(self, delai_inactivite=0.5):
+        self.delai_inactivite = delai_inactivite
+        self.taches = []
+        self.terminees = []
+        self._annule = threading.Event()
+        self._derniere_activite = time.monotonic()
+        self._thread = None
+
+    def ajouter(self, nom, fonction, *args):
+        self.taches.append((nom, fonction, args))
+        return self
+
+    def signaler_activite(self, *_):
+        """À appeler sur chaque événement utilisateur (clic, touche)."""
+        self._derniere_activite = time.monotonic()
+
+    def demarrer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executer, name="prechauffage", daemon=True)
+            self._thread.start()
+        return self
+
+    def annuler(self):
+        self._annule.set()
+
+    @property
+    def en_cours(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _attendre_inactivite(self):
+        while not self._annule.is_set():
+            attente = self.delai_inactivite - (time.monotonic() - self._derniere_activite)
+            if attente <= 0:
+                return
+            self._annule.wait(attente)
+
+    def _executer(self):
+        for nom, fonction, args in self.taches:
+            self._attendre_inactivite()
+            if self._annule.is_set():
+                print("Préchauffage annulé.")
+                return
+            debut = time.perf_counter()
+            try:
+                fonction(*args)
+            except Exception as e:
+                print(f"Préchauffage '{nom}' ignoré : {e}")
+                continue
+            self.terminees.append(nom)
+            print(f"Préchauffage '{nom}' : {time.perf_counter() - debut:.2f} s")
+
+
+def prerendu_figure():
+    """
+    Rendu d'une figure d'indicateurs factice hors écran (Agg, sans pyplot,
+    utilisable hors du thread principal) : charge les polices et le moteur
+    de rendu avant le premier graphique réel.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from periodes import MOIS_NOMS
+    from prep_graph import dessiner_faconnage
+
+    valeurs = np.linspace(9.0e7, 1.0e8, 12)
+    df_res = pd.DataFrame([valeurs, valeurs + 2e6], index=["q 0.25", "q 0.5"], columns=MOIS_NOMS)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.add_subplot()
+    dessiner_faconnage(ax, df_res, vmin=8.9e7, vmax=1.022e8)
+    ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    fig.tight_layout()
+    FigureCanvasAgg(fig).draw()
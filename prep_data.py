@@ -1,24 +1,47 @@
+import os
+import threading
+from collections import OrderedDict
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
 
-def charger_donnees(chemin_fichier, code_station=34, date_debut=1997, date_fin=2025):
+# Derniers fichiers lus, par (chemin, taille, date de modification)
+_CACHE_RELEVES = OrderedDict()
+_VERROU_RELEVES = threading.Lock()
+TAILLE_CACHE_RELEVES = 2
+
+
+def lire_releves(chemin_fichier, cache=True):
     """
-    Chargement et filtrage des données d'une station hydrologique.
+    Lecture brute du fichier de relevés (toutes stations, toutes années).
 
-    Cette fonction charge un fichier de données hydrologiques, filtre selon le code station,
-    convertit les dates et sélectionne les années d'intérêt.
+    Les derniers fichiers lus sont gardés en mémoire (clé : chemin, taille et
+    date de modification) : une relecture du même fichier, par exemple après
+    son préchargement au démarrage, ne refait pas l'analyse du CSV.
 
     Paramètres:
-        chemin_fichier (str): Chemin du fichier CSV/DELIM à charger, contenant les colonnes 
-            DATE_RELEVE, DEBIT_OUT (en m3/s), EVAPORATION (en m3), VOLUME (en m3), COTE (en m), etc.
-        code_station (int): Code de la station à filtrer, par défaut 34 (barrage du Salagou).
-        date_debut (int): Année de début (exclue), par défaut 1997.
-        date_fin (int): Année de fin (exclue), par défaut 2025.
+        chemin_fichier (str): Chemin du fichier CSV/DELIM (séparateur ";", décimale ",").
+        cache (bool): Utiliser le cache (sans effet pour un flux ouvert).
 
     Retour:
-        pd.DataFrame: Données filtrées pour la station et la période spécifiée.
+        pd.DataFrame: Relevés avec DATE_RELEVE convertie en datetime.
     """
+    if not cache or not isinstance(chemin_fichier, (str, Path)):
+        return _lire_releves(chemin_fichier)
+
+    stat = os.stat(chemin_fichier)
+    cle = (os.path.abspath(chemin_fichier), stat.st_size, stat.st_mtime_ns)
+    # Verrou tenu pendant la lecture : un appel concurrent attend le résultat
+    with _VERROU_RELEVES:
+        if cle not in _CACHE_RELEVES:
+            _CACHE_RELEVES[cle] = _lire_releves(chemin_fichier)
+            while len(_CACHE_RELEVES) > TAILLE_CACHE_RELEVES:
+                _CACHE_RELEVES.popitem(last=False)
+        _CACHE_RELEVES.move_to_end(cle)
+        return _CACHE_RELEVES[cle].copy()
 
+
+def _lire_releves(chemin_fichier):
     # Chargement des données
     data_full = pd.read_csv(
         chemin_fichier, 
@@ -28,14 +51,44 @@ def charger_donnees(chemin_fichier, code_station=34, date_debut=1997, date_fin=2
         parse_dates=False
     )
 
-    # Conversion de la date et filtrage
+    # Conversion de la date
     data_full['DATE_RELEVE'] = pd.to_datetime(
         data_full['DATE_RELEVE'],
         format='%d/%m/%y',  # <--- 2 chiffres
         errors='coerce'
     )
+    return data_full
+
 
-    # Filtrage par station et année
+def charger_donnees(chemin_fichier, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Chargement et filtrage des données d'une station hydrologique.
+
+    Cette fonction charge un fichier de données hydrologiques, filtre selon le code station,
+    convertit les dates et sélectionne les années d'intérêt.
+
+    Paramètres:
+        chemin_fichier (str): Chemin du fichier CSV/DELIM à charger, contenant les colonnes 
+            DATE_RELEVE, DEBIT_OUT (en m3/s), EVAPORATION (en m3), VOLUME (en m3), COTE (en m), etc.
+        code_station (int): Code de la station à filtrer, par défaut 34 (barrage du Salagou).
+        date_debut (int): Année de début (exclue), par défaut 1997.
+        date_fin (int): Année de fin (exclue), par défaut 2025.
+
+    Retour:
+        pd.DataFrame: Données filtrées pour la station et la période spécifiée.
+    """
+
+    # Chargement des données et conversion de la date
+    data_full = lire_releves(chemin_fichier)
+
+    return filtrer_station(data_full, code_station, date_debut, date_fin)
+
+
+def filtrer_station(data_full, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Filtrage des relevés lus par lire_releves sur une station et une plage
+    d'années (bornes exclues), triés par date.
+    """
     data_station = data_full[
         (data_full['CODE_STATION'] == code_station) &
         (data_full['DATE_RELEVE'].dt.year > date_debut) &
@@ -44,8 +97,64 @@ def charger_donnees(chemin_fichier, code_station=34, date_debut=1997, date_fin=2
 
     return data_station
 
+def charger_releves(chemin, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Chargement des données d'une station quel que soit le support.
+
+    Le support est déduit du chemin :
+        - .db / .sqlite / .sqlite3 : base SQLite (base_sqlite.charger_donnees_sqlite)
+        - dossier ou index.json : stockage binaire (stockage_binaire.charger_donnees_mmap)
+        - sinon : fichier CSV (charger_donnees)
+
+    Les paramètres et le retour sont ceux de charger_donnees.
+    """
+    chemin = Path(chemin)
+    suffixe = chemin.suffix.lower()
+
+    if suffixe in (".db", ".sqlite", ".sqlite3"):
+        from base_sqlite import charger_donnees_sqlite
+        return charger_donnees_sqlite(chemin, code_station, date_debut, date_fin)
+
+    if chemin.is_dir() or chemin.name == "index.json":
+        from stockage_binaire import charger_donnees_mmap
+        dossier = chemin if chemin.is_dir() else chemin.parent
+        return charger_donnees_mmap(dossier, code_station, date_debut, date_fin)
+
+    return charger_donnees(chemin, code_station, date_debut, date_fin)
+
 import numpy as np
 
+def calculs_journaliers(data, evap_pct=0.10, entree_pct=0.10):
+    """
+    Colonnes journalières de la simulation (débits en m³, entrées naturelles,
+    application des % de changement climatique).
+
+    Paramètres :
+        data (pd.DataFrame): Colonnes ['DATE_RELEVE', 'DEBIT_OUT', 'EVAPORATION', 'VOLUME']
+        evap_pct (float): % d'augmentation de l'évaporation (ex: 0.10 pour +10%)
+        entree_pct (float): % de réduction des entrées naturelles (ex: 0.10 pour -10%)
+
+    Retour :
+        pd.DataFrame : copie triée par date avec les colonnes simulées.
+    """
+    data = data.sort_values("DATE_RELEVE").copy()
+    data["DATE_RELEVE"] = pd.to_datetime(data["DATE_RELEVE"])
+    data["DEBIT_OUT_m3"] = data["DEBIT_OUT"] * 86400
+    data["LACHURES_m3"] = data["DEBIT_OUT_m3"] - data["EVAPORATION"]
+    # Variation de volume uniquement entre deux jours consécutifs :
+    # une lacune de plusieurs jours ne doit pas compter comme un jour de variation
+    ecart_jours = data["DATE_RELEVE"].diff().dt.days
+    data["DELTA_VOLUME"] = data["VOLUME"].diff().where(ecart_jours == 1)
+    data["ENTREE_NATURELLE"] = data["DELTA_VOLUME"] + data["DEBIT_OUT_m3"]
+
+    # Application des % de changement climatique
+    data["EVAP_CLIMAT"] = data["EVAPORATION"] * (1 + evap_pct)
+    data["ENTREE_CLIMAT"] = data["ENTREE_NATURELLE"] * (1 - entree_pct)
+    data["DEBIT_OUT_CLIMAT"] = data["LACHURES_m3"] + data["EVAP_CLIMAT"]
+    data["DELTA_VOLUME_CLIMAT"] = data["ENTREE_CLIMAT"] - data["DEBIT_OUT_CLIMAT"]
+    return data
+
+
 def simuler_salagou(data, evap_pct=0.10, entree_pct=0.10):
     """
     Simulation hydrologique et climatique pour un barrage.
@@ -80,17 +189,7 @@ def simuler_salagou(data, evap_pct=0.10, entree_pct=0.10):
     cote_moyenne["MOIS_NUM"] = cote_moyenne["MOIS"].dt.month
 
     # Simulation hydrologique et climatique
-    data = data.sort_values("DATE_RELEVE").copy()
-    data["DEBIT_OUT_m3"] = data["DEBIT_OUT"] * 86400
-    data["LACHURES_m3"] = data["DEBIT_OUT_m3"] - data["EVAPORATION"]
-    data["DELTA_VOLUME"] = data["VOLUME"].diff()
-    data["ENTREE_NATURELLE"] = data["DELTA_VOLUME"] + data["DEBIT_OUT_m3"]
-
-    # Application des % de changement climatique
-    data["EVAP_CLIMAT"] = data["EVAPORATION"] * (1 + evap_pct)
-    data["ENTREE_CLIMAT"] = data["ENTREE_NATURELLE"] * (1 - entree_pct)
-    data["DEBIT_OUT_CLIMAT"] = data["LACHURES_m3"] + data["EVAP_CLIMAT"]
-    data["DELTA_VOLUME_CLIMAT"] = data["ENTREE_CLIMAT"] - data["DEBIT_OUT_CLIMAT"]
+    data = calculs_journaliers(data, evap_pct, entree_pct)
 
     # Données mensuelles agrégées
     donnees_mensuelles = data.groupby("MOIS").agg({
@@ -117,3 +216,88 @@ def simuler_salagou(data, evap_pct=0.10, entree_pct=0.10):
 
 
 
+
+
+def simuler_salagou_leger(data, evap_pct=0.10, entree_pct=0.10, dtype=np.float32):
+    """
+    Version économe en mémoire de simuler_salagou, au même format de sortie.
+
+    Travaille sur des vues NumPy des colonnes utiles, sans copie du DataFrame
+    ni colonnes journalières intermédiaires : les sommes mensuelles sont
+    calculées directement (np.add.reduceat), les % climatiques appliqués aux
+    sommes. Les calculs journaliers sont faits en `dtype` (float32 par défaut),
+    sauf la variation de volume, calculée en float64 (volumes ~1e8 m³).
+    Le DataFrame d'entrée n'est pas modifié.
+
+    Paramètres et retour : voir simuler_salagou.
+    """
+    required_cols = ["DATE_RELEVE", "DEBIT_OUT", "EVAPORATION", "VOLUME", "COTE"]
+    if not all(col in data.columns for col in required_cols):
+        raise ValueError(f"Le jeu de données doit contenir : {', '.join(required_cols)}")
+
+    jours = pd.to_datetime(data["DATE_RELEVE"]).to_numpy(dtype="datetime64[D]")
+
+    # Tri par date (et retrait des dates invalides) seulement si nécessaire
+    ordre = None
+    valides = ~np.isnat(jours)
+    if not valides.all() or (jours[1:] < jours[:-1]).any():
+        ordre = np.flatnonzero(valides)[np.argsort(jours[valides], kind="stable")]
+        jours = jours[ordre]
+
+    if len(jours) == 0:
+        # Plage ou station sans relevé : tableaux vides, comme simuler_salagou
+        return simuler_salagou(data.iloc[:0].copy(), evap_pct, entree_pct)
+
+    def colonne(nom):
+        valeurs = data[nom].to_numpy()
+        return valeurs if ordre is None else valeurs[ordre]
+
+    mois = jours.astype("datetime64[M]")
+    debuts = np.flatnonzero(np.concatenate(([True], mois[1:] != mois[:-1])))
+    tampon = np.empty(len(jours), dtype=dtype)
+
+    # Entrée naturelle = variation de volume (jours consécutifs) + débit sortant (m³)
+    volume = colonne("VOLUME")
+    entree = np.empty(len(jours), dtype=dtype)
+    entree[:1] = np.nan
+    np.subtract(volume[1:], volume[:-1], out=entree[1:], casting="same_kind")
+    entree[1:][np.diff(jours) != np.timedelta64(1, "D")] = np.nan
+    np.multiply(colonne("DEBIT_OUT"), 86400, out=tampon, casting="same_kind")
+    entree += tampon
+    somme_entree = np.add.reduceat(np.nan_to_num(entree, copy=False), debuts)
+
+    np.copyto(tampon, colonne("EVAPORATION"), casting="same_kind")
+    somme_evap = np.add.reduceat(np.nan_to_num(tampon, copy=False), debuts)
+
+    np.copyto(tampon, colonne("COTE"), casting="same_kind")
+    nb_cotes = np.add.reduceat(~np.isnan(tampon), debuts)
+    somme_cotes = np.add.reduceat(np.nan_to_num(tampon, copy=False), debuts, dtype=np.float64)
+
+    # Volume du premier jour : premier relevé du mois s'il tombe le 1er
+    premier_jour = jours[debuts] == mois[debuts]
+    volume_premier_jour = np.where(premier_jour, volume[debuts], np.nan)
+
+    mois_index = pd.DatetimeIndex(mois[debuts].astype("datetime64[ns]"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cote_moyenne = pd.DataFrame({
+            "MOIS": mois_index,
+            "COTE_MOYENNE": somme_cotes / nb_cotes
+        })
+    cote_moyenne["ANNEE"] = mois_index.year
+    cote_moyenne["MOIS_NUM"] = mois_index.month
+
+    somme_entree = somme_entree.astype(np.float64)
+    somme_evap = somme_evap.astype(np.float64)
+    donnees_mensuelles = pd.DataFrame({
+        "MOIS": mois_index,
+        "ENTREE_NATURELLE": np.maximum(somme_entree, 0),
+        "EVAPORATION": np.maximum(somme_evap, 0),
+        "EVAP_CLIMAT": np.maximum(somme_evap * (1 + evap_pct), 0),
+        "ENTREE_CLIMAT": np.maximum(somme_entree * (1 - entree_pct), 0),
+        "VOLUME_PREMIER_JOUR": volume_premier_jour
+    })
+
+    return {
+        "cote_moyenne": cote_moyenne,
+        "donnees_simulees": donnees_mensuelles
+    }
@@ -3,70 +3,86 @@
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import pandas as pd
+import numpy as np
 
+from periodes import SCHEMAS, agregats_depuis_mensuel, indicateurs_periodes
 
-def faconnage_graph(self, debut_mois, entree_clim, evap_clim, p1=0.25, p2=0.5, vect_lach=None):
+
+def faconnage_graph(self, debut_mois, entree_clim, evap_clim, p1=0.25, p2=0.5, vect_lach=None, schema=None):
         """
         Construction du tableau de données pour nos indicateurs.
+
+        schema : découpage mensuel de periodes.SCHEMAS (par défaut "Mois").
         """
-        if vect_lach is None:
-            vect_lach = [0]*12
-
-        # Si déjà en format long, ne pas refaire melt
-        df_long_deb_mois = debut_mois.copy()
-        df_long_entree_clim = entree_clim.copy()
-        df_long_evap_clim = evap_clim.copy()
-
-        quantiles_deb_mois = df_long_deb_mois.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-        quantiles_entree_clim = df_long_entree_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-        quantiles_evap_clim = df_long_evap_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
-
-        resultats_p1 = []
-        resultats_p2 = []
-
-        for mois in range(1, 13):
-            mois_prec = 12 if mois == 1 else mois - 1  # mois précédent
-            val_p1 = (quantiles_deb_mois.loc[mois_prec, p1] +
-                      quantiles_entree_clim.loc[mois_prec, p1] -
-                      quantiles_evap_clim.loc[mois_prec, p1] -
-                      vect_lach[mois_prec - 1])
-            val_p2 = (quantiles_deb_mois.loc[mois_prec, p2] +
-                      quantiles_entree_clim.loc[mois_prec, p2] -
-                      quantiles_evap_clim.loc[mois_prec, p2] -
-                      vect_lach[mois_prec - 1])
-
-            resultats_p1.append(val_p1)
-            resultats_p2.append(val_p2)
+        if schema is None:
+            schema = SCHEMAS["Mois"]
+
+        agregats = agregats_depuis_mensuel(debut_mois, entree_clim, evap_clim, schema)
+        valeurs = indicateurs_periodes(agregats, schema, [p1, p2], vect_lach)
 
         df_res = pd.DataFrame({
-            "Mois": ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin",
-                     "Juil", "Août", "Sep", "Oct", "Nov", "Déc"],
-            f"p {p1}": resultats_p1,
-            f"p {p2}": resultats_p2
+            "Mois": schema.etiquettes,
+            f"p {p1}": valeurs[0],
+            f"p {p2}": valeurs[1]
         })
         return df_res.set_index("Mois").T
 
 
 
-def tracer_faconnage(df_res, titre="Volumes indicateurs",vmin=89000000, vmax=102200000, unite="Volume (m³)"):
+def base_indicateurs(debut_mois, entree_clim, evap_clim, percentiles=(0.25, 0.5)):
     """
-    Trace les séries p1 et p2 par mois avec zones colorées.
-    Les indices du DataFrame sont utilisés automatiquement pour p1 et p2.
-    
-    df_res : DataFrame avec index = quantiles et colonnes = mois ['Jan', 'Fév', ...]
-    titre  : titre du graphique
-    vmin   : valeur min pour le remplissage rouge
-    vmax   : valeur max pour le remplissage vert
+    Partie des indicateurs indépendante des lâchures, pour plusieurs percentiles à la fois.
+
+    La valeur du mois m est calculée à partir du mois précédent :
+    quantile(volume début de mois) + quantile(entrées) - quantile(évaporation).
+
+    Paramètres:
+        debut_mois, entree_clim, evap_clim (pd.DataFrame): format long (MOIS_NUM, valeur).
+        percentiles (list): percentiles (entre 0 et 1).
+
+    Retour:
+        np.ndarray: tableau (n_percentiles, 12), colonne 0 = janvier.
+    """
+    schema = SCHEMAS["Mois"]
+    agregats = agregats_depuis_mensuel(debut_mois, entree_clim, evap_clim, schema)
+    return indicateurs_periodes(agregats, schema, percentiles)
+
+
+def appliquer_lachures(base, vect_lach):
+    """
+    Indicateurs vectorisés pour un ou plusieurs vecteurs de lâchures.
+
+    Paramètres:
+        base (np.ndarray): (n_percentiles, 12), issu de base_indicateurs.
+        vect_lach (array-like): (12,) ou (n_candidats, 12) lâchures mensuelles (m³).
+
+    Retour:
+        np.ndarray: (n_percentiles, 12) ou (n_candidats, n_percentiles, 12).
+    """
+    lach = np.asarray(vect_lach, dtype=float)
+    # La lâchure du mois précédent s'applique au mois courant
+    lach_prec = np.roll(lach, 1, axis=-1)
+    return base - lach_prec[..., None, :]
+
+
+def dessiner_faconnage(ax, df_res, titre="Volumes indicateurs", vmin=89000000, vmax=102200000,
+                       unite="Volume (m³)", xlabel="Mois", etiquettes_valeurs=None, intervalles=None):
+    """
+    Dessine les séries p1 et p2 et les zones colorées dans un axe existant
+    (voir tracer_faconnage pour les paramètres).
     """
     mois = df_res.columns
+
+    if etiquettes_valeurs is None:
+        etiquettes_valeurs = [m for m in ['Jan', 'Mai', 'Oct'] if m in mois]
+        if not etiquettes_valeurs:
+            etiquettes_valeurs = list(mois[::max(1, len(mois) // 3)])
     
     # Récupération automatique de p1 et p2
     p1_index, p2_index = df_res.index[:2]
     p1_values = df_res.loc[p1_index]
     p2_values = df_res.loc[p2_index]
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-
     # Remplissage au-dessus de p2 (vert)
     ax.fill_between(mois, p2_values, y2=vmax, 
                     color='green', alpha=0.2, label='Satisfaisant')
@@ -80,19 +96,48 @@ def tracer_faconnage(df_res, titre="Volumes indicateurs",vmin=89000000, vmax=102
     ax.fill_between(mois, p1_values, y2=vmin, 
                     color='red', alpha=0.2, label='Alerte')
 
+    # Intervalles de confiance (bootstrap) autour des courbes
+    if intervalles is not None:
+        df_bas, df_haut = intervalles
+        for index, couleur in ((p2_index, 'darkorange'), (p1_index, 'darkred')):
+            ax.fill_between(mois, df_bas.loc[index], df_haut.loc[index],
+                            color=couleur, alpha=0.25, linewidth=0, label=f'IC {index}')
+
     # Courbes p1 et p2
     ax.plot(mois, p2_values, marker='o', color='orange', label=p2_index)
     ax.plot(mois, p1_values, marker='o', color='red', label=p1_index)
 
-    for m in ['Jan', 'Mai', 'Oct']:
+    for m in etiquettes_valeurs:
         ax.text(m, p1_values[m], f"{p1_values[m]}", color='black', ha='center', va='bottom', fontsize=9)
         ax.text(m, p2_values[m], f"{p2_values[m]}", color='black', ha='center', va='bottom', fontsize=9)
 
 
     ax.set_title(titre)
-    ax.set_xlabel("Mois")
+    ax.set_xlabel(xlabel)
+    if len(mois) > 12:
+        ax.tick_params(axis='x', labelrotation=90, labelsize=7)
     ax.set_ylabel(unite)
     ax.grid(True)
+
+
+def tracer_faconnage(df_res, titre="Volumes indicateurs",vmin=89000000, vmax=102200000, unite="Volume (m³)",
+                     xlabel="Mois", etiquettes_valeurs=None, intervalles=None):
+    """
+    Trace les séries p1 et p2 par période avec zones colorées.
+    Les indices du DataFrame sont utilisés automatiquement pour p1 et p2.
+    
+    df_res : DataFrame avec index = quantiles et colonnes = périodes ['Jan', 'Fév', ...]
+    titre  : titre du graphique
+    vmin   : valeur min pour le remplissage rouge
+    vmax   : valeur max pour le remplissage vert
+    xlabel : titre de l'axe des périodes
+    etiquettes_valeurs : périodes dont la valeur est écrite sur le graphique
+                         (par défaut Jan/Mai/Oct, sinon 3 périodes réparties)
+    intervalles : (df_bas, df_haut) bornes des intervalles de confiance, même
+                  forme que df_res, dessinées en enveloppes translucides
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    dessiner_faconnage(ax, df_res, titre, vmin, vmax, unite, xlabel, etiquettes_valeurs, intervalles)
     
     # Légende à droite
     ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
@@ -100,3 +145,46 @@ def tracer_faconnage(df_res, titre="Volumes indicateurs",vmin=89000000, vmax=102
     plt.tight_layout()
     return fig
 
+
+def tracer_comparaison(resultats, unite="Volume (m³)", xlabel="Mois"):
+    """
+    Petits multiples des indicateurs de plusieurs stations, axe des périodes partagé.
+
+    resultats : liste de dict {'titre', 'df_res', 'vmin', 'vmax'} (un par station)
+    """
+    fig, axes = plt.subplots(1, len(resultats), figsize=(6 * len(resultats), 5),
+                             sharex=True, squeeze=False)
+    for ax, res in zip(axes[0], resultats):
+        dessiner_faconnage(ax, res["df_res"], res["titre"], res["vmin"], res["vmax"], unite, xlabel)
+
+    axes[0][-1].legend(loc='center left', bbox_to_anchor=(1, 0.5))
+    fig.tight_layout()
+    return fig
+
+
+def tracer_tendances(annees_fin, cube, percentiles=(0.25, 0.5), titre="Tendances des indicateurs",
+                     unite="Volume (m³)", n_annees=10):
+    """
+    Carte de chaleur des indicateurs par fenêtre glissante : une carte par
+    percentile, années de fin de fenêtre en abscisse, mois en ordonnée.
+
+    annees_fin, cube : sortie de tendances.cube_tendances
+    """
+    mois_noms = ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin",
+                 "Juil", "Août", "Sep", "Oct", "Nov", "Déc"]
+    fig, axes = plt.subplots(len(percentiles), 1, figsize=(12, 3.5 * len(percentiles)),
+                             sharex=True, squeeze=False)
+    # Échelle de couleur commune pour comparer les percentiles
+    vmin, vmax = np.nanmin(cube), np.nanmax(cube)
+    for k, (ax, p) in enumerate(zip(axes[:, 0], percentiles)):
+        image = ax.imshow(cube[:, :, k].T, aspect="auto", origin="upper", cmap="viridis",
+                          vmin=vmin, vmax=vmax,
+                          extent=(annees_fin[0] - 0.5, annees_fin[-1] + 0.5, 11.5, -0.5))
+        ax.set_yticks(range(12))
+        ax.set_yticklabels(mois_noms)
+        ax.set_title(f"q {p} - fenêtres de {n_annees} ans")
+        fig.colorbar(image, ax=ax, label=unite)
+    axes[-1, 0].set_xlabel("Dernière année de la fenêtre")
+    fig.suptitle(titre)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,282 @@
+"""
+Implémentations d'origine, copiées sans modification de la première version
+du dépôt (prep_data.py, interpolation.py, prep_graph.py).
+
+Référence figée du banc d'équivalence (banc_equivalence.py) : les modules
+courants peuvent évoluer, ces fonctions non. Ne pas les utiliser ailleurs.
+
+Écart connu : simuler_salagou d'origine calcule la variation de volume entre
+deux relevés même s'ils ne sont pas consécutifs (lacunes) ; la version
+courante la laisse manquante. Les résultats diffèrent donc sur les données
+lacunaires.
+"""
+import pandas as pd
+import numpy as np
+from scipy.interpolate import interp1d
+from pathlib import Path
+
+
+def charger_donnees(chemin_fichier, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Chargement et filtrage des données d'une station hydrologique.
+
+    Cette fonction charge un fichier de données hydrologiques, filtre selon le code station,
+    convertit les dates et sélectionne les années d'intérêt.
+
+    Paramètres:
+        chemin_fichier (str): Chemin du fichier CSV/DELIM à charger, contenant les colonnes 
+            DATE_RELEVE, DEBIT_OUT (en m3/s), EVAPORATION (en m3), VOLUME (en m3), COTE (en m), etc.
+        code_station (int): Code de la station à filtrer, par défaut 34 (barrage du Salagou).
+        date_debut (int): Année de début (exclue), par défaut 1997.
+        date_fin (int): Année de fin (exclue), par défaut 2025.
+
+    Retour:
+        pd.DataFrame: Données filtrées pour la station et la période spécifiée.
+    """
+
+    # Chargement des données
+    data_full = pd.read_csv(
+        chemin_fichier, 
+        sep=";", 
+        decimal=",", 
+        dtype={"CODE_STATION": int},
+        parse_dates=False
+    )
+
+    # Conversion de la date et filtrage
+    data_full['DATE_RELEVE'] = pd.to_datetime(
+        data_full['DATE_RELEVE'],
+        format='%d/%m/%y',  # <--- 2 chiffres
+        errors='coerce'
+    )
+
+    # Filtrage par station et année
+    data_station = data_full[
+        (data_full['CODE_STATION'] == code_station) &
+        (data_full['DATE_RELEVE'].dt.year > date_debut) &
+        (data_full['DATE_RELEVE'].dt.year < date_fin)
+    ].sort_values(by='DATE_RELEVE')
+
+    return data_station
+
+
+def simuler_salagou(data, evap_pct=0.10, entree_pct=0.10):
+    """
+    Simulation hydrologique et climatique pour un barrage.
+
+    Paramètres :
+        data (pd.DataFrame): Doit contenir les colonnes 
+            ['DATE_RELEVE', 'DEBIT_OUT', 'EVAPORATION', 'VOLUME', 'COTE']
+        evap_pct (float): % d'augmentation de l'évaporation (ex: 0.10 pour +10%)
+        entree_pct (float): % de réduction des entrées naturelles (ex: 0.10 pour -10%)
+
+    Retour :
+        dict : Contient
+            - 'cote_moyenne' : moyenne mensuelle de la cote
+            - 'donnees_simulees' : données avec colonnes simulées et volumes du premier jour
+            - 'donnees_mensuelles' : données agrégées mensuellement
+    """
+
+    # Vérification des colonnes nécessaires
+    required_cols = ["DATE_RELEVE", "DEBIT_OUT", "EVAPORATION", "VOLUME", "COTE"]
+    if not all(col in data.columns for col in required_cols):
+        raise ValueError(f"Le jeu de données doit contenir : {', '.join(required_cols)}")
+
+    # Création de la colonne MOIS
+    data["DATE_RELEVE"] = pd.to_datetime(data["DATE_RELEVE"])
+    data["MOIS"] = data["DATE_RELEVE"].dt.to_period("M").dt.to_timestamp()
+
+    # Cote moyenne mensuelle
+    cote_moyenne = data.groupby("MOIS").agg(
+        COTE_MOYENNE=('COTE', 'mean')
+    ).reset_index()
+    cote_moyenne["ANNEE"] = cote_moyenne["MOIS"].dt.year
+    cote_moyenne["MOIS_NUM"] = cote_moyenne["MOIS"].dt.month
+
+    # Simulation hydrologique et climatique
+    data = data.sort_values("DATE_RELEVE").copy()
+    data["DEBIT_OUT_m3"] = data["DEBIT_OUT"] * 86400
+    data["LACHURES_m3"] = data["DEBIT_OUT_m3"] - data["EVAPORATION"]
+    data["DELTA_VOLUME"] = data["VOLUME"].diff()
+    data["ENTREE_NATURELLE"] = data["DELTA_VOLUME"] + data["DEBIT_OUT_m3"]
+
+    # Application des % de changement climatique
+    data["EVAP_CLIMAT"] = data["EVAPORATION"] * (1 + evap_pct)
+    data["ENTREE_CLIMAT"] = data["ENTREE_NATURELLE"] * (1 - entree_pct)
+    data["DEBIT_OUT_CLIMAT"] = data["LACHURES_m3"] + data["EVAP_CLIMAT"]
+    data["DELTA_VOLUME_CLIMAT"] = data["ENTREE_CLIMAT"] - data["DEBIT_OUT_CLIMAT"]
+
+    # Données mensuelles agrégées
+    donnees_mensuelles = data.groupby("MOIS").agg({
+        "ENTREE_NATURELLE": lambda x: max(x.sum(skipna=True), 0),
+        "EVAPORATION": lambda x: max(x.sum(skipna=True), 0),
+        "EVAP_CLIMAT": lambda x: max(x.sum(skipna=True), 0),
+        "ENTREE_CLIMAT": lambda x: max(x.sum(skipna=True), 0)
+    }).reset_index()
+
+    # Extraction volumes du premier jour de chaque mois
+    premiers_jours = data[data["DATE_RELEVE"].dt.is_month_start][["DATE_RELEVE", "VOLUME"]].copy()
+    premiers_jours["MOIS"] = premiers_jours["DATE_RELEVE"].dt.to_period("M").dt.to_timestamp()
+    premiers_jours = premiers_jours.drop(columns="DATE_RELEVE")
+
+    # Merge volumes premier jour dans donnees_mensuelles
+    donnees_mensuelles = donnees_mensuelles.merge(premiers_jours, on="MOIS", how="left")
+    donnees_mensuelles = donnees_mensuelles.rename(columns={"VOLUME": "VOLUME_PREMIER_JOUR"})
+
+    return {
+        "cote_moyenne": cote_moyenne,
+        "donnees_simulees": donnees_mensuelles
+    }
+
+
+def charger_table_hsv(depuis_fichier=True, chemin=None, code=34):
+    """
+    Charge la table HSV (par défaut HSV_<code>.txt/csv) et nettoie les colonnes.
+    
+    Args:
+        depuis_fichier (bool): doit être True, sinon erreur.
+        chemin (str | Path, optional): chemin explicite du fichier à lire.
+        code (int | str, optional): code station (ex: 34, 32). Si fourni,
+                                    cherche un fichier "HSV_<code>.txt".
+    Returns:
+        pd.DataFrame: table nettoyée avec colonnes standardisées.
+    """
+    if not depuis_fichier:
+        raise ValueError("Le chargement interne n'est pas défini ici.")
+
+    # Détermination du chemin
+    if chemin is None:
+        try:
+            base_path = Path(__file__).parent
+        except NameError:
+            base_path = Path.cwd()
+        
+        chemin = base_path / "data" / f"HSV_{code}.txt"
+
+    chemin = Path(chemin)
+    if not chemin.exists():
+        raise FileNotFoundError(f"Fichier HSV introuvable : {chemin}")
+
+    # Lecture CSV avec fallback encodage
+    try:
+        table = pd.read_csv(chemin, sep=";", encoding="utf-8")
+    except UnicodeDecodeError:
+        table = pd.read_csv(chemin, sep=";", encoding="latin1")
+
+    # Nettoyage colonnes
+    table.columns = (
+        table.columns
+        .str.strip()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.replace("\u202f", " ", regex=True)
+        .str.upper()  # tout en majuscules pour uniformiser
+    )
+
+    # Mapping vers colonnes standard
+    rename_map = {
+        "VOLUME": "Volume",
+        "COTE": "Cote",
+        "SURFACE": "Surface"
+    }
+    table = table.rename(columns=rename_map)
+
+    # Vérification colonnes
+    if not {"Volume", "Cote"}.issubset(table.columns):
+        raise ValueError(f"Colonnes attendues manquantes : {table.columns}")
+
+    # Nettoyage des colonnes numériques
+    for col in ["Volume", "Cote", "Surface"]:
+        if col in table.columns:
+            table[col] = (
+                table[col]
+                .astype(str)
+                .str.replace("\u202f", "", regex=True)
+                .str.replace(" ", "", regex=True)
+                .str.replace(",", ".", regex=True)
+            ).astype(float)
+
+    # Supprimer lignes invalides
+    table = table.dropna(subset=["Volume", "Cote"])
+    return table
+
+
+def volume_to_cote(volume, table_interpolation=None, code=34):
+    """
+    Interpole la cote (m NGF) à partir d'un volume (m³).
+    """
+    if table_interpolation is None:
+        table_interpolation = charger_table_hsv(code=code)
+
+    # Tri pour garantir ordre croissant
+    table_sorted = table_interpolation.sort_values("Volume")
+
+    interpolateur = interp1d(
+        table_sorted["Volume"],
+        table_sorted["Cote"],
+        kind="linear",
+        fill_value="extrapolate",
+        assume_sorted=True
+    )
+    return float(interpolateur(volume))
+
+
+def cote_to_volume(cote, table_interpolation=None, code=34):
+    """
+    Interpole le volume (en m³) à partir d'une cote (en m).
+    """
+    if table_interpolation is None:
+        table_interpolation = charger_table_hsv(code=code)
+
+    # Tri pour garantir ordre croissant
+    table_sorted = table_interpolation.sort_values("Cote")
+
+    interpolateur = interp1d(
+        table_sorted["Cote"],
+        table_sorted["Volume"],
+        kind="linear",
+        fill_value="extrapolate",
+        assume_sorted=True
+    )
+    return float(interpolateur(cote))
+
+
+def faconnage_graph(self, debut_mois, entree_clim, evap_clim, p1=0.25, p2=0.5, vect_lach=None):
+        """
+        Construction du tableau de données pour nos indicateurs.
+        """
+        if vect_lach is None:
+            vect_lach = [0]*12
+
+        # Si déjà en format long, ne pas refaire melt
+        df_long_deb_mois = debut_mois.copy()
+        df_long_entree_clim = entree_clim.copy()
+        df_long_evap_clim = evap_clim.copy()
+
+        quantiles_deb_mois = df_long_deb_mois.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
+        quantiles_entree_clim = df_long_entree_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
+        quantiles_evap_clim = df_long_evap_clim.groupby('MOIS_NUM')['valeur'].quantile([p1, p2]).unstack()
+
+        resultats_p1 = []
+        resultats_p2 = []
+
+        for mois in range(1, 13):
+            mois_prec = 12 if mois == 1 else mois - 1  # mois précédent
+            val_p1 = (quantiles_deb_mois.loc[mois_prec, p1] +
+                      quantiles_entree_clim.loc[mois_prec, p1] -
+                      quantiles_evap_clim.loc[mois_prec, p1] -
+                      vect_lach[mois_prec - 1])
+            val_p2 = (quantiles_deb_mois.loc[mois_prec, p2] +
+                      quantiles_entree_clim.loc[mois_prec, p2] -
+                      quantiles_evap_clim.loc[mois_prec, p2] -
+                      vect_lach[mois_prec - 1])
+
+            resultats_p1.append(val_p1)
+            resultats_p2.append(val_p2)
+
+        df_res = pd.DataFrame({
+            "Mois": ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin",
+                     "Juil", "Août", "Sep", "Oct", "Nov", "Déc"],
+            f"p {p1}": resultats_p1,
+            f"p {p2}": resultats_p2
+        })
+        return df_res.set_index("Mois").T
@@ -0,0 +1,437 @@
+"""
+Service local (HTTP/JSON) gardant en mémoire les relevés, les tables HSV et
+les derniers résultats de simulation, partagé par plusieurs copies de
+l'application et par les scripts.
+
+Lancement :
+    python service.py --port 8765 --dossier data
+
+Seuls les fichiers du dossier de données (--dossier, par défaut data/ à côté
+de ce fichier) peuvent être lus : tout autre chemin est refusé (403).
+
+Routes :
+    GET  /sante         : état du service
+    GET  /metriques     : latences par route et taux de réussite des caches
+    POST /charger       : relevés d'une station sur une plage d'années
+    POST /simuler       : résultat de simuler_salagou
+    POST /indicateurs   : indicateurs par période (comparaison.indicateurs_station)
+    POST /graphique     : graphique des indicateurs au format PNG
+"""
+import argparse
+import io
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from comparaison import indicateurs_station
+from interpolation import charger_table_hsv
+from periodes import SCHEMAS
+from prep_data import charger_releves, filtrer_station, lire_releves, simuler_salagou
+from prep_graph import tracer_faconnage
+from stations import REGISTRE_STATIONS
+
+
+HOTE = "127.0.0.1"
+PORT = 8765
+DOSSIER_DONNEES = Path(__file__).resolve().parent / "data"
+
+
+class CacheLRU:
+    """Cache des derniers résultats calculés, partagé entre les threads du service."""
+
+    def __init__(self, taille=32):
+        self.taille = taille
+        self._valeurs = OrderedDict()
+        self._en_cours = {}
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+
+    def obtenir(self, cle, calcul):
+        """
+        Renvoie la valeur associée à `cle`, calculée par `calcul()` si absente.
+        Une requête identique arrivant pendant le calcul attend son résultat
+        au lieu de le recalculer.
+        """
+        with self._verrou:
+            if cle in self._valeurs:
+                self._valeurs.move_to_end(cle)
+                self.succes += 1
+                return self._valeurs[cle]
+            en_cours = self._en_cours.get(cle)
+            if en_cours is None:
+                self._en_cours[cle] = threading.Event()
+                self.echecs += 1
+
+        if en_cours is not None:
+            en_cours.wait()
+            return self.obtenir(cle, calcul)
+
+        # Calcul hors verrou : les autres requêtes ne sont pas bloquées
+        try:
+            valeur = calcul()
+            with self._verrou:
+                self._valeurs[cle] = valeur
+                while len(self._valeurs) > self.taille:
+                    self._valeurs.popitem(last=False)
+        finally:
+            with self._verrou:
+                self._en_cours.pop(cle).set()
+        return valeur
+
+    def etat(self):
+        with self._verrou:
+            total = self.succes + self.echecs
+            return {
+                "entrees": len(self._valeurs),
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": round(self.succes / total, 3) if total else None
+            }
+
+
+class Metriques:
+    """Latences des dernières requêtes, par route."""
+
+    def __init__(self, historique=500):
+        self._durees = {}
+        self._nombre = {}
+        self._erreurs = {}
+        self._historique = historique
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, route, duree, erreur=False):
+        with self._verrou:
+            self._durees.setdefault(route, deque(maxlen=self._historique)).append(duree)
+            self._nombre[route] = self._nombre.get(route, 0) + 1
+            self._erreurs[route] = self._erreurs.get(route, 0) + int(erreur)
+
+    def resume(self):
+        with self._verrou:
+            resume = {}
+            for route, durees in self._durees.items():
+                ms = np.asarray(durees) * 1000
+                resume[route] = {
+                    "requetes": self._nombre[route],
+                    "erreurs": self._erreurs[route],
+                    "moyenne_ms": round(float(ms.mean()), 2),
+                    "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                    "max_ms": round(float(ms.max()), 2)
+                }
+            return resume
+
+
+def _signature(chemin):
+    """Identifie une version d'un fichier : tout changement invalide les caches."""
+    stat = os.stat(chemin)
+    return (str(Path(chemin).resolve()), stat.st_size, stat.st_mtime_ns)
+
+
+def _vers_json(df):
+    return json.loads(df.to_json(orient="split", date_format="iso"))
+
+
+def _depuis_json(contenu, colonnes_dates=()):
+    df = pd.DataFrame(contenu["data"], index=contenu["index"], columns=contenu["columns"])
+    for colonne in colonnes_dates:
+        if colonne in df.columns:
+            df[colonne] = pd.to_datetime(df[colonne])
+    return df
+
+
+class EtatService:
+    """
+    Données gardées au chaud par le service.
+
+    Paramètres:
+        taille_cache (int): Nombre de résultats gardés par cache.
+        dossier_donnees (str | Path): Seul dossier dont les fichiers peuvent être lus.
+    """
+
+    def __init__(self, taille_cache=32, dossier_donnees=DOSSIER_DONNEES):
+        self.dossier_donnees = Path(dossier_donnees).resolve()
+        self.fichiers = CacheLRU(taille=4)
+        self.releves = CacheLRU(taille_cache)
+        self.simulations = CacheLRU(taille_cache)
+        self.indicateurs = CacheLRU(taille_cache)
+        self.metriques = Metriques()
+        self.demarrage = time.time()
+        # Le rendu matplotlib (pyplot) n'est pas sûr entre threads
+        self._verrou_graphique = threading.Lock()
+
+        # Tables HSV chargées une fois pour toutes les stations connues
+        self.tables_hsv = {}
+        for infos in REGISTRE_STATIONS.values():
+            try:
+                self.tables_hsv[infos["code"]] = charger_table_hsv(code=infos["code"])
+            except FileNotFoundError as e:
+                print(f"Table HSV non chargée : {e}")
+
+    def autoriser(self, chemin):
+        """
+        Chemin absolu de `chemin` s'il se trouve dans le dossier de données
+        (liens symboliques résolus).
+
+        Lève:
+            PermissionError: si le fichier est hors du dossier de données.
+        """
+        resolu = Path(chemin).resolve()
+        if not resolu.is_relative_to(self.dossier_donnees):
+            raise PermissionError(f"Chemin hors du dossier de données ({self.dossier_donnees}) : {chemin}")
+        return str(resolu)
+
+    def charger(self, chemin, code_station=34, date_debut=1997, date_fin=2025):
+        chemin = self.autoriser(chemin)
+        signature = _signature(chemin)
+        cle = (signature, int(code_station), int(date_debut), int(date_fin))
+
+        def calcul():
+            if Path(chemin).suffix.lower() in (".csv", ".txt", ".delim"):
+                # Le fichier lu est partagé par toutes les stations et plages d'années
+                data_full = self.fichiers.obtenir(signature, lambda: lire_releves(chemin, cache=False))
+                return filtrer_station(data_full, int(code_station), int(date_debut), int(date_fin))
+            return charger_releves(chemin, int(code_station), int(date_debut), int(date_fin))
+
+        return self.releves.obtenir(cle, calcul)
+
+    def simuler(self, chemin, code_station=34, date_debut=1997, date_fin=2025,
+                evap_pct=0.10, entree_pct=0.10):
+        chemin = self.autoriser(chemin)
+        cle = (_signature(chemin), int(code_station), int(date_debut), int(date_fin),
+               float(evap_pct), float(entree_pct))
+
+        def calcul():
+            # simuler_salagou modifie son entrée : copie de la version en cache
+            data = self.charger(chemin, code_station, date_debut, date_fin).copy()
+            return simuler_salagou(data, float(evap_pct), float(entree_pct))
+
+        return self.simulations.obtenir(cle, calcul)
+
+    def calculer_indicateurs(self, chemin, code_station=34, **parametres):
+        chemin = self.autoriser(chemin)
+        cle = (_signature(chemin), int(code_station), json.dumps(parametres, sort_keys=True))
+
+        def calcul():
+            data = self.charger(chemin, code_station,
+                                parametres.get("date_debut", 1997), parametres.get("date_fin", 2025))
+            return indicateurs_station(chemin, int(code_station), data=data,
+                                       table_hsv=self.tables_hsv.get(int(code_station)), **parametres)
+
+        return self.indicateurs.obtenir(cle, calcul)
+
+    def graphique(self, chemin, code_station=34, **parametres):
+        resultat = self.calculer_indicateurs(chemin, code_station, **parametres)
+        mode = parametres.get("mode", "volume")
+        with self._verrou_graphique:
+            fig = tracer_faconnage(
+                resultat["df_res"],
+                titre=REGISTRE_STATIONS[resultat["titre"]]["titre"],
+                vmin=resultat["vmin"],
+                vmax=resultat["vmax"],
+                unite="Cote (mNGF)" if mode == "cote" else "Volume (m³)",
+                xlabel=SCHEMAS[parametres.get("nom_schema", "Mois")].libelle
+            )
+            tampon = io.BytesIO()
+            fig.savefig(tampon, format="png")
+            plt.close(fig)
+        return tampon.getvalue()
+
+    def metriques_json(self):
+        return {
+            "duree_fonctionnement_s": round(time.time() - self.demarrage, 1),
+            "latences": self.metriques.resume(),
+            "caches": {
+                "fichiers": self.fichiers.etat(),
+                "releves": self.releves.etat(),
+                "simulations": self.simulations.etat(),
+                "indicateurs": self.indicateurs.etat()
+            }
+        }
+
+
+class GestionnaireRequetes(BaseHTTPRequestHandler):
+    """Traduction des requêtes HTTP/JSON vers EtatService."""
+
+    etat = None  # EtatService, fixé par creer_serveur
+
+    def log_message(self, format, *args):
+        pass  # les latences sont suivies par /metriques
+
+    def _repondre(self, code, contenu, type_contenu="application/json"):
+        if type_contenu == "application/json":
+            contenu = json.dumps(contenu).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", type_contenu)
+        self.send_header("Content-Length", str(len(contenu)))
+        self.end_headers()
+        self.wfile.write(contenu)
+
+    def _traiter(self, route, action):
+        debut = time.perf_counter()
+        erreur = False
+        try:
+            code, contenu, type_contenu = 200, *action()
+        except PermissionError as e:
+            erreur = True
+            code, contenu, type_contenu = 403, {"erreur": str(e)}, "application/json"
+        except (KeyError, TypeError, ValueError, FileNotFoundError) as e:
+            erreur = True
+            code, contenu, type_contenu = 400, {"erreur": str(e)}, "application/json"
+        except Exception as e:
+            erreur = True
+            code, contenu, type_contenu = 500, {"erreur": str(e)}, "application/json"
+        self.etat.metriques.enregistrer(route, time.perf_counter() - debut, erreur)
+        self._repondre(code, contenu, type_contenu)
+
+    def do_GET(self):
+        if self.path == "/sante":
+            self._traiter(self.path, lambda: ({"etat": "ok"}, "application/json"))
+        elif self.path == "/metriques":
+            self._repondre(200, self.etat.metriques_json())
+        else:
+            self._repondre(404, {"erreur": f"Route inconnue : {self.path}"})
+
+    def do_POST(self):
+        longueur = int(self.headers.get("Content-Length", 0))
+        try:
+            parametres = json.loads(self.rfile.read(longueur) or b"{}")
+        except json.JSONDecodeError as e:
+            self._repondre(400, {"erreur": f"JSON invalide : {e}"})
+            return
+
+        routes = {
+            "/charger": lambda: ({"releves": _vers_json(self.etat.charger(**parametres))}, "application/json"),
+            "/simuler": lambda: ({cle: _vers_json(df) for cle, df in self.etat.simuler(**parametres).items()},
+                                 "application/json"),
+            "/indicateurs": lambda: (self._indicateurs_json(parametres), "application/json"),
+            "/graphique": lambda: (self.etat.graphique(**parametres), "image/png"),
+        }
+        if self.path not in routes:
+            self._repondre(404, {"erreur": f"Route inconnue : {self.path}"})
+            return
+        self._traiter(self.path, routes[self.path])
+
+    def _indicateurs_json(self, parametres):
+        resultat = self.etat.calculer_indicateurs(**parametres)
+        return {**resultat, "df_res": _vers_json(resultat["df_res"]),
+                "vmin": float(resultat["vmin"]), "vmax": float(resultat["vmax"])}
+
+
+def creer_serveur(hote=HOTE, port=PORT, etat=None):
+    """Serveur multi-thread (une requête par thread) partageant un même EtatService."""
+    gestionnaire = type("Gestionnaire", (GestionnaireRequetes,), {"etat": etat or EtatService()})
+    return ThreadingHTTPServer((hote, port), gestionnaire)
+
+
+class ClientService:
+    """
+    Client du service local. Les méthodes renvoient les mêmes objets que les
+    fonctions appelées localement (DataFrames, dict de simuler_salagou, ...).
+    """
+
+    def __init__(self, url=f"http://{HOTE}:{PORT}", timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _requete(self, route, parametres=None, brut=False):
+        donnees = None if parametres is None else json.dumps(parametres).encode("utf-8")
+        requete = urllib.request.Request(
+            self.url + route, data=donnees, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(requete, timeout=self.timeout) as reponse:
+                contenu = reponse.read()
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("erreur", str(e))
+            if e.code == 403:
+                # Fichier hors du dossier du service : à lire localement
+                raise PermissionError(f"Service : {message}") from None
+            raise ValueError(f"Service : {message}") from None
+        return contenu if brut else json.loads(contenu)
+
+    def disponible(self, timeout=0.5):
+        """True si le service répond sur /sante."""
+        try:
+            with urllib.request.urlopen(self.url + "/sante", timeout=timeout) as reponse:
+                return reponse.status == 200
+        except (OSError, ValueError):
+            return False
+
+    def charger(self, chemin, code_station=34, date_debut=1997, date_fin=2025):
+        contenu = self._requete("/charger", {
+            "chemin": os.path.abspath(chemin), "code_station": int(code_station),
+            "date_debut": int(date_debut), "date_fin": int(date_fin)
+        })
+        return _depuis_json(contenu["releves"], colonnes_dates=["DATE_RELEVE"])
+
+    def simuler(self, chemin, code_station=34, date_debut=1997, date_fin=2025,
+                evap_pct=0.10, entree_pct=0.10):
+        contenu = self._requete("/simuler", {
+            "chemin": os.path.abspath(chemin), "code_station": int(code_station),
+            "date_debut": int(date_debut), "date_fin": int(date_fin),
+            "evap_pct": float(evap_pct), "entree_pct": float(entree_pct)
+        })
+        return {cle: _depuis_json(df, colonnes_dates=["MOIS"]) for cle, df in contenu.items()}
+
+    def indicateurs(self, chemin, code_station=34, **parametres):
+        contenu = self._requete("/indicateurs", {"chemin": os.path.abspath(chemin), "code_station": int(code_station),
+                                                 **parametres})
+        contenu["df_res"] = _depuis_json(contenu["df_res"])
+        return contenu
+
+    def graphique(self, chemin, code_station=34, **parametres):
+        """Graphique des indicateurs (octets PNG)."""
+        return self._requete("/graphique", {"chemin": os.path.abspath(chemin), "code_station": int(code_station),
+                                            **parametres}, brut=True)
+
+    def metriques(self):
+        return self._requete("/metriques")
+
+
+def connecter_service(url=f"http://{HOTE}:{PORT}"):
+    """Client du service s'il est lancé, sinon None (calcul local)."""
+    client = ClientService(url)
+    return client if client.disponible() else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service local de simulation des barrages")
+    parser.add_argument("--hote", default=HOTE)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--dossier", default=str(DOSSIER_DONNEES),
+                        help="Seul dossier dont les fichiers de relevés peuvent être lus")
+    parser.add_argument("--fichier", help="Fichier de relevés à précharger")
+    args = parser.parse_args()
+
+    # Rendu sans affichage : les graphiques sont renvoyés en PNG
+    matplotlib.use("Agg")
+    etat = EtatService(dossier_donnees=args.dossier)
+    if args.fichier:
+        for infos in REGISTRE_STATIONS.values():
+            etat.charger(args.fichier, infos["code"])
+        print(f"Relevés préchargés : {args.fichier}")
+
+    serveur = creer_serveur(args.hote, args.port, etat)
+    print(f"Service démarré sur http://{args.hote}:{args.port} (dossier {etat.dossier_donnees})")
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Sauvegarde et restauration des sessions de l'application : paramètres
+saisis et résultats calculés, pour rouvrir une étude sans la recalculer.
+
+Format d'un fichier .salagou :
+    MAGIQUE (8 octets) | longueur de l'en-tête (4 octets, big-endian) |
+    en-tête JSON (UTF-8) | résultats (archive .npz compressée)
+
+L'en-tête contient les paramètres, l'empreinte (taille, date, sha256) du
+fichier source, la description des tableaux (colonnes, index, types) et le
+sha256 des résultats : il se lit sans décompresser les résultats (liste des
+sessions récentes).
+
+Les résultats ne contiennent que des tableaux numpy (chaînes en Unicode),
+relus avec allow_pickle=False : ouvrir une session n'exécute aucun code, quel
+que soit son contenu. Le sha256 ne détecte que les fichiers abîmés.
+"""
+import hashlib
+import io
+import json
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+MAGIQUE = b"SALAGOU\x01"
+VERSION = 2
+EXTENSION = ".salagou"
+DOSSIER_SESSIONS = Path.home() / ".salagou" / "sessions"
+DERNIERE_SESSION = "derniere" + EXTENSION
+
+
+def empreinte_source(chemin):
+    """
+    Empreinte du fichier de relevés (ou du dossier de stockage binaire) :
+    taille, date de modification et sha256 du contenu.
+    """
+    chemin = Path(chemin)
+    if chemin.name == "index.json":
+        chemin = chemin.parent
+    fichiers = sorted(p for p in chemin.rglob("*") if p.is_file()) if chemin.is_dir() else [chemin]
+
+    sha = hashlib.sha256()
+    taille = mtime = 0
+    for fichier in fichiers:
+        stat = fichier.stat()
+        taille += stat.st_size
+        mtime = max(mtime, stat.st_mtime_ns)
+        with open(fichier, "rb") as f:
+            for bloc in iter(lambda: f.read(1 << 20), b""):
+                sha.update(bloc)
+    return {"chemin": str(Path(chemin).resolve()), "taille": taille, "mtime_ns": mtime, "sha256": sha.hexdigest()}
+
+
+def source_inchangee(source):
+    """
+    True si le fichier source décrit par `source` (voir empreinte_source) n'a
+    pas changé. Taille et date identiques suffisent ; sinon le contenu est
+    comparé (un fichier recopié à l'identique reste valide).
+    """
+    chemin = Path(source["chemin"])
+    if not chemin.exists():
+        return False
+    fichiers = [p for p in chemin.rglob("*") if p.is_file()] if chemin.is_dir() else [chemin]
+    stats = [p.stat() for p in fichiers]
+    if (sum(s.st_size for s in stats) == source["taille"]
+            and max((s.st_mtime_ns for s in stats), default=0) == source["mtime_ns"]):
+        return True
+    return empreinte_source(chemin)["sha256"] == source["sha256"]
+
+
+def _json(valeur):
+    """Nom de colonne ou d'index utilisable en JSON (entiers numpy -> int)."""
+    return valeur.item() if isinstance(valeur, np.generic) else valeur
+
+
+def _vers_tableaux(nom, df, tableaux):
+    """
+    Range les colonnes (et l'index s'il n'est pas 0..n-1) de `df` dans
+    `tableaux` sous les clés "nom/i", et renvoie leur description JSON.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"Résultat non enregistrable ({nom}) : {type(df).__name__}")
+
+    def _ranger(cle, serie):
+        valeurs = serie.to_numpy()
+        if valeurs.dtype.kind not in "biufcmM":
+            # Chaînes : tableau Unicode et masque des valeurs manquantes
+            manquant = serie.isna().to_numpy()
+            tableaux[f"{cle}.manquant"] = manquant
+            valeurs = np.where(manquant, "", serie.astype(object).to_numpy()).astype(str)
+        tableaux[cle] = valeurs
+        return str(serie.dtype)
+
+    description = {
+        "colonnes": [_json(c) for c in df.columns],
+        "nom_colonnes": _json(df.columns.name),
+        "type_colonnes": str(df.columns.dtype),
+        "nom_index": _json(df.index.name),
+        "types": [_ranger(f"{nom}/{i}", df.iloc[:, i]) for i in range(df.shape[1])],
+        "index": None
+    }
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        description["index"] = _ranger(f"{nom}/index", df.index.to_series())
+    description["lignes"] = len(df)
+    return description
+
+
+def _depuis_tableaux(nom, description, tableaux):
+    """DataFrame décrit par `description` (voir _vers_tableaux)."""
+    def _relire(cle, type_enregistre):
+        valeurs = tableaux[cle]
+        if f"{cle}.manquant" in tableaux.files:
+            valeurs = valeurs.astype(object)
+            valeurs[tableaux[f"{cle}.manquant"]] = None
+        return pd.Series(valeurs).astype(type_enregistre)
+
+    colonnes = [_relire(f"{nom}/{i}", t) for i, t in enumerate(description["types"])]
+    if description["index"] is None:
+        index = pd.RangeIndex(description["lignes"])
+    else:
+        index = pd.Index(_relire(f"{nom}/index", description["index"]))
+    df = pd.concat(colonnes, axis=1) if colonnes else pd.DataFrame(index=pd.RangeIndex(description["lignes"]))
+    df.index = index
+    df.index.name = description["nom_index"]
+    df.columns = pd.Index(description["colonnes"], name=description["nom_colonnes"]).astype(
+        description["type_colonnes"])
+    return df
+
+
+def _aplatir(resultats, prefixe=""):
+    """{'results': {'cote_moyenne': df}} -> {'results/cote_moyenne': df}"""
+    plat = {}
+    for cle, valeur in resultats.items():
+        if isinstance(valeur, dict):
+            plat.update(_aplatir(valeur, f"{prefixe}{cle}/"))
+        else:
+            plat[f"{prefixe}{cle}"] = valeur
+    return plat
+
+
+def enregistrer_session(parametres, resultats, chemin_source, chemin=None):
+    """
+    Écrit une session.
+
+    Paramètres:
+        parametres (dict): Valeurs saisies (sérialisables en JSON).
+        resultats (dict): Résultats calculés : DataFrames, éventuellement dans
+            des dict imbriqués (ex: {'results': {'cote_moyenne': df, ...}}).
+        chemin_source (str): Fichier de relevés utilisé pour les résultats.
+        chemin (str | Path, optional): Fichier de session ; par défaut un nouveau
+            fichier horodaté dans DOSSIER_SESSIONS.
+
+    Retour:
+        Path: Fichier de session écrit.
+    """
+    if chemin is None:
+        chemin = DOSSIER_SESSIONS / f"session_{datetime.now():%Y%m%d_%H%M%S}{EXTENSION}"
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+
+    tableaux = {}
+    descriptions = {}
+    for i, (nom, df) in enumerate(_aplatir(resultats).items()):
+        descriptions[nom] = _vers_tableaux(f"t{i}", df, tableaux)
+        descriptions[nom]["cle"] = f"t{i}"
+    tampon = io.BytesIO()
+    np.savez_compressed(tampon, **tableaux)
+    donnees = tampon.getvalue()
+
+    entete = json.dumps({
+        "version": VERSION,
+        "creation": time.time(),
+        "parametres": parametres,
+        "source": empreinte_source(chemin_source) if chemin_source else None,
+        "tableaux": descriptions,
+        "sha256_resultats": hashlib.sha256(donnees).hexdigest()
+    }).encode("utf-8")
+
+    # Écriture dans un fichier temporaire puis renommage : pas de session tronquée
+    temporaire = chemin.with_suffix(chemin.suffix + ".tmp")
+    with open(temporaire, "wb") as f:
+        f.write(MAGIQUE)
+        f.write(struct.pack(">I", len(entete)))
+        f.write(entete)
+        f.write(donnees)
+    os.replace(temporaire, chemin)
+    return chemin
+
+
+def _lire(f):
+    if f.read(len(MAGIQUE)) != MAGIQUE:
+        raise ValueError("Fichier de session invalide.")
+    (longueur,) = struct.unpack(">I", f.read(4))
+    entete = json.loads(f.read(longueur).decode("utf-8"))
+    if entete.get("version") != VERSION:
+        raise ValueError(f"Version de session non prise en charge : {entete.get('version')}")
+    return entete
+
+
+def lire_entete(chemin):
+    """En-tête d'une session (paramètres et source), sans lire les résultats."""
+    with open(chemin, "rb") as f:
+        return _lire(f)
+
+
+def charger_session(chemin):
+    """
+    Lit une session.
+
+    Retour:
+        tuple: (entete (dict), resultats (dict, même structure qu'à l'enregistrement)).
+    """
+    with open(chemin, "rb") as f:
+        entete = _lire(f)
+        donnees = f.read()
+    if hashlib.sha256(donnees).hexdigest() != entete["sha256_resultats"]:
+        raise ValueError("Session corrompue (somme de contrôle des résultats).")
+
+    resultats = {}
+    with np.load(io.BytesIO(donnees), allow_pickle=False) as tableaux:
+        for nom, description in entete["tableaux"].items():
+            *parents, feuille = nom.split("/")
+            niveau = resultats
+            for parent in parents:
+                niveau = niveau.setdefault(parent, {})
+            niveau[feuille] = _depuis_tableaux(description["cle"], description, tableaux)
+    return entete, resultats
+
+
+def sessions_recentes(n=10, dossier=None):
+    """Fichiers de session les plus récents (le plus récent en premier)."""
+    dossier = Path(dossier) if dossier is not None else DOSSIER_SESSIONS
+    if not dossier.exists():
+        return []
+    fichiers = sorted(dossier.glob(f"*{EXTENSION}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return fichiers[:n]
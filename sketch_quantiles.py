@@ -0,0 +1,158 @@
+import math
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+class SketchKLL:
+    """
+    Sketch de quantiles KLL (Karnin, Lang, Liberty 2016), fusionnable.
+
+    Le sketch garde une hiérarchie de compacteurs : un élément du niveau h
+    représente 2**h valeurs. Quand un niveau dépasse sa capacité, il est trié
+    et un élément sur deux (décalage aléatoire) monte au niveau supérieur.
+    La mémoire reste en O(k log(n/k)) quel que soit le nombre n de valeurs.
+
+    Borne d'erreur : l'erreur de rang normalisée est indépendante de n et de
+    l'ordre d'arrivée ; elle vaut environ 1.65 % pour k=200 et 0.5 % pour
+    k=800 (avec 99 % de confiance), soit de l'ordre de 3.3/k. Un quantile p
+    renvoyé est donc une valeur observée dont le rang réel est dans
+    [p - ε, p + ε].
+
+    Paramètres:
+        k (int): Capacité du compacteur le plus haut (précision), par défaut 200.
+        graine (int, optional): Graine du générateur aléatoire (reproductibilité).
+    """
+
+    C = 2 / 3
+
+    def __init__(self, k=200, graine=None):
+        self.k = k
+        self.n = 0
+        self.compacteurs = [np.empty(0)]
+        self.rng = np.random.default_rng(graine)
+
+    def _capacite(self, niveau):
+        profondeur = len(self.compacteurs) - 1 - niveau
+        return max(2, math.ceil(self.k * self.C ** profondeur))
+
+    def _compresser(self):
+        niveau = 0
+        while niveau < len(self.compacteurs):
+            items = self.compacteurs[niveau]
+            if len(items) < self._capacite(niveau):
+                niveau += 1
+                continue
+
+            if niveau + 1 == len(self.compacteurs):
+                self.compacteurs.append(np.empty(0))
+
+            items = np.sort(items)
+            reste = items[-1:] if len(items) % 2 else items[:0]
+            pairs = items[:len(items) - len(reste)]
+            promus = pairs[self.rng.integers(2)::2]
+
+            self.compacteurs[niveau] = reste
+            self.compacteurs[niveau + 1] = np.concatenate((self.compacteurs[niveau + 1], promus))
+            # Les capacités dépendent du nombre de niveaux : on repart du bas
+            niveau = 0
+
+    def mettre_a_jour(self, valeurs):
+        """Ajoute un lot de valeurs (les NaN sont ignorés)."""
+        valeurs = np.asarray(valeurs, dtype=float).ravel()
+        valeurs = valeurs[~np.isnan(valeurs)]
+        if valeurs.size == 0:
+            return self
+        self.compacteurs[0] = np.concatenate((self.compacteurs[0], valeurs))
+        self.n += valeurs.size
+        self._compresser()
+        return self
+
+    def fusionner(self, autre):
+        """Fusionne un autre sketch (ex: calculé dans un autre processus) dans celui-ci."""
+        while len(self.compacteurs) < len(autre.compacteurs):
+            self.compacteurs.append(np.empty(0))
+        for niveau, items in enumerate(autre.compacteurs):
+            self.compacteurs[niveau] = np.concatenate((self.compacteurs[niveau], items))
+        self.n += autre.n
+        self.k = max(self.k, autre.k)
+        self._compresser()
+        return self
+
+    def quantile(self, q):
+        """
+        Quantile(s) approché(s) pour q dans [0, 1] (scalaire ou liste).
+        Renvoie NaN si le sketch est vide.
+        """
+        scalaire = np.isscalar(q)
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.n == 0:
+            res = np.full(q.shape, np.nan)
+            return float(res[0]) if scalaire else res
+
+        items = np.concatenate(self.compacteurs)
+        poids = np.concatenate([np.full(len(c), 2.0 ** h) for h, c in enumerate(self.compacteurs)])
+        ordre = np.argsort(items, kind="stable")
+        items, poids = items[ordre], poids[ordre]
+
+        cumul = np.cumsum(poids)
+        rangs = np.searchsorted(cumul, q * cumul[-1], side="left")
+        res = items[np.minimum(rangs, len(items) - 1)]
+        return float(res[0]) if scalaire else res
+
+    def __len__(self):
+        return sum(len(c) for c in self.compacteurs)
+
+
+class SketchesMensuels:
+    """
+    Un sketch KLL par (variable, mois), alimenté lot par lot.
+
+    Remplace groupby('MOIS_NUM')['valeur'].quantile([p1, p2]) quand les
+    valeurs mensuelles sont trop nombreuses pour être gardées en mémoire
+    (Monte Carlo, balayage de scénarios). Fusionnable entre processus.
+    """
+
+    def __init__(self, k=200, graine=None):
+        self.k = k
+        self.graine = graine
+        self.sketches = {}
+
+    def _sketch(self, variable, mois):
+        cle = (variable, int(mois))
+        if cle not in self.sketches:
+            graine = None if self.graine is None else zlib.crc32(f"{self.graine}-{variable}-{mois}".encode())
+            self.sketches[cle] = SketchKLL(self.k, graine)
+        return self.sketches[cle]
+
+    def mettre_a_jour(self, variable, df_long, colonne="valeur"):
+        """
+        Ajoute un lot de valeurs au format long (colonnes MOIS_NUM et valeur,
+        comme produit par prepare_for_graph, ou colonne de valeurs donnée).
+        """
+        mois = df_long["MOIS_NUM"].to_numpy(dtype=int)
+        valeurs = df_long[colonne].to_numpy(dtype=float)
+        ordre = np.argsort(mois, kind="stable")
+        mois, valeurs = mois[ordre], valeurs[ordre]
+        uniques, debuts = np.unique(mois, return_index=True)
+        for m, bloc in zip(uniques, np.split(valeurs, debuts[1:])):
+            self._sketch(variable, m).mettre_a_jour(bloc)
+        return self
+
+    def fusionner(self, autre):
+        for (variable, mois), sketch in autre.sketches.items():
+            self._sketch(variable, mois).fusionner(sketch)
+        return self
+
+    def quantiles(self, variable, ps):
+        """
+        Quantiles par mois, au même format que
+        groupby('MOIS_NUM')['valeur'].quantile(ps).unstack().
+        """
+        mois = sorted(m for (v, m) in self.sketches if v == variable)
+        return pd.DataFrame(
+            [self.sketches[(variable, m)].quantile(list(ps)) for m in mois],
+            index=pd.Index(mois, name="MOIS_NUM"),
+            columns=list(ps)
+        )
@@ -0,0 +1,23 @@
+# Registre des stations : code, seuils de cote (m NGF) et titre des graphiques
+REGISTRE_STATIONS = {
+    "Salagou": {
+        "code": 34,
+        "cote_min": 137,
+        "cote_max": 139,
+        "titre": "Indicateurs du barrage du Salagou"
+    },
+    "Olivettes": {
+        "code": 32,
+        "cote_min": 152,
+        "cote_max": 163,
+        "titre": "Indicateurs du barrage des Olivettes"
+    }
+}
+
+
+def station_par_code(code):
+    """Renvoie (nom, infos) de la station de code donné."""
+    for nom, infos in REGISTRE_STATIONS.items():
+        if infos["code"] == int(code):
+            return nom, infos
+    raise KeyError(f"Station inconnue : {code}")
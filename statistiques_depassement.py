@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+
+def episodes(masque):
+    """
+    Codage par plages (run-length) d'un masque booléen, sans boucle.
+
+    Retour:
+        tuple: (debuts, durees) indices de début et longueurs des plages True.
+    """
+    masque = np.asarray(masque, dtype=bool)
+    bords = np.diff(np.concatenate(([0], masque.view(np.int8), [0])))
+    debuts = np.flatnonzero(bords == 1)
+    fins = np.flatnonzero(bords == -1)
+    return debuts, fins - debuts
+
+
+def episodes_depassement(grille, seuil, sens="bas", variable="COTE"):
+    """
+    Épisodes où la variable journalière reste sous (sens="bas") ou au-dessus
+    (sens="haut") d'un seuil. Un jour sans relevé interrompt l'épisode.
+
+    Paramètres:
+        grille (GrilleJournaliere): Série journalière d'une station.
+        seuil (float): Seuil (m NGF pour la cote).
+        sens (str): "bas" (sous le seuil) ou "haut" (au-dessus du seuil).
+
+    Retour:
+        pd.DataFrame: Colonnes CODE_STATION, SENS, DEBUT, FIN, DUREE (jours).
+    """
+    valeurs = np.asarray(grille.valeurs[variable], dtype=float)
+    with np.errstate(invalid="ignore"):
+        masque = valeurs < seuil if sens == "bas" else valeurs > seuil
+
+    debuts, durees = episodes(masque)
+    dates = grille.origine + debuts
+    return pd.DataFrame({
+        "CODE_STATION": grille.code_station,
+        "SENS": sens,
+        "DEBUT": pd.to_datetime(dates),
+        "FIN": pd.to_datetime(dates + durees - 1),
+        "DUREE": durees
+    })
+
+
+def synthese_depassements(grille, cote_min, cote_max, variable="COTE"):
+    """
+    Synthèses annuelle et mensuelle des dépassements de seuils d'une station.
+
+    Paramètres:
+        grille (GrilleJournaliere): Série journalière d'une station.
+        cote_min, cote_max (float): Seuils bas et haut.
+
+    Retour:
+        dict : Contient
+            - 'annuelle' : par ANNEE, jours sous/au-dessus des seuils, nombre
+              d'épisodes et épisode le plus long (attribué à son année de début)
+            - 'jours_sous_min' : pivot ANNEE × MOIS_NUM des jours sous cote_min
+            - 'jours_sur_max' : pivot ANNEE × MOIS_NUM des jours au-dessus de cote_max
+            - 'episodes' : liste des épisodes (voir episodes_depassement)
+    """
+    valeurs = np.asarray(grille.valeurs[variable], dtype=float)
+    dates = grille.dates
+    annees = dates.astype("datetime64[Y]").astype(int) + 1970
+    mois = dates.astype("datetime64[M]").astype(int) % 12 + 1
+
+    # Comptage des jours par (année, mois) en un seul bincount
+    annee0 = annees.min()
+    n_annees = annees.max() - annee0 + 1
+    case = (annees - annee0) * 12 + (mois - 1)
+    with np.errstate(invalid="ignore"):
+        sous = valeurs < cote_min
+        sur = valeurs > cote_max
+
+    index = pd.Index(np.arange(annee0, annee0 + n_annees), name="ANNEE")
+    colonnes = pd.Index(range(1, 13), name="MOIS_NUM")
+
+    def _pivot(masque):
+        comptes = np.bincount(case, weights=masque, minlength=n_annees * 12)
+        return pd.DataFrame(comptes.reshape(n_annees, 12), index=index, columns=colonnes)
+
+    jours_sous_min = _pivot(sous)
+    jours_sur_max = _pivot(sur)
+
+    # Mois sans aucun relevé : NaN plutôt que 0
+    renseigne = _pivot(~np.isnan(valeurs)) > 0
+    jours_sous_min = jours_sous_min.where(renseigne)
+    jours_sur_max = jours_sur_max.where(renseigne)
+
+    ep = pd.concat([
+        episodes_depassement(grille, cote_min, "bas", variable),
+        episodes_depassement(grille, cote_max, "haut", variable)
+    ], ignore_index=True)
+    ep["ANNEE"] = ep["DEBUT"].dt.year
+    stats_ep = ep.groupby(["ANNEE", "SENS"])["DUREE"].agg(["count", "max"]).unstack("SENS")
+    stats_ep = stats_ep.reindex(index=index, columns=pd.MultiIndex.from_product(
+        [["count", "max"], ["bas", "haut"]])).fillna(0).astype(int)
+
+    annuelle = pd.DataFrame({
+        "JOURS_SOUS_MIN": jours_sous_min.sum(axis=1, min_count=1),
+        "EPISODES_SOUS_MIN": stats_ep[("count", "bas")],
+        "PLUS_LONG_SOUS_MIN": stats_ep[("max", "bas")],
+        "JOURS_SUR_MAX": jours_sur_max.sum(axis=1, min_count=1),
+        "EPISODES_SUR_MAX": stats_ep[("count", "haut")],
+        "PLUS_LONG_SUR_MAX": stats_ep[("max", "haut")]
+    }, index=index)
+
+    return {
+        "annuelle": annuelle,
+        "jours_sous_min": jours_sous_min,
+        "jours_sur_max": jours_sur_max,
+        "episodes": ep
+    }
+
+
+def synthese_stations(grilles, seuils):
+    """
+    Synthèse annuelle des dépassements pour plusieurs stations.
+
+    Paramètres:
+        grilles (dict): GrilleJournaliere par code station (ex: charger_grilles).
+        seuils (dict): (cote_min, cote_max) par code station.
+
+    Retour:
+        pd.DataFrame: Synthèse annuelle indexée par (CODE_STATION, ANNEE).
+    """
+    return pd.concat(
+        {code: synthese_depassements(grilles[code], *seuils[code])["annuelle"]
+         for code in seuils if code in grilles},
+        names=["CODE_STATION"]
+    )
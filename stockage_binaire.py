@@ -0,0 +1,122 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from grille_journaliere import GrilleJournaliere, construire_grille
+from prep_data import lire_releves
+
+
+NOM_INDEX = "index.json"
+VERSION_STOCKAGE = 1
+
+
+def exporter_stockage_binaire(chemin_fichier, dossier, variables=None):
+    """
+    Convertit le fichier de relevés en stockage binaire mappable en mémoire.
+
+    Chaque station est réindexée sur sa grille journalière puis chaque variable
+    est écrite dans un fichier .npy séparé (<dossier>/<code>/<VARIABLE>.npy),
+    accompagné du masque des jours présents. Un petit index JSON décrit
+    l'origine, la longueur et le type de chaque série.
+
+    Paramètres:
+        chemin_fichier (str): Fichier CSV des relevés (format data_barr_full.csv).
+        dossier (str | Path): Dossier de sortie (créé si besoin).
+        variables (dict, optional): Variables et types NumPy à stocker,
+            par défaut ceux de grille_journaliere.VARIABLES_GRILLE.
+
+    Retour:
+        Path: Chemin du fichier index.json écrit.
+    """
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+
+    data_full = lire_releves(chemin_fichier)
+    index = {"version": VERSION_STOCKAGE, "source": str(chemin_fichier), "stations": {}}
+
+    for code, groupe in data_full.groupby("CODE_STATION", sort=True):
+        code = int(code)
+        grille = construire_grille(groupe, code, variables)
+        dossier_station = dossier / str(code)
+        dossier_station.mkdir(exist_ok=True)
+
+        fichiers = {}
+        for var, tab in grille.valeurs.items():
+            np.save(dossier_station / f"{var}.npy", tab)
+            fichiers[var] = {"fichier": f"{code}/{var}.npy", "dtype": tab.dtype.name}
+        np.save(dossier_station / "present.npy", grille.present)
+
+        noms = groupe["NOM_STATION"].dropna() if "NOM_STATION" in groupe.columns else []
+        index["stations"][str(code)] = {
+            "nom": str(noms.iloc[0]).strip() if len(noms) else "",
+            "origine": str(grille.origine),
+            "n_jours": grille.n_jours,
+            "present": f"{code}/present.npy",
+            "variables": fichiers
+        }
+
+    chemin_index = dossier / NOM_INDEX
+    with open(chemin_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    return chemin_index
+
+
+def lire_index(dossier):
+    """Lit l'index JSON d'un stockage binaire."""
+    chemin_index = Path(dossier) / NOM_INDEX
+    if not chemin_index.exists():
+        raise FileNotFoundError(f"Index du stockage binaire introuvable : {chemin_index}")
+    with open(chemin_index, encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != VERSION_STOCKAGE:
+        raise ValueError(f"Version de stockage non supportée : {index.get('version')}")
+    return index
+
+
+def ouvrir_grille_mmap(dossier, code_station=34, index=None):
+    """
+    Ouvre la grille journalière d'une station sans la charger : les tableaux
+    sont des np.memmap en lecture seule, seules les pages lues sont chargées
+    (et partagées via le cache système entre plusieurs processus).
+    """
+    dossier = Path(dossier)
+    if index is None:
+        index = lire_index(dossier)
+
+    infos = index["stations"].get(str(code_station))
+    if infos is None:
+        raise ValueError(f"Station {code_station} absente du stockage binaire")
+
+    valeurs = {
+        var: np.load(dossier / desc["fichier"], mmap_mode="r")
+        for var, desc in infos["variables"].items()
+    }
+    present = np.load(dossier / infos["present"], mmap_mode="r")
+    return GrilleJournaliere(code_station, infos["origine"], valeurs, present)
+
+
+def charger_donnees_mmap(dossier, code_station=34, date_debut=1997, date_fin=2025):
+    """
+    Équivalent de charger_donnees à partir du stockage binaire.
+
+    Seule la fenêtre d'années demandée de la station est lue sur le disque.
+
+    Paramètres:
+        dossier (str | Path): Dossier produit par exporter_stockage_binaire.
+        code_station (int): Code de la station, par défaut 34 (barrage du Salagou).
+        date_debut (int): Année de début (exclue), par défaut 1997.
+        date_fin (int): Année de fin (exclue), par défaut 2025.
+
+    Retour:
+        pd.DataFrame: Données de la station sur la période, triées par date,
+            avec les colonnes CODE_STATION, NOM_STATION, DATE_RELEVE et les variables stockées.
+    """
+    index = lire_index(dossier)
+    grille = ouvrir_grille_mmap(dossier, code_station, index)
+
+    fenetre = grille.fenetre(f"{date_debut + 1}-01-01", f"{date_fin}-01-01")
+    data = fenetre.vers_dataframe()
+    data.insert(1, "NOM_STATION", index["stations"][str(code_station)]["nom"])
+    return data.reset_index(drop=True)
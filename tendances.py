@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from index_cumule import IndexCumule
+from prep_data import filtrer_station, lire_releves
+
+
+class FenetreTriee:
+    """
+    Valeurs d'une fenêtre glissante gardées triées : chaque ajout ou
+    retrait est une recherche dichotomique suivie d'un décalage, sans
+    nouveau tri. Les NaN ne sont pas conservés.
+    """
+
+    def __init__(self):
+        self.valeurs = np.empty(0)
+
+    def ajouter(self, valeur):
+        if not np.isnan(valeur):
+            self.valeurs = np.insert(self.valeurs, np.searchsorted(self.valeurs, valeur), valeur)
+
+    def retirer(self, valeur):
+        if not np.isnan(valeur):
+            self.valeurs = np.delete(self.valeurs, np.searchsorted(self.valeurs, valeur))
+
+    def quantiles(self, percentiles):
+        """Quantiles (interpolation linéaire, comme pandas), NaN si la fenêtre est vide."""
+        n = self.valeurs.size
+        if n == 0:
+            return np.full(len(percentiles), np.nan)
+        position = (n - 1) * np.asarray(percentiles, dtype=float)
+        bas = np.floor(position).astype(int)
+        haut = np.minimum(bas + 1, n - 1)
+        return self.valeurs[bas] + (self.valeurs[haut] - self.valeurs[bas]) * (position - bas)
+
+
+def cube_tendances(index, n_annees=10, percentiles=(0.25, 0.5), evap_pct=0.10, entree_pct=0.10,
+                   annee_min=None):
+    """
+    Indicateurs de début de mois (sans lâchure) pour toutes les fenêtres
+    glissantes de n_annees années.
+
+    Pour chaque variable (volume du premier jour, entrées, évaporation) et
+    chaque mois, une FenetreTriee avance d'une année à la fois : l'année
+    qui entre est insérée, celle qui sort est retirée. L'indicateur du
+    mois m est, comme dans faconnage_graph, quantile(volume) + quantile(entrées)
+    - quantile(évaporation) du mois m-1. Les % climatiques ne changent pas
+    l'ordre des valeurs et s'appliquent donc aux quantiles.
+
+    Les agrégats mensuels sont ceux de la série complète de la station
+    (sans la correction du premier jour d'une plage filtrée).
+
+    Paramètres:
+        index (IndexCumule): Index de la station.
+        n_annees (int): Longueur des fenêtres (années).
+        percentiles (list): Percentiles (entre 0 et 1).
+        evap_pct, entree_pct (float): % de changement climatique.
+        annee_min (int, optional): Première année prise en compte.
+
+    Retour:
+        tuple: (annees_fin (n_fenetres,), cube (n_fenetres, 12, n_percentiles)),
+            chaque fenêtre couvrant les années ]annee_fin - n_annees, annee_fin].
+    """
+    percentiles = list(percentiles)
+    debut = 0 if annee_min is None else int(np.clip(annee_min - index.annees[0], 0, len(index.annees)))
+    annees = index.annees[debut:]
+    grilles = [
+        index.volume_premier_jour[debut:],
+        np.maximum(index.mensuel["ENTREE_NATURELLE"][debut:], 0),
+        np.maximum(index.mensuel["EVAPORATION"][debut:], 0),
+    ]
+    # Mois sans relevé : pas de valeur (et non 0)
+    absents = ~index.present[debut:]
+    grilles = [np.where(absents, np.nan, g) for g in grilles]
+    facteurs = [1.0, 1 - entree_pct, -(1 + evap_pct)]
+
+    fenetres = [[FenetreTriee() for _ in range(12)] for _ in grilles]
+    n_fenetres = max(0, len(annees) - n_annees + 1)
+    cube = np.full((n_fenetres, 12, len(percentiles)), np.nan)
+
+    for i in range(len(annees)):
+        for grille, fenetres_var in zip(grilles, fenetres):
+            for mois in range(12):
+                fenetres_var[mois].ajouter(grille[i, mois])
+                if i >= n_annees:
+                    fenetres_var[mois].retirer(grille[i - n_annees, mois])
+
+        if i >= n_annees - 1:
+            base = np.zeros((12, len(percentiles)))
+            for facteur, fenetres_var in zip(facteurs, fenetres):
+                base += facteur * np.array([f.quantiles(percentiles) for f in fenetres_var])
+            # Chaque mois est calculé à partir du mois précédent
+            cube[i - n_annees + 1] = np.roll(base, 1, axis=0)
+
+    return annees[n_annees - 1:], cube
+
+
+def cube_vers_dataframe(annees_fin, cube, percentiles=(0.25, 0.5)):
+    """Cube de tendances au format long (ANNEE_FIN, MOIS_NUM, PERCENTILE, INDICATEUR)."""
+    index = pd.MultiIndex.from_product(
+        [annees_fin, range(1, 13), list(percentiles)], names=["ANNEE_FIN", "MOIS_NUM", "PERCENTILE"]
+    )
+    return pd.DataFrame({"INDICATEUR": cube.reshape(-1)}, index=index).reset_index()
+
+
+def tendances_stations(chemin_fichier, n_annees=10, percentiles=(0.25, 0.5), evap_pct=0.10,
+                       entree_pct=0.10, annee_min=1970):
+    """
+    Cubes de tendances de toutes les stations du fichier.
+
+    Retour:
+        dict: {code_station: (annees_fin, cube)} (voir cube_tendances).
+    """
+    data_full = lire_releves(chemin_fichier)
+    resultats = {}
+    for code in sorted(data_full["CODE_STATION"].dropna().unique()):
+        index = IndexCumule(filtrer_station(data_full, int(code), 0, 9999))
+        resultats[int(code)] = cube_tendances(index, n_annees, percentiles, evap_pct, entree_pct, annee_min)
+    return resultats
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from index_cumule import IndexCumule
+from prep_data import filtrer_station, simuler_salagou
+
+
+def _releves_lacunaires():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("1995-03-10", "2006-08-20", freq="D")
+    data = pd.DataFrame({
+        "CODE_STATION": 34,
+        "DATE_RELEVE": dates,
+        "DEBIT_OUT": rng.uniform(0, 2, size=len(dates)),
+        "EVAPORATION": rng.uniform(0, 5e3, size=len(dates)),
+        "VOLUME": 2e7 + np.cumsum(rng.normal(0, 1e4, size=len(dates))),
+        "COTE": rng.uniform(130, 140, size=len(dates)),
+    })
+    # Jours isolés manquants, un mois entier absent (y compris le 1er), une année entière absente
+    absents = (rng.random(len(dates)) < 0.03) | ((dates >= "1999-02-01") & (dates < "1999-03-01"))
+    absents |= dates.year == 2002
+    data = data[~absents]
+    # Valeurs manquantes dans des relevés présents
+    data.loc[data.sample(frac=0.02, random_state=1).index, "COTE"] = np.nan
+    data.loc[data.sample(frac=0.02, random_state=2).index, "EVAPORATION"] = np.nan
+    # Ordre du fichier différent de l'ordre chronologique
+    return data.sample(frac=1, random_state=3).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("date_debut, date_fin", [(1996, 2001), (1998, 2005), (2001, 2004), (1990, 2030)])
+def test_resultats_identiques_a_simuler_salagou(date_debut, date_fin):
+    data = _releves_lacunaires()
+    index = IndexCumule(data)
+
+    attendu = simuler_salagou(filtrer_station(data, 34, date_debut, date_fin).copy(), 0.1, 0.2)
+    obtenu = index.resultats(date_debut, date_fin, 0.1, 0.2)
+
+    for cle in ["cote_moyenne", "donnees_simulees"]:
+        pd.testing.assert_frame_equal(obtenu[cle].reset_index(drop=True), attendu[cle].reset_index(drop=True),
+                                      rtol=1e-9)
+    pd.testing.assert_frame_equal(index.releves(date_debut, date_fin).reset_index(drop=True),
+                                  filtrer_station(data, 34, date_debut, date_fin).reset_index(drop=True))
+
+
+def test_plage_sans_releve():
+    index = IndexCumule(_releves_lacunaires())
+    assert index.resultats(2001, 2003)["donnees_simulees"].empty
+    assert index.releves(2001, 2003).empty
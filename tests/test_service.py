@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from service import CacheLRU, ClientService, EtatService, creer_serveur
+
+
+@pytest.fixture
+def service(tmp_path):
+    dossier = tmp_path / "data"
+    dossier.mkdir()
+    serveur = creer_serveur(port=0, etat=EtatService(dossier_donnees=dossier))
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    yield ClientService(f"http://127.0.0.1:{serveur.server_address[1]}", timeout=10), dossier
+    serveur.shutdown()
+    serveur.server_close()
+
+
+def test_chemin_hors_du_dossier_refuse(service, tmp_path):
+    client, dossier = service
+    dehors = tmp_path / "releves.csv"
+    dehors.write_text("CODE_STATION;DATE_RELEVE\n")
+
+    # 403 côté serveur, PermissionError côté client (calcul local dans l'application)
+    for chemin in [dehors, dossier / ".." / "releves.csv"]:
+        with pytest.raises(PermissionError):
+            client.charger(chemin)
+        with pytest.raises(PermissionError):
+            client.simuler(chemin)
+    assert client.metriques()["latences"]["/charger"]["erreurs"] == 2
+
+
+def test_lien_symbolique_vers_l_exterieur_refuse(tmp_path):
+    dossier = tmp_path / "data"
+    dossier.mkdir()
+    (tmp_path / "secret.csv").write_text("")
+    (dossier / "lien.csv").symlink_to(tmp_path / "secret.csv")
+    etat = EtatService(dossier_donnees=dossier)
+    with pytest.raises(PermissionError):
+        etat.autoriser(dossier / "lien.csv")
+    assert etat.autoriser(dossier / "sous" / ".." / "a.csv") == str((dossier / "a.csv").resolve())
+
+
+def test_cache_lru_evince_le_plus_ancien():
+    cache = CacheLRU(taille=2)
+    cache.obtenir("a", lambda: 1)
+    cache.obtenir("b", lambda: 2)
+    cache.obtenir("a", lambda: pytest.fail("a est en cache"))
+    cache.obtenir("c", lambda: 3)
+    assert cache.obtenir("b", lambda: 20) == 20  # évincé : b était le moins récemment utilisé
+    assert cache.etat()["entrees"] == 2
+
+
+def test_cache_lru_calcul_unique_pour_requetes_simultanees():
+    cache = CacheLRU()
+    appels = []
+    demarre, libere = threading.Event(), threading.Event()
+
+    def calcul():
+        appels.append(1)
+        demarre.set()
+        libere.wait(5)
+        return 42
+
+    resultats = []
+    threads = [threading.Thread(target=lambda: resultats.append(cache.obtenir("cle", calcul))) for _ in range(4)]
+    threads[0].start()
+    demarre.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.1)  # les autres requêtes attendent le calcul en cours
+    libere.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert resultats == [42] * 4
+    assert len(appels) == 1
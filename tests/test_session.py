@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from prep_data import simuler_salagou
+from session import MAGIQUE, charger_session, enregistrer_session, lire_entete, source_inchangee
+
+
+def _releves():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2001-01-01", "2003-12-31", freq="D")
+    return pd.DataFrame({
+        "CODE_STATION": np.int64(34),
+        "DATE_RELEVE": dates,
+        "DEBIT_OUT": rng.uniform(0, 2, size=len(dates)),
+        "EVAPORATION": rng.uniform(0, 5e3, size=len(dates)),
+        "VOLUME": 2e7 + np.cumsum(rng.normal(0, 1e4, size=len(dates))),
+        "COTE": rng.uniform(130, 140, size=len(dates)).astype(np.float32),
+        # Colonne texte lue par read_csv : valeurs manquantes en NaN
+        "EVENEMENT": pd.Series(["crue" if i % 50 == 0 else np.nan for i in range(len(dates))], dtype=object),
+    })
+
+
+def _resultats(data):
+    results = simuler_salagou(data.copy())
+    cote = results["cote_moyenne"]
+    return {
+        "results": results,
+        "df_filtered": data,
+        # Colonnes entières (mois) et index nommé (années), comme les tableaux croisés de l'application
+        "df_pivot_volume": cote.pivot(index="ANNEE", columns="MOIS_NUM", values="COTE_MOYENNE"),
+        "df_indicateurs": pd.DataFrame({"Mois": ["janv.", "févr."], "q 0.25": [1, 2], "q 0.5": [3, 4]}),
+    }
+
+
+@pytest.fixture
+def source(tmp_path):
+    chemin = tmp_path / "releves.csv"
+    chemin.write_text("CODE_STATION;DATE_RELEVE\n34;2001-01-01\n")
+    return chemin
+
+
+def test_aller_retour_identique(tmp_path, source):
+    data = _releves()
+    resultats = _resultats(data)
+    parametres = {"code_station": 34, "lachures": [0.0] * 12, "nom_station": "Salagou"}
+
+    chemin = enregistrer_session(parametres, resultats, source, tmp_path / "s.salagou")
+    entete, relus = charger_session(chemin)
+
+    assert entete["parametres"] == parametres
+    assert lire_entete(chemin)["tableaux"] == entete["tableaux"]
+    assert source_inchangee(entete["source"])
+    assert relus.keys() == resultats.keys() and relus["results"].keys() == resultats["results"].keys()
+    for cle in ["cote_moyenne", "donnees_simulees"]:
+        pd.testing.assert_frame_equal(relus["results"][cle], resultats["results"][cle])
+    for cle in ["df_filtered", "df_pivot_volume", "df_indicateurs"]:
+        pd.testing.assert_frame_equal(relus[cle], resultats[cle])
+    # Écriture par renommage : pas de fichier temporaire laissé
+    assert not (tmp_path / "s.salagou.tmp").exists()
+
+
+def test_source_modifiee_detectee(tmp_path, source):
+    chemin = enregistrer_session({}, {"df_indicateurs": _resultats(_releves())["df_indicateurs"]},
+                                 source, tmp_path / "s.salagou")
+    source.write_text("CODE_STATION;DATE_RELEVE\n34;2001-01-02\n")
+    assert not source_inchangee(lire_entete(chemin)["source"])
+
+
+def test_session_corrompue_refusee(tmp_path, source):
+    chemin = enregistrer_session({}, _resultats(_releves()), source, tmp_path / "s.salagou")
+    contenu = bytearray(chemin.read_bytes())
+
+    abime = contenu.copy()
+    abime[-10] ^= 0xFF
+    (tmp_path / "abime.salagou").write_bytes(bytes(abime))
+    with pytest.raises(ValueError, match="corrompue"):
+        charger_session(tmp_path / "abime.salagou")
+
+    (tmp_path / "autre.salagou").write_bytes(b"X" * len(MAGIQUE) + bytes(contenu[len(MAGIQUE):]))
+    with pytest.raises(ValueError):
+        charger_session(tmp_path / "autre.salagou")
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregats_incrementaux import AgregatsMensuels
+from periodes import SCHEMAS, agregats_depuis_mensuel, indicateurs_periodes, sketches_mensuels
+from sketch_quantiles import SketchKLL, SketchesMensuels
+
+PS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+# Erreur de rang documentée pour k=200 (99 % de confiance)
+EPSILON = 0.0165
+
+
+def _erreur_rang(valeurs_triees, estimation, q):
+    """Écart entre q et l'intervalle de rangs normalisés occupé par l'estimation."""
+    n = len(valeurs_triees)
+    bas = np.searchsorted(valeurs_triees, estimation, side="left") / n
+    haut = np.searchsorted(valeurs_triees, estimation, side="right") / n
+    return max(bas - q, q - haut, 0.0)
+
+
+@pytest.mark.parametrize("loi", ["normale", "lognormale", "triee"])
+def test_erreur_de_rang_contre_np_quantile(loi):
+    rng = np.random.default_rng(0)
+    valeurs = {
+        "normale": rng.normal(size=200_000),
+        "lognormale": rng.lognormal(3, 1.5, size=200_000),
+        "triee": np.sort(rng.normal(size=200_000)),
+    }[loi]
+
+    sketch = SketchKLL(k=200, graine=1)
+    for lot in np.array_split(valeurs, 37):
+        sketch.mettre_a_jour(lot)
+
+    triees = np.sort(valeurs)
+    estimations = sketch.quantile(PS)
+    for q, estimation, exacte in zip(PS, estimations, np.quantile(valeurs, PS)):
+        assert _erreur_rang(triees, estimation, q) <= EPSILON
+        # Rang de la valeur exacte dans le même repère, pour référence
+        assert _erreur_rang(triees, exacte, q) <= 1 / len(valeurs)
+    # Mémoire bornée indépendamment de n
+    assert len(sketch) < 3 * 200 * np.log2(len(valeurs) / 200)
+
+
+def test_exact_sous_la_capacite():
+    valeurs = np.random.default_rng(2).normal(size=150)
+    sketch = SketchKLL(k=200).mettre_a_jour(valeurs)
+    np.testing.assert_array_equal(sketch.quantile(PS), np.quantile(valeurs, PS, method="inverted_cdf"))
+
+
+def test_fusion_equivalente_a_un_sketch_unique():
+    rng = np.random.default_rng(3)
+    valeurs = rng.gamma(2.0, 3.0, size=120_000)
+    triees = np.sort(valeurs)
+
+    unique = SketchKLL(k=200, graine=4).mettre_a_jour(valeurs)
+    # Un sketch par "processus", fusionnés ensuite
+    fusion = SketchKLL(k=200, graine=5)
+    for i, lot in enumerate(np.array_split(valeurs, 8)):
+        fusion.fusionner(SketchKLL(k=200, graine=10 + i).mettre_a_jour(lot))
+
+    assert fusion.n == unique.n == len(valeurs)
+    for q, a, b in zip(PS, unique.quantile(PS), fusion.quantile(PS)):
+        assert _erreur_rang(triees, a, q) <= EPSILON
+        assert _erreur_rang(triees, b, q) <= EPSILON
+        # Les deux estimations sont à moins de 2 ε l'une de l'autre en rang
+        assert abs(np.searchsorted(triees, a) - np.searchsorted(triees, b)) / len(valeurs) <= 2 * EPSILON
+
+
+def test_fusion_sous_la_capacite_identique():
+    valeurs = np.random.default_rng(6).normal(size=180)
+    unique = SketchKLL(k=200).mettre_a_jour(valeurs)
+    fusion = SketchKLL(k=200)
+    for lot in np.array_split(valeurs, 3):
+        fusion.fusionner(SketchKLL(k=200).mettre_a_jour(lot))
+    np.testing.assert_array_equal(unique.quantile(PS), fusion.quantile(PS))
+
+
+def _long(rng, n_annees):
+    mois = np.tile(np.arange(1, 13), n_annees)
+    return pd.DataFrame({"MOIS_NUM": mois, "valeur": rng.gamma(2.0, 1e6, size=mois.size)})
+
+
+def test_sketches_mensuels_par_mois():
+    rng = np.random.default_rng(7)
+    df = _long(rng, 5000)
+    sketches = SketchesMensuels(k=200, graine=8)
+    for lot in np.array_split(np.arange(len(df)), 10):
+        sketches.mettre_a_jour("v", df.iloc[lot])
+
+    res = sketches.quantiles("v", [0.25, 0.5])
+    assert list(res.index) == list(range(1, 13))
+    for m, groupe in df.groupby("MOIS_NUM")["valeur"]:
+        triees = np.sort(groupe.to_numpy())
+        for q in [0.25, 0.5]:
+            assert _erreur_rang(triees, res.loc[m, q], q) <= EPSILON
+
+
+@pytest.mark.parametrize("nom_schema", ["Mois", "Année hydrologique (oct.-sept.)"])
+def test_indicateurs_depuis_sketches(nom_schema):
+    rng = np.random.default_rng(9)
+    debut, entree, evap = _long(rng, 28), _long(rng, 28), _long(rng, 28)
+    schema = SCHEMAS[nom_schema]
+    lach = rng.uniform(0, 1e5, size=12)
+
+    valeurs = indicateurs_periodes(sketches_mensuels(debut, entree, evap), schema, [0.25, 0.5], lach)
+
+    # 28 valeurs par mois : sketches exacts, quantiles "inverted_cdf"
+    agregats = agregats_depuis_mensuel(debut, entree, evap, schema)
+    attendu = np.empty_like(valeurs)
+    for i, p in enumerate([0.25, 0.5]):
+        q = {col: agregats.groupby("PERIODE")[col].apply(lambda s: np.quantile(s.dropna(), p, method="inverted_cdf"))
+             for col in ["VOLUME_DEBUT", "ENTREE_CLIMAT", "EVAP_CLIMAT"]}
+        base = (q["VOLUME_DEBUT"] + q["ENTREE_CLIMAT"] - q["EVAP_CLIMAT"]).to_numpy()
+        attendu[i] = np.roll(base - schema.repartir_lachures(lach), 1)
+    np.testing.assert_allclose(valeurs, attendu)
+
+
+def test_indicateurs_sketches_decoupage_journalier_refuse():
+    sketches = sketches_mensuels(*(_long(np.random.default_rng(10), 3) for _ in range(3)))
+    with pytest.raises(ValueError):
+        indicateurs_periodes(sketches, SCHEMAS["Décades"])
+
+
+def _releves(debut, fin, rng):
+    dates = pd.date_range(debut, fin, freq="D")
+    return pd.DataFrame({
+        "DATE_RELEVE": dates,
+        "DEBIT_OUT": rng.uniform(0, 2, size=len(dates)),
+        "EVAPORATION": rng.uniform(0, 5e3, size=len(dates)),
+        "VOLUME": 2e7 + np.cumsum(rng.normal(0, 1e4, size=len(dates))),
+        "COTE": rng.uniform(130, 140, size=len(dates)),
+    })
+
+
+def test_agregats_incrementaux_alimentent_les_sketches():
+    data = _releves("2000-01-01", "2009-06-15", np.random.default_rng(11))
+
+    agregats = AgregatsMensuels(0.1, 0.1, sketches=True)
+    for lot in np.array_split(np.arange(len(data)), 23):
+        agregats.ajouter(data.iloc[lot])
+
+    # Seuls les mois terminés sont versés : juin 2009 est en cours
+    assert agregats.dernier_mois_clos == pd.Timestamp("2009-05-01")
+    mensuel = agregats.resultats()["donnees_simulees"]
+    clos = mensuel[mensuel["MOIS"] < pd.Timestamp("2009-06-01")]
+    mois = clos["MOIS"].dt.month
+
+    for variable, colonne in [("VOLUME_DEBUT", "VOLUME_PREMIER_JOUR"),
+                              ("ENTREE_CLIMAT", "ENTREE_CLIMAT"),
+                              ("EVAP_CLIMAT", "EVAP_CLIMAT")]:
+        res = agregats.sketches.quantiles(variable, [0.25, 0.5])
+        attendu = clos.groupby(mois)[colonne].apply(
+            lambda s: pd.Series(np.quantile(s.dropna(), [0.25, 0.5], method="inverted_cdf"), index=[0.25, 0.5])
+        ).unstack()
+        np.testing.assert_allclose(res.to_numpy(), attendu.to_numpy())
+
+
+def test_agregats_incrementaux_sans_sketches_par_defaut():
+    data = _releves("2000-01-01", "2001-03-15", np.random.default_rng(12))
+    agregats = AgregatsMensuels(0.1, 0.1)
+    agregats.ajouter(data)
+    assert agregats.sketches is None and agregats.dernier_mois_clos is None
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from interpolation import table_hsv_station, cotes_to_volumes
+
+
+def verifier_coherence(data, tolerance=0.01, tables_hsv=None):
+    """
+    Contrôle de cohérence des relevés journaliers COTE / VOLUME.
+
+    Pour chaque station, la colonne COTE est convertie en volume en un seul appel
+    vectorisé à partir de la table HSV_<code>.txt, puis comparée à la colonne VOLUME.
+    Les lacunes (jours manquants entre deux relevés) et les dates en double sont
+    également recensées.
+
+    Paramètres:
+        data (pd.DataFrame): Relevés contenant au moins les colonnes
+            CODE_STATION, DATE_RELEVE, COTE et VOLUME (une ou plusieurs stations).
+        tolerance (float): Écart relatif maximal toléré entre VOLUME et le volume
+            déduit de la COTE, par défaut 0.01 (1 %).
+        tables_hsv (dict, optional): Tables HSV déjà chargées, indexées par code station.
+            Si absent, les tables par défaut sont utilisées (table_hsv_station).
+
+    Retour:
+        dict : Contient
+            - 'ecarts' : relevés dont l'écart dépasse la tolérance (ou cote hors table)
+            - 'lacunes' : périodes sans relevé (début, fin, nombre de jours manquants)
+            - 'doublons' : dates présentes plusieurs fois pour une même station
+            - 'resume' : synthèse par station
+    """
+    required_cols = ["CODE_STATION", "DATE_RELEVE", "COTE", "VOLUME"]
+    if not all(col in data.columns for col in required_cols):
+        raise ValueError(f"Le jeu de données doit contenir : {', '.join(required_cols)}")
+
+    if tables_hsv is None:
+        tables_hsv = {}
+
+    ecarts, lacunes, doublons, resume = [], [], [], []
+
+    for code, groupe in data.groupby("CODE_STATION", sort=True):
+        dates = pd.to_datetime(groupe["DATE_RELEVE"]).to_numpy(dtype="datetime64[D]")
+        cotes = groupe["COTE"].to_numpy(dtype=float)
+        volumes = groupe["VOLUME"].to_numpy(dtype=float)
+
+        # ---------------- Écarts COTE / VOLUME ----------------
+        nb_ecarts = 0
+        table = tables_hsv.get(code)
+        if table is None:
+            try:
+                table = table_hsv_station(code)
+            except FileNotFoundError:
+                table = None
+            tables_hsv[code] = table
+
+        if table is not None:
+            volumes_hsv = cotes_to_volumes(cotes, table_interpolation=table)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ecart_relatif = np.abs(volumes - volumes_hsv) / np.abs(volumes_hsv)
+
+            hors_table = (cotes < table["Cote"].min()) | (cotes > table["Cote"].max())
+            comparable = ~np.isnan(volumes) & ~np.isnan(cotes)
+            masque = comparable & ((ecart_relatif > tolerance) | hors_table)
+            nb_ecarts = int(masque.sum())
+
+            if nb_ecarts:
+                ecarts.append(pd.DataFrame({
+                    "CODE_STATION": code,
+                    "DATE_RELEVE": dates[masque],
+                    "COTE": cotes[masque],
+                    "VOLUME": volumes[masque],
+                    "VOLUME_HSV": volumes_hsv[masque],
+                    "ECART_RELATIF": ecart_relatif[masque],
+                    "HORS_TABLE": hors_table[masque]
+                }))
+
+        # ---------------- Lacunes et doublons ----------------
+        dates_triees = np.sort(dates[~np.isnat(dates)])
+        pas = np.diff(dates_triees).astype(int)
+
+        idx_lacunes = np.flatnonzero(pas > 1)
+        if idx_lacunes.size:
+            lacunes.append(pd.DataFrame({
+                "CODE_STATION": code,
+                "DEBUT": dates_triees[idx_lacunes] + 1,
+                "FIN": dates_triees[idx_lacunes + 1] - 1,
+                "NB_JOURS": pas[idx_lacunes] - 1
+            }))
+
+        uniques, comptes = np.unique(dates_triees, return_counts=True)
+        multiples = comptes > 1
+        if multiples.any():
+            doublons.append(pd.DataFrame({
+                "CODE_STATION": code,
+                "DATE_RELEVE": uniques[multiples],
+                "NB": comptes[multiples]
+            }))
+
+        resume.append({
+            "CODE_STATION": code,
+            "NB_RELEVES": len(groupe),
+            "NB_ECARTS": nb_ecarts,
+            "NB_LACUNES": int(idx_lacunes.size),
+            "JOURS_MANQUANTS": int((pas[idx_lacunes] - 1).sum()),
+            "NB_DOUBLONS": int(multiples.sum())
+        })
+
+    def _concat(morceaux, colonnes):
+        if morceaux:
+            return pd.concat(morceaux, ignore_index=True)
+        return pd.DataFrame(columns=colonnes)
+
+    return {
+        "ecarts": _concat(ecarts, ["CODE_STATION", "DATE_RELEVE", "COTE", "VOLUME",
+                                   "VOLUME_HSV", "ECART_RELATIF", "HORS_TABLE"]),
+        "lacunes": _concat(lacunes, ["CODE_STATION", "DEBUT", "FIN", "NB_JOURS"]),
+        "doublons": _concat(doublons, ["CODE_STATION", "DATE_RELEVE", "NB"]),
+        "resume": pd.DataFrame(resume)
+    }